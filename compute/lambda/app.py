@@ -1,67 +1,402 @@
 # SpaceX API Example
 import os
+import sys
 import json
+import time
 
 from datetime import datetime, timedelta, timezone
-from dateutil import parser
 
 import boto3
-import requests
 
+try:
+    from date_keys import key_attributes, parse_utc
+except ImportError:  # ejecución desde el repo: el módulo compartido vive en compute/shared
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+    from date_keys import key_attributes, parse_utc
+from bulk_writer import BulkWriter
+from metrics import METRICS_NAMESPACE, StageTimer
+from pipeline import DEFAULT_IN_FLIGHT, DEFAULT_PIPELINE, INGEST_PIPELINES, run_pipeline
+from reference import REFERENCE_ENABLED, load_reference
+from rollups import (
+    ROLLUP_SOURCE_ATTRIBUTES,
+    ROLLUPS_ENABLED,
+    PendingRollups,
+    apply_rollup_deltas,
+)
+from spacex_client import SpaceXClient
+from storage import (
+    HASH_ATTRIBUTE,
+    content_hash,
+    fetch_existing_items,
+    load_checkpoint,
+    save_checkpoint,
+)
 # from model import SpaceXResponse
 
-URL = "https://api.spacexdata.com/v5/launches/query"
+# Configurable para apuntar a un doble local de la API (benchmarks end-to-end)
+URL = os.environ.get("SPACEX_API_URL", "https://api.spacexdata.com/v5/launches/query")
 
+# Cliente HTTP a nivel de módulo: se reutiliza (pool keep-alive) en invocaciones warm
+SPACEX_CLIENT = SpaceXClient.from_env()
 
+# Recurso y tabla de DynamoDB cacheados a nivel de módulo: se crean en la primera
+# invocación y las invocaciones warm se saltan la resolución de botocore.
+_DYNAMODB = None
+_TABLE = None
+_TABLE_NAME = None
 
+# Tamaño de página por defecto para /launches/query (la API pagina con mongoose-paginate)
+DEFAULT_PAGE_LIMIT = int(os.environ.get("SPACEX_PAGE_LIMIT", "100"))
 
-def launch_data(json_data):
-    # Normalize and guard keys coming from SpaceX API (v5)
-    fairings = json_data.get("fairings") or {}
-    crew = json_data.get("crew") or []
-    capsules = json_data.get("capsules") or []
+# Validación opcional de los documentos antes de normalizar: none | slim | full
+DEFAULT_VALIDATION_MODE = os.environ.get("VALIDATION_MODE", "none").lower()
+VALIDATION_MODES = ("none", "slim", "full")
 
-    # The API uses 'id' for the document id and 'name' for the mission name.
-    # Be defensive: ensure 'id' exists and is a string so it matches the DynamoDB key schema.
-    item_id = json_data.get("id") or json_data.get("_id")
-    if item_id is not None:
-        item_id = str(item_id)
+# Margen hacia atrás desde el checkpoint. Los lanzamientos `upcoming` ya se
+# recogen desde `pending_date_utc`, así que basta con cubrir desfases de reloj
+# y ejecuciones retrasadas, no una ventana entera de EventBridge (6 h)
+DEFAULT_OVERLAP_SECONDS = int(os.environ.get("CHECKPOINT_OVERLAP_SECONDS", "3600"))
 
-    return {
-        "id": item_id,
-        "flight_number": json_data.get("flight_number"),
-        "mission_name": json_data.get("name"),
-        "rocket_name": json_data.get("rocket"),
-
-        "launch_date": json_data.get("date_utc"),
-        "launch_date_precision": json_data.get("date_precision"),
-        "static_fire_date": json_data.get("static_fire_date_utc"),
-        "launch_window": json_data.get("window"),
-
-        "launch_status": "upcoming" if json_data.get("upcoming") else ("success" if json_data.get("success", False) else "failed"),
-        "launchpad_id": json_data.get("launchpad"),
-
-        "crew": len(crew) > 0,
-        "capsules": len(capsules) > 0,
-        "fairings_reused": fairings.get("reused"),
-        "fairings_recovery_attempt": fairings.get("recovery_attempt"),
-        "fairings_recovered": fairings.get("recovered"),
-
-        "details": json_data.get("details"),
+
+class SpaceXAPIError(Exception):
+    """Error obteniendo una página de resultados de la API de SpaceX."""
+
+
+def build_query_payload(start_iso, end_iso, page=1, limit=DEFAULT_PAGE_LIMIT, projection=True):
+    """
+    Construye el payload de /launches/query para una ventana y una página. Con
+    `projection` se pide a la API solo los campos que lee `launch_data`.
+    """
+    payload = {
+        "query": {
+            "date_utc": {
+                "$gte": start_iso,
+                "$lte": end_iso
+            }
+        },
+        "options": {
+            "sort": {"date_utc": "asc"},
+            "page": page,
+            "limit": limit,
+        }
     }
+    if projection:
+        payload["options"]["select"] = LAUNCH_SELECT
+    return payload
+
+
+def fetch_page(start_iso, end_iso, page=1, limit=DEFAULT_PAGE_LIMIT, projection=True):
+    """Respuesta paginada completa (docs, totalPages, nextPage...) de una página."""
+    payload = build_query_payload(start_iso, end_iso, page=page, limit=limit, projection=projection)
+    try:
+        return SPACEX_CLIENT.post(URL, payload)
+    except Exception as e:
+        raise SpaceXAPIError(str(e)) from e
+
+
+def iter_launch_pages(start_iso, end_iso, limit=DEFAULT_PAGE_LIMIT, projection=True):
+    """
+    Generador de páginas de /launches/query: hace un POST por página y sigue
+    `nextPage` mientras `hasNextPage` sea verdadero. Cada página se entrega
+    como la lista de `docs` crudos, sin acumular el resultado completo.
+    """
+    page = 1
+    while page:
+        data = fetch_page(start_iso, end_iso, page=page, limit=limit, projection=projection)
+
+        yield data.get("docs", [])
+
+        page = data.get("nextPage") if data.get("hasNextPage") else None
+
+
+def get_dynamodb():
+    """Devuelve el recurso DynamoDB del proceso, creándolo en el primer uso."""
+    global _DYNAMODB
+    if _DYNAMODB is None:
+        _DYNAMODB = boto3.resource("dynamodb", region_name=os.environ.get("AWS_REGION"))
+    return _DYNAMODB
+
+
+def get_table():
+    """Devuelve la tabla `DYNAMODB_TABLE` cacheada (se recrea si cambia el nombre)."""
+    global _TABLE, _TABLE_NAME
+    table_name = os.environ["DYNAMODB_TABLE"]
+    if _TABLE is None or _TABLE_NAME != table_name:
+        _TABLE = get_dynamodb().Table(table_name)
+        _TABLE_NAME = table_name
+    return _TABLE
+
+
+def reset_dynamodb_cache():
+    """Descarta el recurso y la tabla cacheados (usado por los tests)."""
+    global _DYNAMODB, _TABLE, _TABLE_NAME
+    _DYNAMODB = None
+    _TABLE = None
+    _TABLE_NAME = None
+
+
+def get_validator(mode):
+    """
+    Devuelve la función de validación de un documento para `mode` (None si no se
+    valida). Pydantic solo se importa cuando la validación está activada.
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"Modo de validación no válido: {mode}")
+    if mode == "none":
+        return None
+    from model import Launch, SlimLaunch
+    model = SlimLaunch if mode == "slim" else Launch
+    return model.model_validate
+
+
+def normalize_page(docs, validator=None, counts=None, launch_items=None, reference=None):
+    """
+    Normalizador por lotes de una página de la API (v5): valida (opcional),
+    normaliza y descarta los items sin clave en una sola pasada, sin listas
+    intermedias. Devuelve los items válidos para DynamoDB; los documentos que no
+    pasan `validator` se cuentan en counts['invalid']. Si se pasa
+    `launch_items` (modo dev), se le añaden todos los items normalizados,
+    incluidos los descartados por falta de `id` o `launch_date`. Con
+    `reference` (ver `reference.load_reference`) se añaden los nombres del
+    cohete y del launchpad sin peticiones por lanzamiento.
+    """
+    if validator is not None:
+        from pydantic import ValidationError
+
+    rockets = reference["rockets"] if reference else {}
+    launchpads = reference["launchpads"] if reference else {}
+
+    items = []
+    append = items.append
+    for doc in docs:
+        if validator is not None:
+            try:
+                doc = validator(doc).model_dump()
+            except ValidationError:
+                counts["invalid"] += 1
+                continue
+
+        # Normalize and guard keys coming from SpaceX API (v5)
+        get = doc.get
+        fairings = get("fairings") or {}
+
+        # The API uses 'id' for the document id and 'name' for the mission name.
+        # Be defensive: ensure 'id' exists and is a string so it matches the DynamoDB key schema.
+        item_id = get("id") or get("_id")
+        if item_id is not None:
+            item_id = str(item_id)
+
+        # Claves de fecha canónicas (UTC, ancho fijo) compartidas con el dashboard
+        date_utc = get("date_utc")
+        try:
+            date_attributes = key_attributes(date_utc) if date_utc else None
+        except ValueError:
+            # Fecha no interpretable: el item se queda sin clave y se descarta
+            date_attributes = None
+
+        item = {
+            "id": item_id,
+            "flight_number": get("flight_number"),
+            "mission_name": get("name"),
+            "rocket_id": get("rocket"),
+            # Nombre del cohete si está en la referencia; si no, su id (como antes)
+            "rocket_name": (rockets.get(get("rocket")) or {}).get("name") or get("rocket"),
+
+            "launch_date": date_attributes["launch_date"] if date_attributes else date_utc,
+            # Bucket mensual (YYYY-MM): partition key del GSI launch_month-index
+            "launch_month": date_attributes["launch_month"] if date_attributes else None,
+            # Segundos desde epoch: sort key numérico opcional para índices por rango
+            "date_unix": date_attributes["date_unix"] if date_attributes else None,
+            "launch_date_precision": get("date_precision"),
+            "static_fire_date": get("static_fire_date_utc"),
+            "launch_window": get("window"),
+
+            "launch_status": "upcoming" if get("upcoming") else ("success" if get("success", False) else "failed"),
+            "launchpad_id": get("launchpad"),
+            "launchpad_name": (launchpads.get(get("launchpad")) or {}).get("name"),
+
+            "crew": bool(get("crew")),
+            "capsules": bool(get("capsules")),
+            "fairings_reused": fairings.get("reused"),
+            "fairings_recovery_attempt": fairings.get("recovery_attempt"),
+            "fairings_recovered": fairings.get("recovered"),
+
+            "details": get("details"),
+        }
+        if launch_items is not None:
+            launch_items.append(item)
+
+        # Sin id o launch_date válida no hay clave en DynamoDB
+        if not item_id or date_attributes is None:
+            continue
+        append(item)
+    return items
+
+
+def get_reference(table, errors=None):
+    """
+    Launchpads y cohetes cacheados (memoria, DynamoDB o API); None si está
+    desactivado. Los fallos al refrescarlos se añaden a `errors`.
+    """
+    if not REFERENCE_ENABLED:
+        return None
+    return load_reference(SPACEX_CLIENT, table, errors=errors)
+
+
+def write_items(table, batch, items, counts, force=False, timer=None, rollups=None):
+    """
+    Escribe en `batch` los items nuevos o modificados de una página comparando su
+    `content_hash` con el guardado (pre-lectura con BatchGetItem). Actualiza los
+    contadores `inserted`/`updated`/`skipped` de `counts`. Con `rollups`
+    (`PendingRollups`, el `on_confirmed` del writer) se anota el estado anterior
+    y el nuevo de cada item encolado; sus deltas se acumulan al confirmarse
+    cada lote y se aplican con `apply_written_rollups`. Con `timer` se miden
+    por separado la pre-lectura y la escritura.
+    """
+    if not items:
+        return counts
+    timer = timer or StageTimer()
+
+    # Los rollups necesitan el estado anterior aunque se fuerce la reescritura
+    existing = {}
+    if not force or rollups is not None:
+        attributes = (HASH_ATTRIBUTE,) + (ROLLUP_SOURCE_ATTRIBUTES if rollups is not None else ())
+        with timer.stage("pre_read", len(items)):
+            existing = fetch_existing_items(
+                get_dynamodb(), table.name,
+                [{"id": i["id"], "launch_date": i["launch_date"]} for i in items],
+                attributes,
+            )
+
+    written = 0
+    with timer.stage("write"):
+        for item in items:
+            key = (item["id"], item["launch_date"])
+            previous = existing.get(key)
+            item[HASH_ATTRIBUTE] = content_hash(item)
+            if not force and previous is not None and previous.get(HASH_ATTRIBUTE) == item[HASH_ATTRIBUTE]:
+                counts["skipped"] += 1
+                continue
+            # Se anota antes de encolar: el lote puede confirmarse en otro hilo
+            # antes de que `put_item` vuelva
+            if rollups is not None:
+                rollups.track(item, previous)
+            batch.put_item(Item=item)
+            written += 1
+            counts["updated" if previous is not None else "inserted"] += 1
+    timer.add_items("write", written)
+    return counts
+
+
+def apply_written_rollups(table, rollups, counts, timer=None):
+    """
+    Aplica los deltas de las escrituras confirmadas acumulados en `rollups`.
+    Se llama tras el flush, también si falló: un item que no llegó a escribirse
+    no se cuenta ahora, y la siguiente ingesta lo verá como nuevo y lo contará
+    una sola vez.
+    """
+    timer = timer or StageTimer()
+    deltas = rollups.take_deltas()
+    if deltas:
+        with timer.stage("rollups", len(deltas)):
+            counts["rollups"] = counts.get("rollups", 0) + apply_rollup_deltas(table, deltas)
+    return counts
+
+
+def launch_data(json_data):
+    """Normaliza un único documento; envoltorio de `normalize_page`."""
+    normalized = []
+    normalize_page([json_data], launch_items=normalized)
+    return normalized[0]
+
+
+class FieldRecorder(dict):
+    """Documento vacío que registra las claves que se leen de él."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields = set()
+
+    def get(self, key, default=None):
+        self.fields.add(key)
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.fields.add(key)
+        return super().__getitem__(key)
+
+
+def traced_fields(normalize, doc=None):
+    """Devuelve las claves de primer nivel que `normalize` lee de `doc` (vacío por defecto)."""
+    recorder = FieldRecorder(doc or {})
+    normalize(recorder)
+    return recorder.fields
+
+
+# Proyección `options.select` generada a partir de los campos que lee launch_data,
+# para que la API no devuelva links, cores, failures, etc.
+LAUNCH_FIELDS = frozenset(traced_fields(launch_data))
+LAUNCH_SELECT = {field: 1 for field in sorted(LAUNCH_FIELDS)}
 
 
 def lambda_handler(event, context):
 
+    # Un backfill de varios años no cabe en el timeout de la Lambda (15 s):
+    # solo se ejecuta desde la CLI (`python backfill.py`)
+    if event.get("mode") == "backfill":
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "El backfill no se ejecuta en la Lambda; usa `python backfill.py --start ... --end ...`"})
+        }
+
+    # Recalcula los rollups a partir de los lanzamientos ya guardados
+    if event.get("mode") == "rebuild_rollups":
+        from rollups import rebuild_rollups
+        try:
+            report = rebuild_rollups(get_table())
+        except Exception as e:
+            return {
+                "statusCode": 500,
+                "body": json.dumps({"error": f"Error recalculando los rollups: {str(e)}"})
+            }
+        return {
+            "statusCode": 200,
+            "body": json.dumps(report)
+        }
+
+    # Una línea EMF por invocación con los tiempos de cada etapa
+    timer = StageTimer()
+    response = ingest_window(event, timer)
+    function_name = getattr(context, "function_name", None) or os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+    timer.emit(
+        METRICS_NAMESPACE,
+        dimensions={"FunctionName": function_name},
+        properties={"statusCode": response["statusCode"]},
+    )
+    return response
+
+
+def ingest_window(event, timer):
+    """
+    Ingesta de una ventana de fechas (explícita o a partir del checkpoint).
+    Registra en `timer` las etapas: parse_dates, checkpoint_load, fetch,
+    normalize, pre_read, write, flush, rollups y checkpoint_save. Con
+    `pipeline="async"` las descargas de páginas se solapan con la escritura.
+    """
     # --- Leer parámetros ---
     utc_date_str = event.get("utc_date")
     offset_seconds = event.get("offset_seconds", 6 * 3600)  # 24 horas por defecto
+    # Sin ventana explícita (p.ej. la ejecución programada de EventBridge) se ingiere
+    # de forma incremental a partir del checkpoint guardado en la tabla
+    incremental = event.get("incremental", "utc_date" not in event and "offset_seconds" not in event)
+    overlap_seconds = event.get("overlap_seconds", DEFAULT_OVERLAP_SECONDS)
 
     # --- Convertir la fecha UTC ---
     if utc_date_str:
         try:
-            # end_time = datetime.fromisoformat(utc_date_str.replace("Z", "+00:00"))
-            end_time = parser.isoparse(utc_date_str)
+            # fromisoformat de la librería estándar (con "Z"), sin dateutil
+            with timer.stage("parse_dates", 1):
+                end_time = parse_utc(utc_date_str)
         except Exception as e:
             return {
                 "statusCode": 400,
@@ -70,72 +405,192 @@ def lambda_handler(event, context):
     else:
         end_time = datetime.now(timezone.utc)
 
+    table = get_table()
+
+    checkpoint = None
+    if incremental:
+        try:
+            with timer.stage("checkpoint_load"):
+                checkpoint = load_checkpoint(table)
+        except Exception as e:
+            return {
+                "statusCode": 500,
+                "body": json.dumps({"error": f"Error leyendo el checkpoint de DynamoDB: {str(e)}"})
+            }
+
     # --- Calcular start_time ---
-    start_time = end_time - timedelta(seconds=offset_seconds)
+    if checkpoint:
+        # Desde el watermark (o el lanzamiento pendiente más antiguo) menos el solapamiento
+        with timer.stage("parse_dates", 1):
+            resume_from = parse_utc(checkpoint["watermark"])
+            if checkpoint.get("pending_date_utc"):
+                resume_from = min(resume_from, parse_utc(checkpoint["pending_date_utc"]))
+        start_time = resume_from - timedelta(seconds=overlap_seconds)
+    else:
+        start_time = end_time - timedelta(seconds=offset_seconds)
 
     # Formatos en ISO para la API
     start_iso = start_time.isoformat()
     end_iso = end_time.isoformat()
 
-    payload = {
-        "query": {
-            "date_utc": {
-                "$gte": start_iso,
-                "$lte": end_iso
-            }
-        },
-        "options": {
-            "sort": {"date_utc": "asc"}
+    try:
+        page_limit = int(event.get("page_limit", DEFAULT_PAGE_LIMIT))
+        if page_limit < 1:
+            raise ValueError("debe ser mayor que 0")
+    except (TypeError, ValueError) as e:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"page_limit no válido: {event.get('page_limit')!r} ({str(e)})"})
         }
-    }
 
+    validation_mode = str(event.get("validation", DEFAULT_VALIDATION_MODE)).lower()
     try:
-        response = requests.post(URL, json=payload)
-        data = response.json()
-    except Exception as e:
+        validator = get_validator(validation_mode)
+    except ValueError as e:
         return {
-            "statusCode": 500,
-            "body": json.dumps({"error": f"Error llamando a SpaceX API: {str(e)}"})
+            "statusCode": 400,
+            "body": json.dumps({"error": str(e)})
         }
 
-    dynamo_items = [ launch_data(item) for item in data.get("docs", []) ]
+    pipeline_mode = str(event.get("pipeline", DEFAULT_PIPELINE)).lower()
+    if pipeline_mode not in INGEST_PIPELINES:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"Pipeline no válido: {pipeline_mode!r} (opciones: {', '.join(INGEST_PIPELINES)})"})
+        }
+    try:
+        in_flight = int(event.get("in_flight", DEFAULT_IN_FLIGHT))
+        if in_flight < 1:
+            raise ValueError("debe ser mayor que 0")
+    except (TypeError, ValueError) as e:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"in_flight no válido: {event.get('in_flight')!r} ({str(e)})"})
+        }
 
-    # Validate items: ensure required key attributes exist and are strings
-    valid_items = []
-    for item in dynamo_items:
-        if not item.get("id"):
-            # skip items without id
-            continue
-        if not item.get("launch_date"):
-            # skip items without launch_date
-            continue
-        # coerce to strings to match DynamoDB attribute types
-        item["id"] = str(item["id"])
-        item["launch_date"] = str(item["launch_date"])
-        valid_items.append(item)
+    SPACEX_CLIENT.reset_stats()
 
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(os.environ["DYNAMODB_TABLE"])
+    # Datos de referencia para enriquecer los items (una lectura por invocación como mucho)
+    # Si no se pueden refrescar se ingiere sin nombres, pero el fallo se informa
+    # en la respuesta y como métrica `reference_errors`
+    reference_errors = []
+    with timer.stage("reference"):
+        reference = get_reference(table, reference_errors)
+    timer.gauge("reference_errors", len(reference_errors), "Count")
 
+    DEV_MODE = os.environ.get("ENVIRONMENT", "dev").lower() == "dev"
+    # Solo en dev se devuelven los items normalizados (evita acumularlos en prod)
+    launch_items = [] if DEV_MODE else None
+
+    # Detección de cambios: solo se escriben lanzamientos nuevos o modificados
+    force = bool(event.get("force", False))
+    counts = {"inserted": 0, "updated": 0, "skipped": 0, "invalid": 0}
+    pages = 0
+    pipeline_stats = None
+    # Estado para el checkpoint: fecha más reciente ingerida y "upcoming" más antiguo
+    state = {"last_date": None, "pending_date": None}
+    rollups = PendingRollups() if ROLLUPS_ENABLED else None
+    writer = BulkWriter(get_dynamodb().meta.client, table.name, on_confirmed=rollups.confirm if rollups is not None else None)
+    error = None
     try:
-        with table.batch_writer() as batch:
-            for item in valid_items:
-                batch.put_item(Item=item)
+        # Las páginas se normalizan y escriben a medida que llegan: memoria constante
+        with writer as batch:
+
+            def process_page(docs):
+                with timer.stage("normalize", len(docs)):
+                    page_items = normalize_page(docs, validator, counts, launch_items, reference)
+                for item in page_items:
+                    if state["last_date"] is None or item["launch_date"] > state["last_date"]:
+                        state["last_date"] = item["launch_date"]
+                    if item["launch_status"] == "upcoming" and (state["pending_date"] is None or item["launch_date"] < state["pending_date"]):
+                        state["pending_date"] = item["launch_date"]
+
+                write_items(table, batch, page_items, counts, force=force, timer=timer, rollups=rollups)
+
+            # La validación "full" necesita el documento completo: sin proyección
+            projection = validation_mode != "full"
+            if pipeline_mode == "async":
+                pipeline_stats = run_pipeline(
+                    lambda page: fetch_page(start_iso, end_iso, page=page, limit=page_limit, projection=projection),
+                    process_page,
+                    timer,
+                    in_flight=in_flight,
+                )
+                pages = pipeline_stats["pages"]
+                timer.gauge("pipeline_overlap_ms", pipeline_stats["overlap_ms"], "Milliseconds")
+                timer.gauge("pipeline_overlap_ratio", pipeline_stats["overlap_ratio"])
+            else:
+                pages_iter = iter_launch_pages(start_iso, end_iso, limit=page_limit, projection=projection)
+                for docs in timer.iterate("fetch", pages_iter):
+                    pages += 1
+                    process_page(docs)
+            # Lo que queda en el buffer del writer se envía al salir del with
+            flush_started = time.perf_counter()
+        timer.record("flush", time.perf_counter() - flush_started)
     except Exception as e:
+        error = e
+
+    # Los rollups se derivan de lo que DynamoDB confirmó, aunque la escritura
+    # haya fallado a medias: así la siguiente ejecución no cuenta dos veces
+    if rollups is not None:
+        try:
+            apply_written_rollups(table, rollups, counts, timer)
+        except Exception as e:
+            error = error or e
+
+    # Los errores incluyen cuántas escrituras llegaron a confirmarse (`writes`)
+    if isinstance(error, SpaceXAPIError):
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": f"Error escribiendo en DynamoDB: {str(e)}"})
+            "body": json.dumps({"error": f"Error llamando a SpaceX API: {str(error)}", "pages": pages, "writes": writer.stats()})
+        }
+    if error is not None:
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": f"Error escribiendo en DynamoDB: {str(error)}", "pages": pages, "writes": writer.stats()})
         }
 
+    saved_checkpoint = None
+    if incremental:
+        # Nunca retroceder el watermark si se ejecuta con un utc_date anterior
+        watermark = end_iso
+        if checkpoint and parse_utc(checkpoint["watermark"]) > end_time:
+            watermark = checkpoint["watermark"]
+        try:
+            with timer.stage("checkpoint_save"):
+                saved_checkpoint = save_checkpoint(table, watermark, state["pending_date"], state["last_date"])
+        except Exception as e:
+            return {
+                "statusCode": 500,
+                "body": json.dumps({"error": f"Error guardando el checkpoint en DynamoDB: {str(e)}"})
+            }
+
     body = {
-        "inserted_items": len(valid_items)
+        # Total de items escritos (nuevos + modificados)
+        "inserted_items": counts["inserted"] + counts["updated"],
+        "inserted": counts["inserted"],
+        "updated": counts["updated"],
+        "skipped": counts["skipped"],
     }
+    if validator is not None:
+        body["invalid"] = counts["invalid"]
+    if reference_errors:
+        body["reference_errors"] = reference_errors
 
-    DEV_MODE = os.environ.get("ENVIRONMENT", "dev").lower() == "dev"
     if DEV_MODE:
         body["start_time"] = start_iso
         body["end_time"] = end_iso
-        body["lauch_items"] = dynamo_items
+        body["pages"] = pages
+        body["mode"] = "incremental" if incremental else "window"
+        if saved_checkpoint:
+            body["checkpoint"] = saved_checkpoint
+        body["api_stats"] = SPACEX_CLIENT.stats()
+        body["rollups_updated"] = counts.get("rollups", 0)
+        body["timings"] = timer.report()
+        body["writes"] = writer.stats()
+        if pipeline_stats:
+            body["pipeline"] = pipeline_stats
+        body["lauch_items"] = launch_items
 
     return {
         "statusCode": 200,
@@ -0,0 +1,217 @@
+# Backfill paralelo de lanzamientos históricos
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from app import (
+    DEFAULT_PAGE_LIMIT,
+    SPACEX_CLIENT,
+    SpaceXAPIError,
+    apply_written_rollups,
+    get_dynamodb,
+    get_reference,
+    get_table,
+    iter_launch_pages,
+    normalize_page,
+    parse_utc,
+    write_items,
+)
+from bulk_writer import BulkWriter
+from rollups import ROLLUPS_ENABLED, PendingRollups
+
+DEFAULT_SHARD_DAYS = int(os.environ.get("BACKFILL_SHARD_DAYS", "90"))
+DEFAULT_WORKERS = int(os.environ.get("BACKFILL_WORKERS", "4"))
+
+
+def split_range(start_time, end_time, shard_days=DEFAULT_SHARD_DAYS):
+    """Divide [start_time, end_time] en sub-ventanas consecutivas de `shard_days` días."""
+    if end_time < start_time:
+        raise ValueError("La fecha de inicio no puede ser posterior a la fecha fin")
+    step = timedelta(days=shard_days)
+    windows = []
+    current = start_time
+    while current < end_time:
+        windows.append((current, min(current + step, end_time)))
+        current += step
+    return windows or [(start_time, end_time)]
+
+
+def _fetch_window(window, page_limit, pages_queue, stop):
+    """Worker: pagina una sub-ventana y encola sus páginas para el escritor."""
+    start_time, end_time = window
+    try:
+        if stop.is_set():
+            return
+        for docs in iter_launch_pages(start_time.isoformat(), end_time.isoformat(), limit=page_limit):
+            pages_queue.put(("page", docs))
+            if stop.is_set():
+                return
+    except Exception as e:
+        pages_queue.put(("error", e if isinstance(e, SpaceXAPIError) else SpaceXAPIError(str(e))))
+    finally:
+        pages_queue.put(("done", None))
+
+
+def run_backfill(start_time, end_time, shard_days=DEFAULT_SHARD_DAYS, workers=DEFAULT_WORKERS,
+                 page_limit=DEFAULT_PAGE_LIMIT, force=False):
+    """
+    Ingiere [start_time, end_time] repartiendo las sub-ventanas entre `workers`
+    hilos que consultan la API en paralelo. Las páginas llegan por una cola
+    acotada a un único escritor que deduplica por (id, launch_date), ya que los
+    límites de ventanas contiguas se solapan. Devuelve contadores y throughput.
+    """
+    windows = split_range(start_time, end_time, shard_days)
+    table = get_table()
+    reference_errors = []
+    reference = get_reference(table, reference_errors)
+
+    pages_queue = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    counts = {"inserted": 0, "updated": 0, "skipped": 0, "duplicates": 0}
+    seen = set()
+    pages = 0
+    launches = 0
+    error = None
+    rollups = PendingRollups() if ROLLUPS_ENABLED else None
+    writer = BulkWriter(get_dynamodb().meta.client, table.name, on_confirmed=rollups.confirm if rollups is not None else None)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for window in windows:
+                pool.submit(_fetch_window, window, page_limit, pages_queue, stop)
+
+            with writer as batch:
+                pending_windows = len(windows)
+                while pending_windows:
+                    kind, value = pages_queue.get()
+                    if kind == "done":
+                        pending_windows -= 1
+                    elif kind == "error":
+                        # Se detienen los workers pero se sigue drenando la cola para no bloquearlos
+                        error = error or value
+                        stop.set()
+                    elif error is None:
+                        try:
+                            pages += 1
+                            items = []
+                            for item in normalize_page(value, reference=reference):
+                                key = (item["id"], item["launch_date"])
+                                if key in seen:
+                                    counts["duplicates"] += 1
+                                    continue
+                                seen.add(key)
+                                items.append(item)
+                            launches += len(items)
+                            write_items(table, batch, items, counts, force=force, rollups=rollups)
+                        except Exception as e:
+                            error = e
+                            stop.set()
+    except Exception as e:
+        error = error or e
+
+    # Rollups solo de lo que DynamoDB confirmó (ver `apply_written_rollups`)
+    if rollups is not None:
+        try:
+            apply_written_rollups(table, rollups, counts)
+        except Exception as e:
+            error = error or e
+    elapsed = time.perf_counter() - started
+
+    if error is not None:
+        raise error
+
+    report = {
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "windows": len(windows),
+        "workers": workers,
+        "pages": pages,
+        "launches": launches,
+        "inserted_items": counts["inserted"] + counts["updated"],
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "launches_per_second": round(launches / elapsed, 2) if elapsed else 0.0,
+        "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+    }
+    if reference_errors:
+        report["reference_errors"] = reference_errors
+    return report
+
+
+def backfill_handler(event):
+    """
+    Ejecuta el backfill descrito por `event` ({"start": ..., "end": ...}) y
+    devuelve una respuesta con el formato de la Lambda. Solo lo usa la CLI
+    (`main`): `lambda_handler` rechaza el modo `backfill` por el timeout.
+    """
+    try:
+        start_time = parse_utc(event["start"])
+        end_time = parse_utc(event["end"])
+        options = {
+            "shard_days": int(event.get("shard_days", DEFAULT_SHARD_DAYS)),
+            "workers": int(event.get("workers", DEFAULT_WORKERS)),
+            "page_limit": int(event.get("page_limit", DEFAULT_PAGE_LIMIT)),
+            "force": bool(event.get("force", False)),
+        }
+        if end_time < start_time:
+            raise ValueError("la fecha de inicio es posterior a la fecha fin")
+    except Exception as e:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"Parámetros de backfill no válidos: {str(e)}"})
+        }
+
+    SPACEX_CLIENT.reset_stats()
+    try:
+        report = run_backfill(start_time, end_time, **options)
+    except SpaceXAPIError as e:
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": f"Error llamando a SpaceX API: {str(e)}"})
+        }
+    except Exception as e:
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": f"Error escribiendo en DynamoDB: {str(e)}"})
+        }
+
+    if os.environ.get("ENVIRONMENT", "dev").lower() == "dev":
+        report["api_stats"] = SPACEX_CLIENT.stats()
+
+    return {
+        "statusCode": 200,
+        "body": json.dumps(report)
+    }
+
+
+def main(argv=None):
+    """Punto de entrada local: python backfill.py --start 2006-01-01 --end 2022-12-31"""
+    arg_parser = argparse.ArgumentParser(description="Backfill paralelo de lanzamientos de SpaceX en DynamoDB")
+    arg_parser.add_argument("--start", required=True, help="Fecha inicial (ISO8601)")
+    arg_parser.add_argument("--end", required=True, help="Fecha final (ISO8601)")
+    arg_parser.add_argument("--shard-days", type=int, default=DEFAULT_SHARD_DAYS)
+    arg_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    arg_parser.add_argument("--page-limit", type=int, default=DEFAULT_PAGE_LIMIT)
+    arg_parser.add_argument("--force", action="store_true", help="Reescribe aunque no haya cambios")
+    args = arg_parser.parse_args(argv)
+
+    response = backfill_handler({
+        "start": args.start,
+        "end": args.end,
+        "shard_days": args.shard_days,
+        "workers": args.workers,
+        "page_limit": args.page_limit,
+        "force": args.force,
+    })
+    print(json.dumps(json.loads(response["body"]), indent=2))
+    return 0 if response["statusCode"] == 200 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,187 @@
+"""
+Cold-start benchmark for the ingest Lambda, fully offline.
+
+Every sample is a fresh Python process (like a new Lambda execution
+environment) that imports `app` and invokes `lambda_handler` twice against
+the local fake SpaceX API and moto server used by `bench_e2e.py`:
+
+  - import: time to `import app` (the INIT phase)
+  - first invocation: the cold invocation right after the import
+  - second invocation: the same process again (warm)
+  - table construction vs cached table: after the two invocations the
+    table cache is reset and `get_table()` is timed while it builds the
+    boto3 resource and Table again (what every invocation paid before the
+    module-level cache), then once more returning the cached handle
+
+Processes run with `-B`, so nothing is written to __pycache__ (the Lambda
+file system is read-only): whatever is not already compiled in the tree
+under test is compiled on every start. One extra run with
+`-X importtime` lists the slowest imports, and the report says which
+optional dependencies were loaded by `import app` alone.
+
+By default the source tree is measured. Pass `--package build/package`
+(after `./build.sh`) to measure the trimmed deployment package instead:
+boto3 then comes from the current environment, as it would from the
+Lambda runtime.
+
+Usage (from compute/lambda):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_cold_start.py --runs 10
+    ./build.sh && python benchmarks/bench_cold_start.py --runs 10 --package build/package
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_e2e import LAMBDA_DIR, TABLE_NAME, create_table, start_dynamodb, summarize  # noqa: E402
+from fake_spacex import FakeSpaceXAPI  # noqa: E402
+
+SHARED_DIR = os.path.join(os.path.dirname(LAMBDA_DIR), "shared")
+
+# Dependencias que el handler no necesita en la ruta habitual
+OPTIONAL_MODULES = ("requests", "dateutil", "asyncio", "pydantic")
+
+CHILD = """
+import json, sys, time
+event = json.loads(sys.argv[1])
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+loaded = [name for name in {optional!r} if name in sys.modules]
+first = app.lambda_handler(event, None)
+first_done = time.perf_counter()
+second = app.lambda_handler(event, None)
+second_done = time.perf_counter()
+app.reset_dynamodb_cache()
+table_started = time.perf_counter()
+app.get_table()
+table_built = time.perf_counter()
+app.get_table()
+table_cached = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "first": first_done - imported,
+    "second": second_done - first_done,
+    "table_construction": table_built - table_started,
+    "table_cached": table_cached - table_built,
+    "status": [first["statusCode"], second["statusCode"]],
+    "loaded": loaded,
+}}))
+""".format(optional=OPTIONAL_MODULES)
+
+
+def run_child(event, pythonpath, importtime=False):
+    """Runs one fresh interpreter; returns (sample, stderr)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(pythonpath))
+    command = [sys.executable, "-B"] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, json.dumps(event)]
+    # cwd vacío: que `import app` no resuelva por el directorio actual
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    if sample["status"] != [200, 200]:
+        raise RuntimeError(f"lambda_handler failed: {sample['status']}")
+    return sample, result.stderr
+
+
+def slowest_imports(stderr, top):
+    """Top-level imports by cumulative time from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # Imports de primer nivel y sus hijos directos (p.ej. app y boto3): el
+        # tiempo acumulado incluye el de todo lo que importan
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth <= 1:
+            try:
+                rows.append((int(cumulative), name.strip()))
+            except ValueError:
+                pass
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in rows[:top]]
+
+
+def run(args):
+    api = FakeSpaceXAPI.synthetic(args.docs).start()
+    dynamodb_server = start_dynamodb()
+    try:
+        os.environ.update({
+            "SPACEX_API_URL": api.url,
+            "SPACEX_REFERENCE_URL": api.reference_url,
+            "DYNAMODB_TABLE": TABLE_NAME,
+            "ENVIRONMENT": "prod",
+            "METRICS_ENABLED": "false",
+        })
+        create_table()
+
+        if args.package:
+            pythonpath = [os.path.abspath(args.package)]
+        else:
+            pythonpath = [LAMBDA_DIR, SHARED_DIR]
+
+        # Ventana de la ejecución programada; la primera pasada carga los datos,
+        # así que las muestras miden la ruta habitual (sin cambios que escribir)
+        event = {"utc_date": api.docs[-1]["date_utc"], "offset_seconds": args.window_days * 86400}
+        run_child(event, pythonpath)
+
+        samples = [run_child(event, pythonpath)[0] for _ in range(args.runs)]
+        profile, stderr = run_child(event, pythonpath, importtime=True)
+
+        return {
+            "config": {
+                "runs": args.runs,
+                "docs": args.docs,
+                "window_days": args.window_days,
+                "tree": args.package or "source",
+                "python": sys.version.split()[0],
+            },
+            "import": summarize([s["import"] for s in samples]),
+            "first_invocation": summarize([s["first"] for s in samples]),
+            "second_invocation": summarize([s["second"] for s in samples]),
+            "cold_total": summarize([s["import"] + s["first"] for s in samples]),
+            "table_construction": summarize([s["table_construction"] for s in samples]),
+            "table_cached": summarize([s["table_cached"] for s in samples]),
+            "loaded_by_import": profile["loaded"],
+            "slowest_imports": slowest_imports(stderr, args.top),
+        }
+    finally:
+        dynamodb_server.stop()
+        api.stop()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--runs", type=int, default=10, help="Fresh processes to sample")
+    arg_parser.add_argument("--docs", type=int, default=500, help="Launches served by the fake API")
+    arg_parser.add_argument("--window-days", type=int, default=30, help="Ingest window of each invocation")
+    arg_parser.add_argument("--package", help="Measure this built package directory instead of the sources")
+    arg_parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    arg_parser.add_argument("--json", help="Also write the report to this file")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args)
+
+    print(f"tree:                {report['config']['tree']} (Python {report['config']['python']})")
+    for name in ("import", "first_invocation", "cold_total", "second_invocation", "table_construction", "table_cached"):
+        stats = report[name]
+        print(f"{name + ':':<21}p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms over {stats['runs']} runs")
+    print(f"{'loaded by import:':<21}{', '.join(report['loaded_by_import']) or '-'}")
+    print("slowest imports:")
+    for row in report["slowest_imports"]:
+        print(f"  {row['cumulative_ms']:>8} ms  {row['module']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
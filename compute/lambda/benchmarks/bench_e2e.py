@@ -0,0 +1,244 @@
+"""
+End-to-end throughput benchmark, fully offline.
+
+Runs the real `lambda_handler` against a local fake SpaceX API
+(`fake_spacex.py`, real HTTP with configurable page size and latency) and a
+local DynamoDB (moto in server mode, so botocore serialization and batching
+are real), then reads the data back with the dashboard queries from
+`compute/streamlit/queries.py`.
+
+Reports:
+  - ingestion: launches/s of the first (cold) ingest and, with
+    `--pipeline async`, how much fetch and write time overlapped
+  - handler latency: p50/p99 over repeated invocations on the same window
+    (unchanged data, i.e. the change-detection path of the scheduled runs)
+  - dashboard: p50/p99 load time of `fetch_items_by_date_range` and of the
+    rollup path
+
+Usage (from compute/lambda):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_e2e.py --docs 2000 --page-limit 100 --latency-ms 10 --runs 10
+    python benchmarks/bench_e2e.py --docs 2000 --latency-ms 50 --pipeline async --in-flight 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.dirname(HERE)
+STREAMLIT_DIR = os.path.join(os.path.dirname(LAMBDA_DIR), "streamlit")
+sys.path.insert(0, LAMBDA_DIR)
+sys.path.insert(0, HERE)
+
+from fake_spacex import FakeSpaceXAPI  # noqa: E402
+
+TABLE_NAME = "bench-launches"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(timings):
+    return {
+        "runs": len(timings),
+        "p50_ms": round(percentile(timings, 50) * 1000, 1),
+        "p99_ms": round(percentile(timings, 99) * 1000, 1),
+    }
+
+
+def start_dynamodb():
+    """Start moto in server mode and point every boto3 client at it."""
+    from moto.server import ThreadedMotoServer
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    os.environ.update({
+        "AWS_ENDPOINT_URL_DYNAMODB": f"http://127.0.0.1:{port}",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_REGION": "us-east-1",
+    })
+    return server
+
+
+def create_table():
+    """Same key schema and month GSI as terraform/modules/dynamodb."""
+    import boto3
+
+    boto3.client("dynamodb").create_table(
+        TableName=TABLE_NAME,
+        BillingMode="PAY_PER_REQUEST",
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "launch_date", "AttributeType": "S"},
+            {"AttributeName": "launch_month", "AttributeType": "S"},
+        ],
+        KeySchema=[
+            {"AttributeName": "id", "KeyType": "HASH"},
+            {"AttributeName": "launch_date", "KeyType": "RANGE"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "launch_month-index",
+            "KeySchema": [
+                {"AttributeName": "launch_month", "KeyType": "HASH"},
+                {"AttributeName": "launch_date", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["launch_status", "launchpad_id"]},
+        }],
+    )
+
+
+def invoke(handler, event):
+    started = time.perf_counter()
+    response = handler(event, None)
+    elapsed = time.perf_counter() - started
+    if response["statusCode"] != 200:
+        raise RuntimeError(f"lambda_handler failed: {response['body']}")
+    return json.loads(response["body"]), elapsed
+
+
+def run(args):
+    api = FakeSpaceXAPI.synthetic(args.docs, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+    dynamodb_server = start_dynamodb()
+    try:
+        os.environ.update({
+            "SPACEX_API_URL": api.url,
+            "SPACEX_REFERENCE_URL": api.reference_url,
+            "DYNAMODB_TABLE": TABLE_NAME,
+            "DYNAMODB_TABLE_NAME": TABLE_NAME,
+            "ENVIRONMENT": "prod",
+            "ROLLUPS_ENABLED": "false" if args.no_rollups else "true",
+        })
+        create_table()
+
+        import app
+        app.reset_dynamodb_cache()
+
+        first, last = api.docs[0]["date_utc"], api.docs[-1]["date_utc"]
+        window = {"utc_date": last, "offset_seconds": int(
+            (app.parse_utc(last) - app.parse_utc(first)).total_seconds()
+        ) + 1, "page_limit": args.page_limit, "pipeline": args.pipeline, "in_flight": args.in_flight}
+
+        # 1) Ingesta en frío: todos los lanzamientos son nuevos. La línea EMF
+        # del handler trae el solapamiento del pipeline async
+        requests_before = api.requests
+        emf = io.StringIO()
+        with contextlib.redirect_stdout(emf):
+            body, elapsed = invoke(app.lambda_handler, window)
+        metrics = json.loads(emf.getvalue().strip().splitlines()[-1]) if emf.getvalue().strip() else {}
+        ingest = {
+            "launches": body["inserted_items"],
+            "pages": api.requests - requests_before,
+            "seconds": round(elapsed, 3),
+            "launches_per_second": round(body["inserted_items"] / elapsed, 1),
+            "fetch_ms": metrics.get("fetch_ms"),
+            "write_ms": metrics.get("write_ms"),
+            "overlap_ms": metrics.get("pipeline_overlap_ms"),
+            "overlap_ratio": metrics.get("pipeline_overlap_ratio"),
+        }
+
+        # 2) Invocaciones repetidas sobre la misma ventana (nada cambia)
+        timings = [invoke(app.lambda_handler, window)[1] for _ in range(args.runs)]
+        handler_stats = summarize(timings)
+
+        # 3) Dashboard: items por rango (GSI mensual) y rollups. La tabla nace
+        # con el GSI, así que la migración no actualiza nada, pero deja la marca
+        # sin la que el dashboard no usa el GSI
+        from migrate_date_keys import migrate_date_keys
+        migrate_date_keys(app.get_table())
+
+        sys.path.insert(0, STREAMLIT_DIR)
+        import queries
+
+        table = queries.get_dynamodb_table()
+        start_date = app.parse_utc(first).date()
+        end_date = app.parse_utc(last).date()
+
+        load_timings, rows = [], 0
+        for _ in range(args.dashboard_runs):
+            started = time.perf_counter()
+            df, method = queries.fetch_items_by_date_range(start_date, end_date, table=table)
+            queries.chart_frames_from_items(df)
+            load_timings.append(time.perf_counter() - started)
+            rows = len(df)
+
+        rollup_timings = []
+        for _ in range(args.dashboard_runs):
+            started = time.perf_counter()
+            items, granularity = queries.fetch_rollups(table, start_date, end_date)
+            frames = queries.chart_frames_from_rollups(items, granularity)
+            rollup_timings.append(time.perf_counter() - started)
+
+        return {
+            "config": {
+                "docs": args.docs,
+                "page_limit": args.page_limit,
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "rollups": not args.no_rollups,
+                "pipeline": args.pipeline,
+                "in_flight": args.in_flight,
+            },
+            "ingest": ingest,
+            "handler_rerun": handler_stats,
+            "dashboard_items": dict(summarize(load_timings), rows=rows, method=method),
+            "dashboard_rollups": dict(summarize(rollup_timings), launches=frames["total"] if frames else 0),
+        }
+    finally:
+        dynamodb_server.stop()
+        api.stop()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--docs", type=int, default=2000)
+    arg_parser.add_argument("--page-limit", type=int, default=100)
+    arg_parser.add_argument("--latency-ms", type=float, default=10.0, help="Fake API latency per request")
+    arg_parser.add_argument("--jitter-ms", type=float, default=0.0)
+    arg_parser.add_argument("--runs", type=int, default=10, help="Repeated handler invocations")
+    arg_parser.add_argument("--dashboard-runs", type=int, default=5)
+    arg_parser.add_argument("--no-rollups", action="store_true", help="Ingest without maintaining rollups")
+    arg_parser.add_argument("--pipeline", choices=("sequential", "async"), default="sequential")
+    arg_parser.add_argument("--in-flight", type=int, default=4, help="Pages fetched ahead with --pipeline async")
+    arg_parser.add_argument("--json", help="Also write the report to this file")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args)
+
+    ingest = report["ingest"]
+    print(f"ingest:            {ingest['launches']} launches, {ingest['pages']} pages in {ingest['seconds']} s "
+          f"({ingest['launches_per_second']} launches/s)")
+    if ingest["overlap_ratio"] is not None:
+        print(f"{'pipeline:':<19}{ingest['overlap_ms']} ms of fetch/write overlap "
+              f"(ratio {ingest['overlap_ratio']}, in_flight {report['config']['in_flight']})")
+    for name in ("handler_rerun", "dashboard_items", "dashboard_rollups"):
+        stats = report[name]
+        print(f"{name + ':':<19}p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms over {stats['runs']} runs")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Micro-benchmark: per-document normalization loops (the original path: one
+`launch_data` call, then a separate key check, per document) vs the
+single-pass batch normalizer `normalize_page`.
+
+Both paths build exactly the same items (including `date_unix`,
+`launch_month` and the reference-data fields), so the numbers compare the
+loop structure only.
+
+Usage (from compute/lambda):
+    python benchmarks/bench_normalize.py --docs 10000 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import get_validator, key_attributes, normalize_page  # noqa: E402
+from synthetic import make_docs  # noqa: E402
+
+
+def legacy_launch_data(json_data):
+    # One-dict-at-a-time normalizer producing the same fields as normalize_page
+    fairings = json_data.get("fairings") or {}
+    item_id = json_data.get("id") or json_data.get("_id")
+    if item_id is not None:
+        item_id = str(item_id)
+    date_utc = json_data.get("date_utc")
+    try:
+        date_attributes = key_attributes(date_utc) if date_utc else {}
+    except ValueError:
+        date_attributes = {}
+    return {
+        "id": item_id,
+        "flight_number": json_data.get("flight_number"),
+        "mission_name": json_data.get("name"),
+        "rocket_id": json_data.get("rocket"),
+        "rocket_name": json_data.get("rocket"),
+        "launch_date": date_attributes.get("launch_date", date_utc),
+        "launch_month": date_attributes.get("launch_month"),
+        "date_unix": date_attributes.get("date_unix"),
+        "launch_date_precision": json_data.get("date_precision"),
+        "static_fire_date": json_data.get("static_fire_date_utc"),
+        "launch_window": json_data.get("window"),
+        "launch_status": "upcoming" if json_data.get("upcoming") else ("success" if json_data.get("success", False) else "failed"),
+        "launchpad_id": json_data.get("launchpad"),
+        "launchpad_name": None,
+        "crew": bool(json_data.get("crew")),
+        "capsules": bool(json_data.get("capsules")),
+        "fairings_reused": fairings.get("reused"),
+        "fairings_recovery_attempt": fairings.get("recovery_attempt"),
+        "fairings_recovered": fairings.get("recovered"),
+        "details": json_data.get("details"),
+    }
+
+
+def legacy_prepare_item(item):
+    # Former app.prepare_item: separate key check after normalization
+    if not item.get("id") or not item.get("launch_month"):
+        return None
+    return item
+
+
+def legacy_page(validator=None):
+    from pydantic import ValidationError
+
+    def run(docs):
+        # Separate validation, normalization and key-check loops
+        if validator is not None:
+            valid = []
+            for doc in docs:
+                try:
+                    valid.append(validator(doc).model_dump())
+                except ValidationError:
+                    pass
+            docs = valid
+        items = []
+        for doc in docs:
+            item = legacy_launch_data(doc)
+            if legacy_prepare_item(item) is None:
+                continue
+            items.append(item)
+        return items
+    return run
+
+
+def batch_page(validator=None):
+    def run(docs):
+        return normalize_page(docs, validator, {"invalid": 0})
+    return run
+
+
+def best_of(fn, docs, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(docs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--docs", type=int, default=10000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    docs = make_docs(args.docs)
+    slim = get_validator("slim")
+    assert legacy_page()(docs) == batch_page()(docs)
+    assert legacy_page(slim)(docs) == batch_page(slim)(docs)
+
+    cases = [
+        ("per-doc", legacy_page()),
+        ("batch", batch_page()),
+        ("per-doc + slim", legacy_page(slim)),
+        ("batch + slim", batch_page(slim)),
+    ]
+
+    print(f"{'mode':<16}{'ms':>10}{'docs/s':>14}")
+    for name, fn in cases:
+        elapsed = best_of(fn, docs, args.repeat)
+        print(f"{name:<16}{elapsed * 1000:>10.1f}{args.docs / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: raw-dict normalization vs slim-model vs full-model validation.
+
+Usage (from compute/lambda):
+    python benchmarks/bench_validation.py --docs 20000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import get_validator, launch_data  # noqa: E402
+from model import SpaceXResponse  # noqa: E402
+from synthetic import make_docs, make_query_response  # noqa: E402
+
+
+def run_raw(docs):
+    return [launch_data(doc) for doc in docs]
+
+
+def run_model(mode):
+    validator = get_validator(mode)
+
+    def run(docs):
+        return [launch_data(validator(doc).model_dump()) for doc in docs]
+    return run
+
+
+def run_full_response(docs):
+    # Full validation of the whole response document (the original SpaceXResponse path)
+    response = SpaceXResponse.model_validate(make_query_response(docs))
+    return [launch_data(launch.model_dump()) for launch in response.docs]
+
+
+def best_of(fn, docs, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(docs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--docs", type=int, default=20000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    docs = make_docs(args.docs)
+    cases = [
+        ("raw dict", run_raw),
+        ("slim model", run_model("slim")),
+        ("full model", run_model("full")),
+        ("full response", run_full_response),
+    ]
+
+    baseline = None
+    print(f"{'mode':<15}{'seconds':>10}{'docs/s':>14}{'vs raw':>10}")
+    for name, fn in cases:
+        elapsed = best_of(fn, docs, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<15}{elapsed:>10.3f}{args.docs / elapsed:>14,.0f}{elapsed / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Local stand-in for the SpaceX `/v5/launches/query` endpoint.
+
+Serves synthetic documents (see `synthetic.py`) over real HTTP with the
+mongoose-paginate response shape, honouring the `date_utc` range, `sort`,
+`page`/`limit` and `select` options that `app.build_query_payload` sends.
+Also serves `GET /v4/launchpads` and `/v4/rockets` with an ETag, answering
+304 to a matching `If-None-Match` (see `reference.py`). A fixed per-request
+latency (plus optional jitter) simulates the network.
+
+Usage (from compute/lambda):
+    python benchmarks/fake_spacex.py --docs 5000 --latency-ms 20 --port 8765
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic import make_docs, make_launchpads, make_query_response, make_rockets
+
+QUERY_PATH = "/v5/launches/query"
+REFERENCE_PREFIX = "/v4"
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class FakeSpaceXAPI:
+    """Threaded HTTP server with an in-memory launch collection."""
+
+    def __init__(self, docs, latency_ms=0.0, jitter_ms=0.0, max_limit=None, host="127.0.0.1", port=0):
+        self.docs = sorted(docs, key=lambda d: d["date_utc"])
+        self._dates = [_parse_date(d["date_utc"]) for d in self.docs]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_limit = max_limit
+        self.requests = 0
+        self.reference_requests = 0
+        self.reference = {"launchpads": make_launchpads(), "rockets": make_rockets()}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @classmethod
+    def synthetic(cls, count, **kwargs):
+        return cls(make_docs(count), **kwargs)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self):
+        return self.base_url + QUERY_PATH
+
+    @property
+    def reference_url(self):
+        return self.base_url + REFERENCE_PREFIX
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def query(self, body):
+        """Evaluate a /launches/query body and return the paginated response."""
+        date_filter = body.get("query", {}).get("date_utc", {})
+        low = _parse_date(date_filter["$gte"]) if "$gte" in date_filter else None
+        high = _parse_date(date_filter["$lte"]) if "$lte" in date_filter else None
+        matched = [
+            doc for doc, date in zip(self.docs, self._dates)
+            if (low is None or date >= low) and (high is None or date <= high)
+        ]
+
+        options = body.get("options", {})
+        if options.get("sort", {}).get("date_utc") in ("desc", -1):
+            matched.reverse()
+        select = [field for field, keep in options.get("select", {}).items() if keep]
+        if select:
+            # mongoose always returns the document id
+            fields = set(select) | {"id"}
+            matched = [{k: v for k, v in doc.items() if k in fields} for doc in matched]
+
+        limit = int(options.get("limit", 10))
+        if self.max_limit:
+            limit = min(limit, self.max_limit)
+        return make_query_response(matched, page=int(options.get("page", 1)), limit=limit)
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, status, payload=None, headers=()):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload or b"")))
+                self.end_headers()
+                if payload:
+                    self.wfile.write(payload)
+
+            def do_GET(self):
+                collection = self.path[len(REFERENCE_PREFIX) + 1:] if self.path.startswith(REFERENCE_PREFIX + "/") else None
+                if collection not in api.reference:
+                    self.send_error(404)
+                    return
+                with api._lock:
+                    api.reference_requests += 1
+                payload = json.dumps(api.reference[collection]).encode("utf-8")
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send_json(304, headers=[("ETag", etag)])
+                else:
+                    self._send_json(200, payload, headers=[("ETag", etag)])
+
+            def do_POST(self):
+                if self.path != QUERY_PATH:
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with api._lock:
+                    api.requests += 1
+                delay = api.latency_ms + (random.uniform(0, api.jitter_ms) if api.jitter_ms else 0.0)
+                if delay:
+                    time.sleep(delay / 1000.0)
+                self._send_json(200, json.dumps(api.query(body)).encode("utf-8"))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--docs", type=int, default=5000)
+    arg_parser.add_argument("--latency-ms", type=float, default=0.0)
+    arg_parser.add_argument("--jitter-ms", type=float, default=0.0)
+    arg_parser.add_argument("--max-limit", type=int, default=None, help="Cap the page size the server honours")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    args = arg_parser.parse_args(argv)
+
+    api = FakeSpaceXAPI.synthetic(
+        args.docs, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, max_limit=args.max_limit, port=args.port
+    )
+    print(f"Serving {len(api.docs)} launches at {api.url}")
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Synthetic SpaceX `/v5/launches/query` documents for the benchmarks.
+
+Documents carry the full v5 shape (links, cores, failures...) so they validate
+against `model.Launch`, not only against the slim schema.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+LAUNCHPADS = ["5e9e4501f509094ba4566f84", "5e9e4502f509094188566f88", "5e9e4502f509092b78566f87"]
+ROCKETS = ["5e9d0d95eda69973a809d1ec", "5e9d0d95eda69974db09d1ed", "5e9d0d95eda69955f709d1eb"]
+EPOCH = datetime(2006, 3, 24, 22, 30, tzinfo=timezone.utc)
+
+
+def make_launch_doc(i):
+    """Build the i-th synthetic launch document."""
+    date = EPOCH + timedelta(hours=37 * i)
+    upcoming = i % 17 == 0
+    return {
+        "fairings": {"reused": i % 2 == 0, "recovery_attempt": i % 3 == 0, "recovered": i % 5 == 0, "ships": []},
+        "links": {
+            "patch": {"small": f"https://images2.imgbox.com/{i}/small.png", "large": f"https://images2.imgbox.com/{i}/large.png"},
+            "reddit": {"campaign": None, "launch": f"https://www.reddit.com/r/spacex/{i}", "media": None, "recovery": None},
+            "flickr": {
+                "small": [],
+                "original": [f"https://live.staticflickr.com/65535/{i}_{n}_o.jpg" for n in range(6)],
+            },
+            "presskit": None,
+            "webcast": f"https://www.youtube.com/watch?v={i:011d}",
+            "youtube_id": f"{i:011d}",
+            "article": None,
+            "wikipedia": "https://en.wikipedia.org/wiki/Falcon_9",
+        },
+        "static_fire_date_utc": (date - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "static_fire_date_unix": int((date - timedelta(days=7)).timestamp()),
+        "net": False,
+        "window": 0 if i % 4 else 7200,
+        "rocket": ROCKETS[i % len(ROCKETS)],
+        "success": None if upcoming else i % 11 != 0,
+        "failures": [] if i % 11 else [{"time": 139, "altitude": 40, "reason": "synthetic failure"}],
+        "details": f"Synthetic launch number {i} used for benchmarking." * 3,
+        "crew": [{"crew": f"crew-{i}", "role": "Commander"}] if i % 23 == 0 else [],
+        "ships": [],
+        "capsules": [f"capsule-{i}"] if i % 7 == 0 else [],
+        "payloads": [f"payload-{i}-{n}" for n in range(2)],
+        "launchpad": LAUNCHPADS[i % len(LAUNCHPADS)],
+        "flight_number": i + 1,
+        "name": f"Synthetic-{i}",
+        "date_utc": date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "date_unix": int(date.timestamp()),
+        "date_local": date.isoformat(),
+        "date_precision": "hour",
+        "upcoming": upcoming,
+        "cores": [
+            {
+                "core": f"core-{i}",
+                "flight": 1 + i % 5,
+                "gridfins": True,
+                "legs": True,
+                "reused": i % 5 != 0,
+                "landing_attempt": True,
+                "landing_success": i % 9 != 0,
+                "landing_type": "ASDS",
+                "landpad": "5e9e3032383ecb6bb234e7ca",
+            }
+        ],
+        "auto_update": True,
+        "tbd": False,
+        "launch_library_id": None,
+        "id": f"{i:024x}",
+    }
+
+
+def make_docs(count):
+    """Build `count` synthetic launch documents."""
+    return [make_launch_doc(i) for i in range(count)]
+
+
+def make_launchpads():
+    """`/v4/launchpads` documents for the synthetic launchpad ids."""
+    names = [("VAFB SLC 4E", "Vandenberg Space Force Base Space Launch Complex 4E", "Vandenberg", "California"),
+             ("CCSFS SLC 40", "Cape Canaveral Space Force Station Space Launch Complex 40", "Cape Canaveral", "Florida"),
+             ("KSC LC 39A", "Kennedy Space Center Historic Launch Complex 39A", "Cape Canaveral", "Florida")]
+    return [
+        {"id": pad_id, "name": name, "full_name": full_name, "locality": locality, "region": region,
+         "status": "active", "launches": []}
+        for pad_id, (name, full_name, locality, region) in zip(LAUNCHPADS, names)
+    ]
+
+
+def make_rockets():
+    """`/v4/rockets` documents for the synthetic rocket ids."""
+    return [{"id": rocket_id, "name": name, "active": True}
+            for rocket_id, name in zip(ROCKETS, ["Falcon 9", "Falcon Heavy", "Falcon 1"])]
+
+
+def make_query_response(docs, page=1, limit=None):
+    """Wrap docs in a mongoose-paginate response page."""
+    limit = limit or len(docs) or 1
+    total_pages = max(1, -(-len(docs) // limit))
+    start = (page - 1) * limit
+    return {
+        "docs": docs[start:start + limit],
+        "totalDocs": len(docs),
+        "offset": start,
+        "limit": limit,
+        "totalPages": total_pages,
+        "page": page,
+        "pagingCounter": start + 1,
+        "hasPrevPage": page > 1,
+        "hasNextPage": page < total_pages,
+        "prevPage": page - 1 if page > 1 else None,
+        "nextPage": page + 1 if page < total_pages else None,
+    }
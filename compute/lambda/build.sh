@@ -6,9 +6,16 @@
 set -euo pipefail
 
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+# Módulos compartidos con el dashboard (p.ej. date_keys.py)
+SHARED_DIR="$( cd "$SCRIPT_DIR/../shared" && pwd )"
 BUILD_DIR="${SCRIPT_DIR}/build"
 PACKAGE_DIR="${SCRIPT_DIR}/build/package"
 LAMBDA_ZIP="${SCRIPT_DIR}/lambda.zip"
+# Solo las dependencias que no trae el runtime (sin boto3/botocore)
+REQUIREMENTS="${SCRIPT_DIR}/requirements-lambda.txt"
+# Debe coincidir con el runtime de la función (terraform/modules/lambda_iam): los
+# .pyc solo sirven para esa versión de Python
+RUNTIME_PYTHON="3.12"
 
 echo "🔨 Building Lambda deployment package..."
 
@@ -29,27 +36,27 @@ if command -v docker &> /dev/null; then
         -u "$HOST_UID:$HOST_GID" \
         -v "$PACKAGE_DIR":/var/task/package:rw \
         -v "$SCRIPT_DIR":/var/task:ro \
+        -v "$SHARED_DIR":/var/shared:ro \
         --entrypoint /bin/sh \
-        public.ecr.aws/lambda/python:3.12 \
-        -lc 'pip install --no-cache-dir -r /var/task/requirements.txt -t /var/task/package && cp /var/task/app.py /var/task/package/ 2>/dev/null || true && [ -f /var/task/model.py ] && cp /var/task/model.py /var/task/package/ || true'
+        public.ecr.aws/lambda/python:$RUNTIME_PYTHON \
+        -lc 'pip install --no-cache-dir -r /var/task/requirements-lambda.txt -t /var/task/package && cp /var/task/*.py /var/shared/*.py /var/task/package/ 2>/dev/null || true'
 
 else
     echo "⚠️  Docker not found. Falling back to local pip (must be run as non-root to avoid root-owned files)..."
     
     if command -v pip3 &> /dev/null; then
-        pip3 install --no-cache-dir -r "$SCRIPT_DIR/requirements.txt" -t "$PACKAGE_DIR"
+        pip3 install --no-cache-dir -r "$REQUIREMENTS" -t "$PACKAGE_DIR"
     
     elif command -v pip &> /dev/null; then
-        pip install --no-cache-dir -r "$SCRIPT_DIR/requirements.txt" -t "$PACKAGE_DIR"
+        pip install --no-cache-dir -r "$REQUIREMENTS" -t "$PACKAGE_DIR"
     
     else
         echo "❌ pip not found. Cannot install dependencies. Exiting."
         exit 1
     fi
 
-    # Copy lambda files
-    cp "$SCRIPT_DIR/app.py" "$PACKAGE_DIR/"
-    [ -f "$SCRIPT_DIR/model.py" ] && cp "$SCRIPT_DIR/model.py" "$PACKAGE_DIR/" || true
+    # Copy lambda files (app.py, model.py and helper modules)
+    cp "$SCRIPT_DIR"/*.py "$SHARED_DIR"/*.py "$PACKAGE_DIR/"
 fi
 
 # Ensure permissions are writable by the host user
@@ -60,6 +67,25 @@ echo "🧹 Cleaning up unnecessary files in package..."
 find "$PACKAGE_DIR" -type d -name "*.dist-info" -exec rm -rf {} + 2>/dev/null || true
 find "$PACKAGE_DIR" -type d -name "__pycache__" -exec rm -rf {} + 2>/dev/null || true
 find "$PACKAGE_DIR" -type f -name "*.pyc" -delete 2>/dev/null || true
+find "$PACKAGE_DIR" -type d \( -name "tests" -o -name "test" \) -prune -exec rm -rf {} + 2>/dev/null || true
+rm -rf "$PACKAGE_DIR"/bin
+
+# /var/task es de solo lectura: sin .pyc en el zip cada arranque en frío
+# recompila todo lo que importa. `unchecked-hash` evita comparar con el mtime
+# del fuente (el zip lo redondea), así que los .pyc se usan siempre.
+echo "⚙️  Precompiling bytecode for Python $RUNTIME_PYTHON..."
+if command -v docker &> /dev/null; then
+    docker run --rm \
+        -u "$HOST_UID:$HOST_GID" \
+        -v "$PACKAGE_DIR":/var/task/package:rw \
+        --entrypoint /bin/sh \
+        public.ecr.aws/lambda/python:$RUNTIME_PYTHON \
+        -lc 'python -m compileall -q -j 0 --invalidation-mode unchecked-hash /var/task/package'
+elif python3 -c "import sys; sys.exit(sys.version_info[:2] != tuple(map(int, '$RUNTIME_PYTHON'.split('.'))))"; then
+    python3 -m compileall -q -j 0 --invalidation-mode unchecked-hash "$PACKAGE_DIR"
+else
+    echo "⚠️  Local python3 is not $RUNTIME_PYTHON: shipping without precompiled bytecode."
+fi
 
 # Create zip file
 echo "📦 Creating deployment package..."
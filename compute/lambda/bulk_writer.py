@@ -0,0 +1,230 @@
+# Escritura masiva en DynamoDB con BatchWriteItem en paralelo y concurrencia adaptativa
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Límite de peticiones por BatchWriteItem impuesto por DynamoDB
+BATCH_WRITE_MAX_ITEMS = 25
+
+# BatchWriteItem simultáneos como máximo; baja a la mitad ante throttling
+WRITE_CONCURRENCY = int(os.environ.get("WRITE_CONCURRENCY", "4"))
+WRITE_MAX_ATTEMPTS = int(os.environ.get("WRITE_MAX_ATTEMPTS", "8"))
+WRITE_BACKOFF_SECONDS = float(os.environ.get("WRITE_BACKOFF_SECONDS", "0.05"))
+WRITE_MAX_BACKOFF_SECONDS = float(os.environ.get("WRITE_MAX_BACKOFF_SECONDS", "2"))
+
+# Errores de DynamoDB que indican throttling (se reintentan y reducen la concurrencia)
+THROTTLING_ERROR_CODES = frozenset([
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+])
+
+
+class BulkWriteError(Exception):
+    """Quedaron escrituras sin confirmar tras agotar los reintentos."""
+
+    def __init__(self, message, stats):
+        super().__init__(message)
+        self.stats = stats
+
+
+def _error_code(error):
+    # ClientError de botocore sin importarlo: basta con su atributo `response`
+    return (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+
+
+class BulkWriter:
+    """
+    Sustituto de `table.batch_writer()` para la ingesta. Agrupa las escrituras
+    en lotes de 25 y los envía con hasta `max_concurrency` BatchWriteItem en
+    paralelo. De cada respuesta solo se reintentan los `UnprocessedItems`, con
+    backoff exponencial y jitter completo. La concurrencia es AIMD: se reduce a
+    la mitad ante throttling (excepción o items sin procesar) y sube de uno en
+    uno con lotes escritos a la primera.
+
+    Los lotes se envían desde varios hilos, así que `client` debe ser un
+    cliente de boto3 (thread-safe), no el resource: p.ej. el `meta.client` del
+    resource, que acepta tipos de Python. `put_item`/`delete_item` y el
+    contexto `with` se usan desde un único hilo, el que encola, porque el
+    buffer del lote no está protegido. Si un lote falla
+    definitivamente, la siguiente llamada (o la salida del `with`) lanza
+    `BulkWriteError` con los contadores de `stats()`, para poder informar de
+    cuántos items se llegaron a confirmar. Una clave repetida dentro del mismo
+    lote sustituye a la anterior; entre lotes distintos no hay orden.
+    `on_confirmed(requests)` se llama desde el hilo del lote con las peticiones
+    que DynamoDB acaba de aceptar, para derivar efectos secundarios (p.ej. los
+    rollups) solo de lo escrito sin guardar aquí una entrada por clave.
+    """
+
+    def __init__(self, client, table_name, key_names=("id", "launch_date"),
+                 max_concurrency=WRITE_CONCURRENCY, max_attempts=WRITE_MAX_ATTEMPTS,
+                 backoff=WRITE_BACKOFF_SECONDS, max_backoff=WRITE_MAX_BACKOFF_SECONDS,
+                 sleep=time.sleep, jitter=random.uniform, on_confirmed=None):
+        self._client = client
+        self._table_name = table_name
+        self._key_names = tuple(key_names)
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._max_attempts = max(1, int(max_attempts))
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._sleep = sleep
+        self._jitter = jitter
+        self._on_confirmed = on_confirmed
+
+        self._buffer = {}
+        self._pool = None
+        self._futures = []
+        self._cond = threading.Condition()
+        self._limit = self._max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._error = None
+        self._stats = {
+            "queued": 0, "written": 0, "failed": 0, "requests": 0,
+            "retried_items": 0, "throttled": 0, "min_concurrency": self._limit,
+        }
+
+    # --- API compatible con batch_writer ---
+
+    def put_item(self, Item):
+        self._add(tuple(Item[k] for k in self._key_names), {"PutRequest": {"Item": Item}})
+
+    def delete_item(self, Key):
+        self._add(tuple(Key[k] for k in self._key_names), {"DeleteRequest": {"Key": Key}})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            # Se esperan los lotes ya enviados para que los contadores sean exactos
+            self._wait()
+        return False
+
+    # --- Envío ---
+
+    def _add(self, key, request):
+        self._raise_if_failed()
+        if key not in self._buffer:
+            self._stats["queued"] += 1
+        self._buffer[key] = request
+        if len(self._buffer) >= BATCH_WRITE_MAX_ITEMS:
+            self._submit()
+
+    def _submit(self):
+        chunk, self._buffer = list(self._buffer.values()), {}
+        if not chunk:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix="bulk-write")
+        # Contrapresión: se espera a que haya hueco según la concurrencia actual
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+        self._futures.append(self._pool.submit(self._send, chunk))
+        self._futures = [f for f in self._futures if not f.done()]
+
+    def flush(self):
+        """Envía lo pendiente, espera a todos los lotes y lanza BulkWriteError si alguno falló."""
+        self._raise_if_failed()
+        self._submit()
+        self._wait()
+        self._raise_if_failed()
+
+    def _wait(self):
+        for future in self._futures:
+            future.result()
+        self._futures = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            stats = self.stats()
+            raise BulkWriteError(
+                f"{stats['failed']} escrituras sin confirmar ({stats['written']} confirmadas): {self._error}",
+                stats,
+            )
+
+    def _send(self, requests):
+        try:
+            first_try = True
+            for attempt in range(self._max_attempts):
+                if attempt:
+                    self._sleep(self._jitter(0, min(self._max_backoff, self._backoff * (2 ** attempt))))
+                try:
+                    response = self._client.batch_write_item(RequestItems={self._table_name: requests})
+                except Exception as e:
+                    self._count("requests")
+                    if _error_code(e) not in THROTTLING_ERROR_CODES:
+                        return self._fail(requests, e)
+                    self._throttled()
+                    first_try = False
+                    continue
+
+                self._count("requests")
+                unprocessed = (response.get("UnprocessedItems") or {}).get(self._table_name) or []
+                self._confirm(requests, unprocessed)
+                if not unprocessed:
+                    if first_try:
+                        self._succeeded()
+                    return
+                # Items sin procesar = la tabla o la partición está al límite
+                self._count("retried_items", len(unprocessed))
+                self._throttled()
+                first_try = False
+                requests = unprocessed
+            self._fail(requests, f"agotados {self._max_attempts} intentos")
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    # --- Contadores y AIMD ---
+
+    def _request_key(self, request):
+        body = request["PutRequest"]["Item"] if "PutRequest" in request else request["DeleteRequest"]["Key"]
+        return tuple(body[k] for k in self._key_names)
+
+    def _confirm(self, requests, unprocessed):
+        pending = {self._request_key(r) for r in unprocessed}
+        confirmed = [r for r in requests if self._request_key(r) not in pending]
+        with self._cond:
+            self._stats["written"] += len(confirmed)
+        if confirmed and self._on_confirmed is not None:
+            self._on_confirmed(confirmed)
+
+    def _count(self, name, value=1):
+        with self._cond:
+            self._stats[name] += value
+
+    def _fail(self, requests, error):
+        with self._cond:
+            self._stats["failed"] += len(requests)
+            self._error = self._error or error
+
+    def _throttled(self):
+        with self._cond:
+            self._stats["throttled"] += 1
+            self._limit = max(1, self._limit // 2)
+            self._stats["min_concurrency"] = min(self._stats["min_concurrency"], self._limit)
+            self._successes = 0
+
+    def _succeeded(self):
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self._max_concurrency:
+                self._limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def stats(self):
+        """Contadores de la escritura: confirmados, fallidos, reintentos y concurrencia."""
+        with self._cond:
+            return dict(self._stats, concurrency=self._limit)
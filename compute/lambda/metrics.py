@@ -0,0 +1,114 @@
+# Tiempos por etapa de una invocación y su emisión como log EMF de CloudWatch
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "SpaceXIngest")
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+
+
+class StageTimer:
+    """
+    Acumula duración, número de llamadas y elementos procesados por etapa
+    (parseo de fechas, llamada a SpaceX, normalización, escritura...). Una
+    etapa puede medirse varias veces (una por página) y se suma. Es
+    thread-safe: el pipeline async mide descargas y escrituras en hilos
+    distintos; con etapas solapadas la suma puede superar `total_ms`.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._started = clock()
+        self._stages = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, items=0):
+        with self._lock:
+            stage = self._stages.setdefault(name, {"ms": 0.0, "calls": 0, "items": 0})
+            stage["ms"] += seconds * 1000.0
+            stage["calls"] += 1
+            stage["items"] += items
+
+    def add_items(self, name, items):
+        """Suma elementos a una etapa ya medida (p.ej. cuando solo se conocen al final)."""
+        with self._lock:
+            self._stages.setdefault(name, {"ms": 0.0, "calls": 0, "items": 0})["items"] += items
+
+    def gauge(self, name, value, unit="None"):
+        """Valor suelto de la invocación (p.ej. el solapamiento del pipeline async)."""
+        with self._lock:
+            self._gauges[name] = (value, unit)
+
+    @contextmanager
+    def stage(self, name, items=0):
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.record(name, self._clock() - started, items)
+
+    def iterate(self, name, iterable):
+        """Recorre `iterable` midiendo cada `next()` (p.ej. cada página de la API)."""
+        iterator = iter(iterable)
+        while True:
+            started = self._clock()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                self.record(name, self._clock() - started)
+                return
+            self.record(name, self._clock() - started, 1)
+            yield value
+
+    def report(self):
+        """Tiempos redondeados para el cuerpo de la respuesta en modo dev."""
+        with self._lock:
+            stages = {
+                name: {"ms": round(stage["ms"], 2), "calls": stage["calls"], "items": stage["items"]}
+                for name, stage in self._stages.items()
+            }
+        return {"total_ms": round((self._clock() - self._started) * 1000.0, 2), "stages": stages}
+
+    def emf(self, namespace=METRICS_NAMESPACE, dimensions=None, properties=None):
+        """
+        Documento en Embedded Metric Format: CloudWatch extrae `<etapa>_ms` y
+        `<etapa>_items` como métricas a partir de la línea de log, sin llamadas
+        a PutMetricData. `properties` se añade como contexto (no son métricas).
+        """
+        report = self.report()
+        dimensions = dict(dimensions or {})
+        values = {"total_ms": report["total_ms"]}
+        metrics = [{"Name": "total_ms", "Unit": "Milliseconds"}]
+        for name, stage in report["stages"].items():
+            values[f"{name}_ms"] = stage["ms"]
+            metrics.append({"Name": f"{name}_ms", "Unit": "Milliseconds"})
+            values[f"{name}_items"] = stage["items"]
+            metrics.append({"Name": f"{name}_items", "Unit": "Count"})
+        with self._lock:
+            gauges = dict(self._gauges)
+        for name, (value, unit) in gauges.items():
+            values[name] = value
+            metrics.append({"Name": name, "Unit": unit})
+
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": namespace,
+                    "Dimensions": [sorted(dimensions)],
+                    "Metrics": metrics,
+                }],
+            },
+            **dimensions,
+            **(properties or {}),
+            **values,
+            "stages": report["stages"],
+        }
+
+    def emit(self, namespace=METRICS_NAMESPACE, dimensions=None, properties=None, write=None):
+        """Escribe el documento EMF como una sola línea JSON en stdout (CloudWatch Logs)."""
+        if METRICS_ENABLED:
+            (write or print)(json.dumps(self.emf(namespace, dimensions, properties), default=str))
@@ -0,0 +1,82 @@
+# Migración única: añade `launch_month` y `date_unix` a los lanzamientos guardados antes del GSI mensual
+import argparse
+import json
+from datetime import datetime, timezone
+
+from app import get_table, key_attributes
+# `app` ya añade compute/shared al path si hace falta. El marcador de la
+# migración es compartido: el dashboard no usa el GSI `launch_month-index`
+# hasta que existe, porque los items antiguos no tienen `launch_month` y la
+# Query por mes no los vería.
+from sidecars import MIGRATION_KEY, MIGRATION_NAME
+
+DATE_ATTRIBUTES = ("launch_month", "date_unix")
+
+
+def migrate_date_keys(table, dry_run=False):
+    """
+    Recorre la tabla (Scan) y completa con UpdateItem `launch_month` y
+    `date_unix` en los lanzamientos que no los tienen, calculados con
+    `date_keys` igual que en la ingesta. Los sidecars y los rollups se ignoran
+    porque su `launch_date` no es una fecha. Es idempotente: al terminar guarda
+    `MIGRATION_KEY` con la fecha y los contadores. Con `dry_run` solo cuenta.
+    """
+    counts = {"scanned": 0, "updated": 0, "non_canonical": 0, "ignored": 0}
+    kwargs = {
+        "ProjectionExpression": "#id, #launch_date",
+        "FilterExpression": "attribute_not_exists(#launch_month) OR attribute_not_exists(#date_unix)",
+        "ExpressionAttributeNames": {
+            "#id": "id", "#launch_date": "launch_date", "#launch_month": "launch_month", "#date_unix": "date_unix",
+        },
+    }
+    while True:
+        response = table.scan(**kwargs)
+        counts["scanned"] += response.get("ScannedCount", 0)
+        for item in response.get("Items", []):
+            try:
+                attributes = key_attributes(item["launch_date"])
+            except ValueError:
+                counts["ignored"] += 1
+                continue
+            # La clave no se puede cambiar con UpdateItem: si no es canónica se
+            # informa para forzar su reingesta (`force`)
+            if attributes["launch_date"] != item["launch_date"]:
+                counts["non_canonical"] += 1
+            if not dry_run:
+                table.update_item(
+                    Key={"id": item["id"], "launch_date": item["launch_date"]},
+                    UpdateExpression="SET #launch_month = :launch_month, #date_unix = :date_unix",
+                    ConditionExpression="attribute_exists(#id)",
+                    ExpressionAttributeNames={"#id": "id", "#launch_month": "launch_month", "#date_unix": "date_unix"},
+                    ExpressionAttributeValues={
+                        ":launch_month": attributes["launch_month"],
+                        ":date_unix": attributes["date_unix"],
+                    },
+                )
+            counts["updated"] += 1
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    if not dry_run:
+        table.put_item(Item={
+            **MIGRATION_KEY,
+            MIGRATION_NAME: datetime.now(timezone.utc).isoformat(),
+            f"{MIGRATION_NAME}_updated": counts["updated"],
+        })
+    return counts
+
+
+def main(argv=None):
+    """Punto de entrada local: python migrate_date_keys.py [--dry-run]"""
+    arg_parser = argparse.ArgumentParser(description="Completa launch_month/date_unix en los lanzamientos ya guardados")
+    arg_parser.add_argument("--dry-run", action="store_true", help="Solo cuenta los items que se actualizarían")
+    args = arg_parser.parse_args(argv)
+
+    counts = migrate_date_keys(get_table(), dry_run=args.dry_run)
+    print(json.dumps(counts, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
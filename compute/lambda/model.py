@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional, Union
 from pydantic import BaseModel
 
 
@@ -64,7 +64,8 @@ class Launch(BaseModel):
     success: Optional[bool]
     failures: List[dict]
     details: Optional[str]
-    crew: List[str]
+    # v5 returns crew as {"crew": id, "role": ...} objects (older docs: plain ids)
+    crew: List[Union[str, dict]]
     ships: List[str]
     capsules: List[str]
     payloads: List[str]
@@ -99,3 +100,36 @@ class SpaceXResponse(BaseModel):
     hasNextPage: bool
     prevPage: Optional[int]
     nextPage: Optional[int]
+
+
+# -------------------------------
+# Slim models: only the fields launch_data reads
+# -------------------------------
+
+class SlimFairings(BaseModel):
+    reused: Optional[bool] = None
+    recovery_attempt: Optional[bool] = None
+    recovered: Optional[bool] = None
+
+
+class SlimLaunch(BaseModel):
+    """
+    Validates only what `app.launch_data` consumes. Unknown fields (links,
+    cores, failures, ...) are ignored instead of being parsed, which keeps
+    validation cheap compared to the full `Launch` model.
+    """
+    id: str
+    date_utc: str
+    name: Optional[str] = None
+    flight_number: Optional[int] = None
+    rocket: Optional[str] = None
+    date_precision: Optional[str] = None
+    static_fire_date_utc: Optional[str] = None
+    window: Optional[int] = None
+    success: Optional[bool] = None
+    upcoming: bool = False
+    launchpad: Optional[str] = None
+    details: Optional[str] = None
+    crew: List[Any] = []
+    capsules: List[Any] = []
+    fairings: Optional[SlimFairings] = None
@@ -0,0 +1,142 @@
+# Pipeline asyncio de ingesta: solapa la descarga de páginas de SpaceX con la escritura en DynamoDB
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Modo de ingesta del handler: "sequential" (descargar, normalizar y escribir
+# página a página) o "async" (este módulo)
+INGEST_PIPELINES = ("sequential", "async")
+DEFAULT_PIPELINE = os.environ.get("INGEST_PIPELINE", "sequential").lower()
+
+# Páginas pedidas a la API que aún no se han escrito (en vuelo o esperando)
+DEFAULT_IN_FLIGHT = int(os.environ.get("PIPELINE_IN_FLIGHT", "4"))
+
+
+def busy_intervals(intervals):
+    """Une intervalos (inicio, fin) solapados y devuelve la lista ordenada."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def busy_time(intervals):
+    return sum(end - start for start, end in busy_intervals(intervals))
+
+
+def overlap_time(a, b):
+    """Tiempo en que hay actividad a la vez en `a` y en `b` (listas de intervalos)."""
+    a, b = busy_intervals(a), busy_intervals(b)
+    total, i, j = 0.0, 0, 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            total += end - start
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+
+async def _ingest(fetch, process, in_flight, timer, clock):
+    """
+    La API y DynamoDB son bloqueantes (requests y boto3), así que el bucle de
+    eventos solo coordina: las descargas van a un pool de `in_flight` hilos y
+    la escritura a un único hilo, porque el writer no es thread-safe. Las
+    páginas se escriben en orden y, además de la que se está escribiendo y la
+    siguiente, nunca hay más de `in_flight` pedidas, así que la memoria sigue
+    acotada.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    fetch_pool = ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="fetch")
+    write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="write")
+    fetch_spans, write_spans = [], []
+
+    def timed(spans, fn, *args):
+        started = clock()
+        try:
+            return fn(*args)
+        finally:
+            spans.append((started, clock()))
+
+    async def fetch_page(page):
+        started = clock()
+        data = await loop.run_in_executor(fetch_pool, timed, fetch_spans, fetch, page)
+        timer.record("fetch", clock() - started, 1)
+        return data
+
+    pending = deque()
+    writing = None
+    pages = 0
+    started = clock()
+    try:
+        first = await fetch_page(1)
+        total_pages = first.get("totalPages")
+        next_page = 2
+        ready = loop.create_future()
+        ready.set_result(first)
+        pending.append(ready)
+
+        while pending:
+            data = await pending.popleft()
+            # Sin totalPages solo se conoce la siguiente página al recibir esta
+            if total_pages is None and data.get("hasNextPage") and data.get("nextPage"):
+                pending.append(asyncio.ensure_future(fetch_page(data["nextPage"])))
+            while total_pages is not None and next_page <= total_pages and len(pending) < in_flight:
+                pending.append(asyncio.ensure_future(fetch_page(next_page)))
+                next_page += 1
+
+            # La escritura de la página anterior termina antes de empezar esta;
+            # mientras tanto las descargas de `pending` siguen en curso
+            if writing is not None:
+                await writing
+            writing = loop.run_in_executor(write_pool, timed, write_spans, process, data.get("docs", []))
+            pages += 1
+
+        if writing is not None:
+            await writing
+            writing = None
+    finally:
+        for task in pending:
+            task.cancel()
+        if writing is not None:
+            # Nunca se sale con una escritura a medias sobre el writer
+            await asyncio.gather(writing, return_exceptions=True)
+        await asyncio.gather(*pending, return_exceptions=True)
+        fetch_pool.shutdown(wait=True)
+        write_pool.shutdown(wait=True)
+
+    wall = clock() - started
+    fetch_busy, write_busy = busy_time(fetch_spans), busy_time(write_spans)
+    overlap = overlap_time(fetch_spans, write_spans)
+    return {
+        "pipeline": "async",
+        "in_flight": in_flight,
+        "pages": pages,
+        "wall_ms": round(wall * 1000.0, 2),
+        "fetch_busy_ms": round(fetch_busy * 1000.0, 2),
+        "write_busy_ms": round(write_busy * 1000.0, 2),
+        "overlap_ms": round(overlap * 1000.0, 2),
+        # Fracción del trabajo más corto que quedó oculta tras el otro (0 = secuencial)
+        "overlap_ratio": round(overlap / min(fetch_busy, write_busy), 3) if min(fetch_busy, write_busy) else 0.0,
+    }
+
+
+def run_pipeline(fetch, process, timer, in_flight=DEFAULT_IN_FLIGHT, clock=time.perf_counter):
+    """
+    Ingiere todas las páginas con descarga y escritura solapadas. `fetch(page)`
+    devuelve la respuesta paginada de la API; `process(docs)` normaliza y
+    escribe una página (se llama siempre desde el mismo hilo, en orden).
+    Devuelve las estadísticas de solapamiento.
+    """
+    # asyncio solo se importa si se usa el pipeline (no en el arranque en frío)
+    import asyncio
+
+    return asyncio.run(_ingest(fetch, process, max(1, int(in_flight)), timer, clock))
@@ -0,0 +1,110 @@
+# Datos de referencia de SpaceX (launchpads y cohetes) cacheados para enriquecer lanzamientos
+import os
+import sys
+import threading
+import time
+
+try:
+    from sidecars import REFERENCE_KEY
+except ImportError:  # ejecución desde el repo: el módulo compartido vive en compute/shared
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+    from sidecars import REFERENCE_KEY
+
+REFERENCE_URL = os.environ.get("SPACEX_REFERENCE_URL", "https://api.spacexdata.com/v4")
+REFERENCE_ENABLED = os.environ.get("REFERENCE_ENABLED", "true").lower() == "true"
+REFERENCE_TTL_SECONDS = int(os.environ.get("REFERENCE_TTL_SECONDS", str(24 * 3600)))
+# Si la API falla se sigue con lo que haya y se reintenta pasado este tiempo
+REFERENCE_RETRY_SECONDS = int(os.environ.get("REFERENCE_RETRY_SECONDS", "300"))
+
+# Colecciones de /v4 y campos que se conservan de cada documento
+COLLECTIONS = {
+    "launchpads": ("name", "full_name", "locality", "region"),
+    "rockets": ("name",),
+}
+
+_cache = {"data": None, "expires_at": 0.0}
+_cache_lock = threading.Lock()
+
+
+def empty_reference():
+    return {**{name: {} for name in COLLECTIONS}, "etags": {}, "fetched_at": 0, "expires_at": 0}
+
+
+def index_collection(docs, fields):
+    """{id: {campo: valor}} con solo `fields` de cada documento."""
+    return {str(doc["id"]): {f: doc.get(f) for f in fields} for doc in docs if doc.get("id")}
+
+
+def _from_item(item):
+    data = empty_reference()
+    for name in COLLECTIONS:
+        data[name] = dict(item.get(name) or {})
+    data["etags"] = dict(item.get("etags") or {})
+    # DynamoDB devuelve los números como Decimal
+    data["fetched_at"] = int(item.get("fetched_at") or 0)
+    data["expires_at"] = int(item.get("expires_at") or 0)
+    return data
+
+
+def read_reference(table):
+    """Lee el ítem de referencia de DynamoDB (None si no existe)."""
+    item = table.get_item(Key=REFERENCE_KEY).get("Item")
+    return _from_item(item) if item else None
+
+
+def refresh_reference(client, table, current=None, base_url=REFERENCE_URL, ttl=REFERENCE_TTL_SECONDS, now=None):
+    """
+    Descarga las colecciones completas (una petición por colección, no por
+    lanzamiento) con GET condicional: si el ETag guardado sigue vigente la API
+    responde 304 y se conserva lo que había. Guarda el resultado en DynamoDB.
+    """
+    now = int(time.time() if now is None else now)
+    data = _from_item(current) if current else empty_reference()
+    for name, fields in COLLECTIONS.items():
+        docs, etag = client.get(f"{base_url.rstrip('/')}/{name}", etag=data["etags"].get(name))
+        if docs is not None:
+            data[name] = index_collection(docs, fields)
+        if etag:
+            data["etags"][name] = etag
+    data["fetched_at"] = now
+    data["expires_at"] = now + ttl
+    table.put_item(Item={**REFERENCE_KEY, **data})
+    return data
+
+
+def load_reference(client, table, ttl=REFERENCE_TTL_SECONDS, clock=time.time, base_url=REFERENCE_URL, errors=None):
+    """
+    Devuelve los datos de referencia: primero de memoria (invocaciones warm),
+    después del ítem de DynamoDB y, si ha caducado, de la API. Nunca lanza
+    excepción: si no se puede refrescar se usa la copia caducada (o una vacía)
+    y los items se escriben sin nombres. El motivo del fallo se añade a la
+    lista `errors`, si se pasa, para que el llamador lo informe.
+    """
+    now = clock()
+    with _cache_lock:
+        if _cache["data"] is not None and _cache["expires_at"] > now:
+            return _cache["data"]
+
+    data = None
+    expires_at = now + REFERENCE_RETRY_SECONDS
+    try:
+        data = read_reference(table)
+        if data is None or data["expires_at"] <= now:
+            data = refresh_reference(client, table, data, base_url=base_url, ttl=ttl, now=now)
+        expires_at = data["expires_at"]
+    except Exception as e:
+        if errors is not None:
+            errors.append(f"No se pudieron refrescar los datos de referencia: {e}")
+        with _cache_lock:
+            data = data or _cache["data"] or empty_reference()
+
+    with _cache_lock:
+        _cache["data"] = data
+        _cache["expires_at"] = float(expires_at)
+    return data
+
+
+def reset_reference_cache():
+    with _cache_lock:
+        _cache["data"] = None
+        _cache["expires_at"] = 0.0
@@ -0,0 +1,218 @@
+# Contadores pre-agregados (rollups) de lanzamientos por día y por mes
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Los rollups viven en la misma tabla que los lanzamientos. El prefijo y la
+# forma de las claves se comparten con el dashboard (compute/shared/sidecars.py)
+try:
+    from sidecars import ROLLUP_PREFIX, rollup_key
+except ImportError:  # ejecución desde el repo: el módulo compartido vive en compute/shared
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+    from sidecars import ROLLUP_PREFIX, rollup_key
+
+# Atributos del lanzamiento que alimentan los contadores (se leen en la pre-lectura)
+ROLLUP_SOURCE_ATTRIBUTES = ("launch_status", "launchpad_id")
+# Lo que se conserva de cada item encolado hasta aplicar sus rollups
+ROLLUP_ITEM_ATTRIBUTES = ("launch_date",) + ROLLUP_SOURCE_ATTRIBUTES
+
+TOTAL_COUNTER = "n_total"
+STATUS_COUNTER_PREFIX = "n_status_"
+PAD_COUNTER_PREFIX = "n_pad_"
+
+ROLLUPS_ENABLED = os.environ.get("ROLLUPS_ENABLED", "true").lower() == "true"
+# UpdateItem de rollups simultáneos al aplicar los deltas de una invocación
+ROLLUP_CONCURRENCY = int(os.environ.get("ROLLUP_CONCURRENCY", "16"))
+
+
+def rollup_keys(launch_date):
+    """
+    Claves de los rollups afectados por un lanzamiento: el de su día y el de su
+    mes (ver `sidecars.rollup_key` para la forma de las claves).
+    """
+    day, month = launch_date[:10], launch_date[:7]
+    return [
+        ("day", day, rollup_key("day", day)),
+        ("month", month, rollup_key("month", month)),
+    ]
+
+
+def is_rollup(item):
+    return str(item.get("id", "")).startswith(ROLLUP_PREFIX)
+
+
+def _counters(item):
+    return [
+        TOTAL_COUNTER,
+        f"{STATUS_COUNTER_PREFIX}{item.get('launch_status') or 'unknown'}",
+        f"{PAD_COUNTER_PREFIX}{item.get('launchpad_id') or 'unknown'}",
+    ]
+
+
+def add_rollup_deltas(deltas, item, previous=None):
+    """
+    Acumula en `deltas` los cambios de contadores que provoca escribir `item`.
+    `previous` es lo que había guardado con la misma clave (None si es nuevo):
+    un cambio de estado o de launchpad resta del contador antiguo y suma al
+    nuevo. Si no cambia ninguno de los dos no hay delta.
+    """
+    new = Counter(_counters(item))
+    old = Counter(_counters(previous)) if previous is not None else Counter()
+    change = Counter(new)
+    change.subtract(old)
+    change = {name: value for name, value in change.items() if value}
+    if not change:
+        return deltas
+
+    for granularity, period, key in rollup_keys(item["launch_date"]):
+        entry = deltas[(key["id"], key["launch_date"])]
+        entry["key"] = key
+        entry["granularity"] = granularity
+        entry["period"] = period
+        entry["counters"].update(change)
+    return deltas
+
+
+def new_deltas():
+    return defaultdict(lambda: {"counters": Counter()})
+
+
+class PendingRollups:
+    """
+    Rollups de las escrituras encoladas que aún no ha confirmado DynamoDB.
+    `track` anota el estado anterior y el nuevo de cada item encolado;
+    `confirm` (el `on_confirmed` de `BulkWriter`) los pasa a los deltas
+    agregados en cuanto su lote se confirma y los olvida. Así solo se guarda
+    una entrada por escritura en vuelo y un delta por rollup (día o mes), no
+    una entrada por lanzamiento escrito en toda la ejecución. Lo que nunca se
+    confirma no se cuenta: la siguiente ingesta lo verá como nuevo.
+    `confirm` se llama desde los hilos del writer, de ahí el lock.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._deltas = new_deltas()
+        self._lock = threading.Lock()
+
+    def track(self, item, previous=None):
+        """Anota la escritura encolada de `item`; `previous` es lo que había guardado."""
+        key = (item["id"], item["launch_date"])
+        state = {name: item.get(name) for name in ROLLUP_ITEM_ATTRIBUTES}
+        with self._lock:
+            # Si la clave ya estaba en vuelo se cuenta desde el estado anterior
+            # a esa escritura, no desde la pre-lectura (que puede no verla aún)
+            entry = self._pending.get(key)
+            self._pending[key] = {"before": entry["before"] if entry else previous, "after": state}
+
+    def confirm(self, requests):
+        """Suma a los deltas las escrituras de `requests` ya confirmadas."""
+        with self._lock:
+            for request in requests:
+                item = request.get("PutRequest", {}).get("Item")
+                if item is None:
+                    continue
+                key = (item["id"], item["launch_date"])
+                entry = self._pending.get(key)
+                if entry is None:
+                    continue
+                state = {name: item.get(name) for name in ROLLUP_ITEM_ATTRIBUTES}
+                add_rollup_deltas(self._deltas, state, entry["before"])
+                if state == entry["after"]:
+                    del self._pending[key]
+                else:
+                    # Se confirmó una escritura anterior de la misma clave y la
+                    # última sigue en vuelo: su punto de partida es lo confirmado
+                    entry["before"] = state
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def take_deltas(self):
+        """Devuelve los deltas acumulados y empieza otros vacíos."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, new_deltas()
+        return deltas
+
+
+def _update_rollup(client, table_name, entry):
+    counters = {name: value for name, value in entry["counters"].items() if value}
+    if not counters:
+        return 0
+    names = {"#granularity": "granularity", "#period": "period"}
+    values = {":granularity": entry["granularity"], ":period": entry["period"]}
+    adds = []
+    for i, (name, value) in enumerate(sorted(counters.items())):
+        names[f"#c{i}"] = name
+        values[f":c{i}"] = value
+        adds.append(f"#c{i} :c{i}")
+    client.update_item(
+        TableName=table_name,
+        Key=entry["key"],
+        UpdateExpression="SET #granularity = :granularity, #period = :period ADD " + ", ".join(adds),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+    )
+    return 1
+
+
+def apply_rollup_deltas(table, deltas, max_workers=ROLLUP_CONCURRENCY):
+    """
+    Aplica los deltas con un UpdateItem por rollup (`ADD` sobre los contadores),
+    hasta `max_workers` a la vez. Usa `table.meta.client`, que es thread-safe
+    (el resource no) y, al venir del resource, acepta tipos de Python.
+    Devuelve el número de rollups actualizados. Cada delta sale de comparar con
+    lo leído antes de escribir, sin condición, así que dos ingestas simultáneas
+    sobre los mismos lanzamientos pueden contarlos dos veces: la Lambda no se
+    solapa consigo misma (una ejecución cada 6 h), y ante cualquier duda
+    `rebuild_rollups` recalcula los contadores desde cero.
+    """
+    entries = list(deltas.values())
+    if not entries:
+        return 0
+    client = table.meta.client
+    workers = max(1, min(max_workers, len(entries)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rollups") as pool:
+        return sum(pool.map(lambda entry: _update_rollup(client, table.name, entry), entries))
+
+
+def rebuild_rollups(table):
+    """
+    Recalcula todos los rollups desde cero a partir de los lanzamientos (Scan
+    completo). Sirve para inicializarlos sobre una tabla ya cargada o para
+    corregir una deriva tras una ingesta interrumpida entre la escritura de los
+    items y la de sus contadores.
+    """
+    launches = []
+    stale = set()
+    kwargs = {"ProjectionExpression": "id, launch_date, launch_status, launchpad_id"}
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            if is_rollup(item):
+                stale.add((item["id"], item["launch_date"]))
+            elif item.get("launch_status") is not None:
+                launches.append(item)
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    deltas = new_deltas()
+    for item in launches:
+        add_rollup_deltas(deltas, item)
+
+    with table.batch_writer() as batch:
+        for key, entry in deltas.items():
+            batch.put_item(Item={
+                **entry["key"],
+                "granularity": entry["granularity"],
+                "period": entry["period"],
+                **dict(entry["counters"]),
+            })
+            stale.discard(key)
+        for rollup_id, launch_date in stale:
+            batch.delete_item(Key={"id": rollup_id, "launch_date": launch_date})
+
+    return {"launches": len(launches), "rollups": len(deltas), "deleted": len(stale)}
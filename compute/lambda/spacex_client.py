@@ -0,0 +1,124 @@
+# Cliente HTTP para la API de SpaceX
+import os
+import threading
+import time
+
+# Códigos para los que se reintenta con backoff exponencial
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class SpaceXClient:
+    """
+    Cliente para la API de SpaceX basado en un `requests.Session`.
+
+    Se construye una sola vez a nivel de módulo para que las invocaciones
+    "warm" de la Lambda reutilicen las conexiones keep-alive del pool en vez
+    de pagar un handshake TCP+TLS por ejecución. Aplica timeouts de conexión
+    y lectura, reintentos con backoff exponencial ante 429/5xx, y lleva
+    contadores de latencia por llamada. `requests` se importa al crear la
+    sesión (primer uso), no al importar el módulo.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=6.0, max_retries=2,
+                 backoff_factor=0.5, pool_maxsize=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._pool_maxsize = pool_maxsize
+        self._session = None
+
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self._max_retries,
+            backoff_factor=self._backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            # /launches/query es de solo lectura aunque use POST
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=self._pool_maxsize)
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @classmethod
+    def from_env(cls):
+        """Crea el cliente leyendo la configuración de variables de entorno."""
+        return cls(
+            connect_timeout=float(os.environ.get("SPACEX_CONNECT_TIMEOUT", "3.05")),
+            read_timeout=float(os.environ.get("SPACEX_READ_TIMEOUT", "6")),
+            max_retries=int(os.environ.get("SPACEX_MAX_RETRIES", "2")),
+            backoff_factor=float(os.environ.get("SPACEX_BACKOFF_FACTOR", "0.5")),
+            pool_maxsize=int(os.environ.get("SPACEX_POOL_MAXSIZE", "10")),
+        )
+
+    def reset_stats(self):
+        """Reinicia los contadores de latencia (se llama al inicio de cada invocación)."""
+        with self._lock:
+            self._stats = {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def stats(self):
+        """Devuelve una copia de los contadores con la latencia media calculada."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_ms"] = stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+        return {k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()}
+
+    def _record(self, elapsed_ms, failed):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["total_ms"] += elapsed_ms
+            self._stats["max_ms"] = max(self._stats["max_ms"], elapsed_ms)
+            if failed:
+                self._stats["errors"] += 1
+
+    def post(self, url, payload):
+        """Hace un POST JSON y devuelve el cuerpo decodificado; lanza excepción si falla."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            failed = False
+            return data
+        finally:
+            self._record((time.perf_counter() - start) * 1000.0, failed)
+
+    def get(self, url, etag=None):
+        """
+        GET condicional: envía `If-None-Match` si hay `etag`. Devuelve
+        (datos, etag); los datos son None si el servidor responde 304.
+        """
+        start = time.perf_counter()
+        failed = True
+        try:
+            headers = {"If-None-Match": etag} if etag else {}
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                failed = False
+                return None, etag
+            response.raise_for_status()
+            data = response.json()
+            failed = False
+            return data, response.headers.get("ETag")
+        finally:
+            self._record((time.perf_counter() - start) * 1000.0, failed)
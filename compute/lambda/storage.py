@@ -0,0 +1,84 @@
+# Helpers de DynamoDB para la Lambda de ingesta
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+
+# Ítem "sidecar" con el checkpoint de ingesta incremental. Usa la misma tabla que
+# los lanzamientos; su `launch_date` no es una fecha ISO, así que nunca cae dentro
+# de los rangos que consulta el dashboard.
+CHECKPOINT_KEY = {"id": "__checkpoint__", "launch_date": "__checkpoint__"}
+
+# Atributo con el hash del contenido normalizado de cada lanzamiento
+HASH_ATTRIBUTE = "content_hash"
+
+# Límite de claves por BatchGetItem impuesto por DynamoDB
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BACKOFF_SECONDS = 0.05
+
+
+def load_checkpoint(table):
+    """
+    Lee el checkpoint de ingesta. Devuelve un dict con `watermark` (fin de la
+    última ventana ingerida) y `pending_date_utc` (lanzamiento `upcoming` más
+    antiguo visto, que puede seguir cambiando), o None si no existe.
+    """
+    response = table.get_item(Key=CHECKPOINT_KEY, ConsistentRead=True)
+    item = response.get("Item")
+    if not item or not item.get("watermark"):
+        return None
+    return {
+        "watermark": item["watermark"],
+        "pending_date_utc": item.get("pending_date_utc"),
+        "last_date_utc": item.get("last_date_utc"),
+    }
+
+
+def save_checkpoint(table, watermark, pending_date_utc=None, last_date_utc=None):
+    """Guarda el checkpoint tras una ingesta incremental completada con éxito."""
+    item = dict(CHECKPOINT_KEY)
+    item["watermark"] = watermark
+    item["updated_at"] = datetime.now(timezone.utc).isoformat()
+    if pending_date_utc:
+        item["pending_date_utc"] = pending_date_utc
+    if last_date_utc:
+        item["last_date_utc"] = last_date_utc
+    table.put_item(Item=item)
+    return item
+
+
+def content_hash(item):
+    """Hash estable del item normalizado (sin el propio atributo de hash)."""
+    data = {k: v for k, v in item.items() if k != HASH_ATTRIBUTE}
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def fetch_existing_items(dynamodb, table_name, keys, attributes=(HASH_ATTRIBUTE,)):
+    """
+    Lee con BatchGetItem los `attributes` guardados para cada clave
+    (`id`, `launch_date`). Devuelve {(id, launch_date): item}; las claves que no
+    existen en la tabla no aparecen en el resultado.
+    """
+    unique_keys = list({(k["id"], k["launch_date"]): k for k in keys}.values())
+    projection = ", ".join(["id", "launch_date", *attributes])
+    existing = {}
+    for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+        request = {
+            table_name: {
+                "Keys": unique_keys[start:start + BATCH_GET_MAX_KEYS],
+                "ProjectionExpression": projection,
+            }
+        }
+        # Las claves que sigan sin procesar tras los reintentos se tratan como nuevas
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get("Responses", {}).get(table_name, []):
+                existing[(item["id"], item["launch_date"])] = item
+
+            request = response.get("UnprocessedKeys") or {}
+            if not request.get(table_name, {}).get("Keys"):
+                break
+            time.sleep(BATCH_GET_BACKOFF_SECONDS * (2 ** attempt))
+    return existing
@@ -17,3 +17,12 @@ def setup_env():
     os.environ["ENVIRONMENT"] = "dev"
     os.environ["AWS_REGION"] = "us-east-1"
     yield
+
+
+@pytest.fixture(autouse=True)
+def reset_dynamodb_cache():
+    """Reset the module-level DynamoDB table cache between tests"""
+    import app
+    app.reset_dynamodb_cache()
+    yield
+    app.reset_dynamodb_cache()
@@ -1,5 +1,7 @@
 import unittest
 import json
+import threading
+import time
 import sys
 import os
 from datetime import datetime, timedelta, timezone
@@ -8,7 +10,33 @@ from unittest.mock import patch, MagicMock
 # Add parent directory to path so we can import app
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Reference data is fetched over HTTP; tests that need it patch app.REFERENCE_ENABLED
+os.environ.setdefault("REFERENCE_ENABLED", "false")
+
+import app
 from app import lambda_handler, launch_data
+from backfill import backfill_handler, split_range
+from botocore.exceptions import ClientError
+from bulk_writer import BulkWriteError, BulkWriter
+from date_keys import date_key, day_range_keys, day_range_unix, key_attributes, month_bucket
+from metrics import StageTimer
+from migrate_date_keys import MIGRATION_KEY, MIGRATION_NAME, migrate_date_keys
+from pipeline import busy_time, overlap_time, run_pipeline
+from reference import REFERENCE_KEY, load_reference, refresh_reference, reset_reference_cache
+from rollups import PendingRollups, add_rollup_deltas, apply_rollup_deltas, new_deltas, rebuild_rollups, rollup_keys
+from storage import content_hash, fetch_existing_items
+from spacex_client import SpaceXClient
+
+
+def written_items(dynamodb):
+    """Items sent with BatchWriteItem through a mocked DynamoDB client"""
+    return [
+        request["PutRequest"]["Item"]
+        for call in dynamodb.batch_write_item.call_args_list
+        for requests in call.kwargs["RequestItems"].values()
+        for request in requests
+        if "PutRequest" in request
+    ]
 
 
 class TestLaunchDataFunction(unittest.TestCase):
@@ -61,6 +89,7 @@ class TestLaunchDataFunction(unittest.TestCase):
         self.assertEqual(result["launch_status"], "success")
         self.assertEqual(result["crew"], False)
         self.assertEqual(result["capsules"], False)
+        self.assertEqual(result["launch_month"], "2017-06")
 
     def test_launch_data_status_upcoming(self):
         """Test launch status for upcoming launch"""
@@ -86,7 +115,7 @@ class TestLambdaHandler(unittest.TestCase):
         os.environ["DYNAMODB_TABLE"] = "test-launches-table"
         os.environ["ENVIRONMENT"] = "dev"
 
-    @patch('app.requests.post')
+    @patch('app.SPACEX_CLIENT.session.post')
     @patch('app.boto3.resource')
     def test_lambda_handler_success(self, mock_dynamodb, mock_requests):
         """Test successful Lambda execution with SpaceX API response"""
@@ -116,6 +145,8 @@ class TestLambdaHandler(unittest.TestCase):
         # Mock DynamoDB
         mock_table = MagicMock()
         mock_dynamodb.return_value.Table.return_value = mock_table
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
 
         # Create test event
         event = {
@@ -134,7 +165,7 @@ class TestLambdaHandler(unittest.TestCase):
         self.assertIn("end_time", body)
         self.assertIn("lauch_items", body)
 
-    @patch('app.requests.post')
+    @patch('app.SPACEX_CLIENT.session.post')
     @patch('app.boto3.resource')
     def test_lambda_handler_with_custom_date(self, mock_dynamodb, mock_requests):
         """Test Lambda with custom UTC date parameter"""
@@ -158,7 +189,7 @@ class TestLambdaHandler(unittest.TestCase):
         body = json.loads(response["body"])
         self.assertEqual(body["inserted_items"], 0)
 
-    @patch('app.requests.post')
+    @patch('app.SPACEX_CLIENT.session.post')
     @patch('app.boto3.resource')
     def test_lambda_handler_api_error(self, mock_dynamodb, mock_requests):
         """Test Lambda when SpaceX API fails"""
@@ -172,7 +203,7 @@ class TestLambdaHandler(unittest.TestCase):
         body = json.loads(response["body"])
         self.assertIn("error", body)
 
-    @patch('app.requests.post')
+    @patch('app.SPACEX_CLIENT.session.post')
     @patch('app.boto3.resource')
     def test_lambda_handler_invalid_date(self, mock_dynamodb, mock_requests):
         """Test Lambda with invalid date format"""
@@ -188,7 +219,18 @@ class TestLambdaHandler(unittest.TestCase):
         self.assertIn("error", body)
         self.assertIn("Formato de fecha no válido", body["error"])
 
-    @patch('app.requests.post')
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_invalid_page_limit(self, mock_dynamodb, mock_requests):
+        """Test that a non-numeric or non-positive page_limit is a client error"""
+        for page_limit in ("x", 0, -5, None):
+            response = lambda_handler({"offset_seconds": 60, "page_limit": page_limit}, None)
+
+            self.assertEqual(response["statusCode"], 400)
+            self.assertIn("page_limit no válido", json.loads(response["body"])["error"])
+        mock_requests.assert_not_called()
+
+    @patch('app.SPACEX_CLIENT.session.post')
     @patch('app.boto3.resource')
     def test_lambda_handler_multiple_launches(self, mock_dynamodb, mock_requests):
         """Test Lambda with multiple launches from API"""
@@ -231,6 +273,8 @@ class TestLambdaHandler(unittest.TestCase):
 
         mock_table = MagicMock()
         mock_dynamodb.return_value.Table.return_value = mock_table
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
 
         event = {"offset_seconds": 2592000}
         response = lambda_handler(event, None)
@@ -239,7 +283,7 @@ class TestLambdaHandler(unittest.TestCase):
         body = json.loads(response["body"])
         self.assertEqual(body["inserted_items"], 2)
 
-    @patch('app.requests.post')
+    @patch('app.SPACEX_CLIENT.session.post')
     @patch('app.boto3.resource')
     def test_lambda_handler_prod_mode(self, mock_dynamodb, mock_requests):
         """Test Lambda in production mode (no detailed response)"""
@@ -266,6 +310,1443 @@ class TestLambdaHandler(unittest.TestCase):
         os.environ["ENVIRONMENT"] = "dev"
 
 
+class TestPagination(unittest.TestCase):
+    """Test that lambda_handler follows SpaceX query pagination"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+
+    @staticmethod
+    def _page(ids, next_page):
+        """Build a SpaceX query response page"""
+        response = MagicMock()
+        response.json.return_value = {
+            "docs": [
+                {"id": launch_id, "date_utc": "2017-06-23T19:10:00.000Z", "success": True}
+                for launch_id in ids
+            ],
+            "hasNextPage": next_page is not None,
+            "nextPage": next_page,
+        }
+        return response
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_follows_next_page(self, mock_dynamodb, mock_requests):
+        """Test that every page is fetched and written"""
+        mock_requests.side_effect = [
+            self._page(["a", "b"], 2),
+            self._page(["c", "d"], 3),
+            self._page(["e"], None),
+        ]
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 2592000, "page_limit": 2}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        body = json.loads(response["body"])
+        self.assertEqual(body["inserted_items"], 5)
+        self.assertEqual(body["pages"], 3)
+        self.assertEqual(len(written_items(mock_dynamodb.return_value.meta.client)), 5)
+
+        pages = [call.kwargs["json"]["options"]["page"] for call in mock_requests.call_args_list]
+        self.assertEqual(pages, [1, 2, 3])
+        limits = {call.kwargs["json"]["options"]["limit"] for call in mock_requests.call_args_list}
+        self.assertEqual(limits, {2})
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_api_error_on_later_page(self, mock_dynamodb, mock_requests):
+        """Test that an API failure after the first page is reported as an API error"""
+        mock_requests.side_effect = [self._page(["a"], 2), Exception("Connection reset")]
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 2592000}, None)
+
+        self.assertEqual(response["statusCode"], 500)
+        body = json.loads(response["body"])
+        self.assertIn("Error llamando a SpaceX API", body["error"])
+
+
+class TestSpaceXClient(unittest.TestCase):
+    """Test the pooled, retrying SpaceX HTTP client"""
+
+    def test_client_mounts_retrying_adapter(self):
+        """Test that retries on 429/5xx and pooling are configured"""
+        client = SpaceXClient(max_retries=4, backoff_factor=0.25, pool_maxsize=7)
+        adapter = client.session.get_adapter("https://api.spacexdata.com")
+
+        self.assertEqual(adapter.max_retries.total, 4)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.25)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertIn("POST", adapter.max_retries.allowed_methods)
+        self.assertEqual(adapter._pool_maxsize, 7)
+
+    def test_client_post_uses_timeout_and_records_stats(self):
+        """Test that calls are bounded by the timeout and counted"""
+        client = SpaceXClient(connect_timeout=1.5, read_timeout=4.0)
+        with patch.object(client.session, "post") as mock_post:
+            mock_post.return_value.json.return_value = {"docs": []}
+            data = client.post("https://example.test/query", {"query": {}})
+
+            self.assertEqual(data, {"docs": []})
+            self.assertEqual(mock_post.call_args.kwargs["timeout"], (1.5, 4.0))
+
+            mock_post.side_effect = Exception("timeout")
+            with self.assertRaises(Exception):
+                client.post("https://example.test/query", {"query": {}})
+
+        stats = client.stats()
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["errors"], 1)
+        self.assertIn("avg_ms", stats)
+
+        client.reset_stats()
+        self.assertEqual(client.stats()["calls"], 0)
+
+    def test_session_is_created_on_first_use(self):
+        """Test that building the client does not open a session until a request needs it"""
+        client = SpaceXClient()
+        self.assertIsNone(client._session)
+        self.assertIs(client.session, client.session)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_reports_api_stats_in_dev(self, mock_dynamodb, mock_requests):
+        """Test that dev mode exposes per-invocation API latency counters"""
+        os.environ["ENVIRONMENT"] = "dev"
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        response = lambda_handler({"offset_seconds": 3600}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["api_stats"]["calls"], 1)
+        self.assertEqual(body["api_stats"]["errors"], 0)
+
+
+class TestDynamoDBTableCache(unittest.TestCase):
+    """Test the module-level DynamoDB table cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+        app.reset_dynamodb_cache()
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_warm_invocations_reuse_table(self, mock_dynamodb, mock_requests):
+        """Test that the resource and table are built only once per process"""
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        for _ in range(3):
+            response = lambda_handler({"offset_seconds": 3600}, None)
+            self.assertEqual(response["statusCode"], 200)
+
+        mock_dynamodb.assert_called_once()
+        mock_dynamodb.return_value.Table.assert_called_once_with("test-launches-table")
+
+    @patch('app.boto3.resource')
+    def test_table_rebuilt_when_name_changes(self, mock_dynamodb):
+        """Test that a different DYNAMODB_TABLE invalidates the cached table"""
+        app.get_table()
+        os.environ["DYNAMODB_TABLE"] = "other-table"
+        app.get_table()
+
+        self.assertEqual(mock_dynamodb.return_value.Table.call_count, 2)
+        mock_dynamodb.assert_called_once()
+
+    @patch('app.boto3.resource')
+    def test_cold_vs_warm_table_identity(self, mock_dynamodb):
+        """Test that the cold call builds the table and warm calls return the same object"""
+        cold_table = app.get_table()
+        warm_tables = [app.get_table() for _ in range(100)]
+
+        for warm_table in warm_tables:
+            self.assertIs(warm_table, cold_table)
+        mock_dynamodb.assert_called_once()
+        mock_dynamodb.return_value.Table.assert_called_once_with("test-launches-table")
+
+
+class TestIncrementalIngestion(unittest.TestCase):
+    """Test incremental ingestion driven by the checkpoint item"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_incremental_resumes_from_watermark(self, mock_dynamodb, mock_requests):
+        """Test that the query starts at the watermark minus the overlap"""
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.get_item.return_value = {
+            "Item": {"id": "__checkpoint__", "launch_date": "__checkpoint__", "watermark": "2025-11-01T00:00:00+00:00"}
+        }
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        response = lambda_handler({"overlap_seconds": 3600}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        body = json.loads(response["body"])
+        self.assertEqual(body["mode"], "incremental")
+        self.assertEqual(body["start_time"], "2025-10-31T23:00:00+00:00")
+        query = mock_requests.call_args.kwargs["json"]["query"]["date_utc"]
+        self.assertEqual(query["$gte"], "2025-10-31T23:00:00+00:00")
+
+        saved = mock_table.put_item.call_args.kwargs["Item"]
+        self.assertEqual(saved["id"], "__checkpoint__")
+        self.assertEqual(saved["watermark"], body["end_time"])
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_incremental_default_overlap_is_one_hour(self, mock_dynamodb, mock_requests):
+        """Test that the scheduled run only re-reads a small margin before the watermark"""
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.get_item.return_value = {
+            "Item": {"id": "__checkpoint__", "launch_date": "__checkpoint__", "watermark": "2025-11-01T00:00:00+00:00"}
+        }
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        response = lambda_handler({}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["start_time"], "2025-10-31T23:00:00+00:00")
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_incremental_keeps_pending_upcoming_launch(self, mock_dynamodb, mock_requests):
+        """Test that upcoming launches hold back the next resume point"""
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.get_item.return_value = {
+            "Item": {
+                "watermark": "2025-11-01T00:00:00+00:00",
+                "pending_date_utc": "2025-10-20T12:00:00.000Z",
+            }
+        }
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+        mock_requests.return_value.json.return_value = {
+            "docs": [
+                {"id": "a", "date_utc": "2025-10-20T12:00:00.000Z", "upcoming": True},
+                {"id": "b", "date_utc": "2025-10-25T12:00:00.000Z", "success": True},
+            ]
+        }
+
+        response = lambda_handler({"overlap_seconds": 0}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["start_time"], "2025-10-20T12:00:00+00:00")
+        saved = mock_table.put_item.call_args.kwargs["Item"]
+        self.assertEqual(saved["pending_date_utc"], "2025-10-20T12:00:00.000Z")
+        self.assertEqual(saved["last_date_utc"], "2025-10-25T12:00:00.000Z")
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_explicit_window_does_not_touch_checkpoint(self, mock_dynamodb, mock_requests):
+        """Test that utc_date/offset_seconds runs keep the fixed-window behaviour"""
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        response = lambda_handler({"offset_seconds": 3600}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["mode"], "window")
+        mock_table.get_item.assert_not_called()
+        mock_table.put_item.assert_not_called()
+
+
+class TestChangeDetection(unittest.TestCase):
+    """Test that unchanged launches are not rewritten"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+        self.docs = [
+            {"id": "same", "date_utc": "2017-06-23T19:10:00.000Z", "success": True},
+            {"id": "changed", "date_utc": "2017-07-01T10:00:00.000Z", "success": True},
+            {"id": "new", "date_utc": "2017-07-05T10:00:00.000Z", "success": False},
+        ]
+
+    def test_content_hash_ignores_hash_attribute(self):
+        """Test that the hash is stable and independent of the stored hash"""
+        item = launch_data(self.docs[0])
+        digest = content_hash(item)
+        self.assertEqual(content_hash(dict(item, content_hash=digest)), digest)
+        self.assertNotEqual(content_hash(dict(item, details="x")), digest)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_only_new_or_modified_items_are_written(self, mock_dynamodb, mock_requests):
+        """Test inserted/updated/skipped counts against stored hashes"""
+        mock_requests.return_value.json.return_value = {"docs": self.docs}
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.name = "test-launches-table"
+        same = launch_data(self.docs[0])
+        mock_dynamodb.return_value.batch_get_item.return_value = {
+            "Responses": {
+                "test-launches-table": [
+                    {"id": "same", "launch_date": same["launch_date"], "content_hash": content_hash(same)},
+                    {"id": "changed", "launch_date": "2017-07-01T10:00:00.000Z", "content_hash": "stale"},
+                ]
+            }
+        }
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 3600}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["inserted"], 1)
+        self.assertEqual(body["updated"], 1)
+        self.assertEqual(body["skipped"], 1)
+        self.assertEqual(body["inserted_items"], 2)
+        written = [item["id"] for item in written_items(mock_dynamodb.return_value.meta.client)]
+        self.assertEqual(written, ["changed", "new"])
+        self.assertTrue(all("content_hash" in item for item in written_items(mock_dynamodb.return_value.meta.client)))
+        # The parallel writer goes through the thread-safe client, never the shared resource
+        mock_dynamodb.return_value.batch_write_item.assert_not_called()
+
+    @patch('app.ROLLUPS_ENABLED', False)
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_force_rewrites_without_pre_read(self, mock_dynamodb, mock_requests):
+        """Test that force=True skips the BatchGetItem pre-read when rollups are off"""
+        mock_requests.return_value.json.return_value = {"docs": self.docs}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 3600, "force": True}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["inserted"], 3)
+        mock_dynamodb.return_value.batch_get_item.assert_not_called()
+
+    def test_fetch_existing_items_retries_unprocessed_keys(self):
+        """Test that UnprocessedKeys are requested again"""
+        dynamodb = MagicMock()
+        key = {"id": "a", "launch_date": "2017-06-23T19:10:00.000Z"}
+        dynamodb.batch_get_item.side_effect = [
+            {"Responses": {"t": []}, "UnprocessedKeys": {"t": {"Keys": [key]}}},
+            {"Responses": {"t": [dict(key, content_hash="h")]}, "UnprocessedKeys": {}},
+        ]
+
+        with patch('storage.time.sleep'):
+            existing = fetch_existing_items(dynamodb, "t", [key, dict(key)])
+
+        self.assertEqual(existing, {("a", "2017-06-23T19:10:00.000Z"): dict(key, content_hash="h")})
+        self.assertEqual(dynamodb.batch_get_item.call_count, 2)
+        first_keys = dynamodb.batch_get_item.call_args_list[0].kwargs["RequestItems"]["t"]["Keys"]
+        self.assertEqual(len(first_keys), 1)
+
+
+class TestRollups(unittest.TestCase):
+    """Test the per-day/per-month counters maintained at ingestion time"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+        self.item = {
+            "id": "a",
+            "launch_date": "2020-05-30T19:22:00.000Z",
+            "launch_status": "success",
+            "launchpad_id": "pad-1",
+        }
+
+    def test_rollup_keys_partition_days_by_month_and_months_by_year(self):
+        """Test that rollup keys never look like ISO launch dates"""
+        keys = [key for _, _, key in rollup_keys(self.item["launch_date"])]
+        self.assertEqual(keys, [
+            {"id": "rollup#day#2020-05", "launch_date": "rollup#2020-05-30"},
+            {"id": "rollup#month#2020", "launch_date": "rollup#2020-05"},
+        ])
+
+    def test_new_launch_adds_to_every_counter(self):
+        """Test the deltas for a launch that was not stored before"""
+        deltas = add_rollup_deltas(new_deltas(), self.item)
+        day = deltas[("rollup#day#2020-05", "rollup#2020-05-30")]
+        self.assertEqual(day["granularity"], "day")
+        self.assertEqual(dict(day["counters"]), {"n_total": 1, "n_status_success": 1, "n_pad_pad-1": 1})
+
+    def test_status_change_moves_the_count(self):
+        """Test that a status change decrements the old status and increments the new one"""
+        previous = dict(self.item, launch_status="upcoming")
+        deltas = add_rollup_deltas(new_deltas(), self.item, previous)
+        month = deltas[("rollup#month#2020", "rollup#2020-05")]
+        self.assertEqual(dict(month["counters"]), {"n_status_success": 1, "n_status_upcoming": -1})
+
+    def test_unchanged_status_and_pad_produce_no_delta(self):
+        """Test that other field changes do not touch the rollups"""
+        deltas = add_rollup_deltas(new_deltas(), dict(self.item, details="x"), self.item)
+        self.assertEqual(len(deltas), 0)
+
+    def test_apply_uses_atomic_add(self):
+        """Test that each rollup is updated with a single ADD expression through the thread-safe client"""
+        table = MagicMock()
+        table.name = "t"
+        deltas = add_rollup_deltas(new_deltas(), self.item)
+        add_rollup_deltas(deltas, dict(self.item, id="b", launchpad_id="pad-2"))
+
+        self.assertEqual(apply_rollup_deltas(table, deltas), 2)
+        calls = [c.kwargs for c in table.meta.client.update_item.call_args_list]
+        kwargs = [c for c in calls if c["Key"]["id"] == "rollup#day#2020-05"][0]
+        self.assertEqual(kwargs["TableName"], "t")
+        self.assertEqual(kwargs["Key"], {"id": "rollup#day#2020-05", "launch_date": "rollup#2020-05-30"})
+        self.assertIn(" ADD ", kwargs["UpdateExpression"])
+        counters = {
+            kwargs["ExpressionAttributeNames"][name]: kwargs["ExpressionAttributeValues"][name.replace("#", ":")]
+            for name in kwargs["ExpressionAttributeNames"] if name.startswith("#c")
+        }
+        self.assertEqual(counters, {"n_total": 2, "n_status_success": 2, "n_pad_pad-1": 1, "n_pad_pad-2": 1})
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_handler_updates_rollups_for_written_items_only(self, mock_dynamodb, mock_requests):
+        """Test that skipped items do not change the counters"""
+        docs = [
+            {"id": "same", "date_utc": "2020-05-30T19:22:00.000Z", "success": True, "launchpad": "pad-1"},
+            {"id": "new", "date_utc": "2020-05-31T10:00:00.000Z", "success": True, "launchpad": "pad-1"},
+        ]
+        mock_requests.return_value.json.return_value = {"docs": docs}
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.name = "test-launches-table"
+        same = launch_data(docs[0])
+        mock_dynamodb.return_value.batch_get_item.return_value = {
+            "Responses": {"test-launches-table": [dict(same, content_hash=content_hash(same))]}
+        }
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 3600}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["skipped"], 1)
+        self.assertEqual(body["rollups_updated"], 2)
+        keys = [c.kwargs["Key"]["launch_date"] for c in mock_table.meta.client.update_item.call_args_list]
+        self.assertEqual(sorted(keys), ["rollup#2020-05", "rollup#2020-05-31"])
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_force_still_pre_reads_for_rollups(self, mock_dynamodb, mock_requests):
+        """Test that a forced rewrite of a stored launch does not count it twice"""
+        doc = {"id": "a", "date_utc": "2020-05-30T19:22:00.000Z", "success": True, "launchpad": "pad-1"}
+        mock_requests.return_value.json.return_value = {"docs": [doc]}
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.name = "test-launches-table"
+        stored = launch_data(doc)
+        mock_dynamodb.return_value.batch_get_item.return_value = {
+            "Responses": {"test-launches-table": [dict(stored, content_hash=content_hash(stored))]}
+        }
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 3600, "force": True}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["updated"], 1)
+        self.assertEqual(body["rollups_updated"], 0)
+        mock_table.meta.client.update_item.assert_not_called()
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_failed_writes_do_not_update_rollups(self, mock_dynamodb, mock_requests):
+        """Test that rollups are derived from confirmed writes, so a retry does not double count"""
+        docs = [{"id": "a", "date_utc": "2020-05-30T19:22:00.000Z", "success": True, "launchpad": "pad-1"}]
+        mock_requests.return_value.json.return_value = {"docs": docs}
+        mock_table = mock_dynamodb.return_value.Table.return_value
+        mock_table.name = "test-launches-table"
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException"}}, "BatchWriteItem"
+        )
+
+        response = lambda_handler({"offset_seconds": 3600}, None)
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual(json.loads(response["body"])["writes"]["failed"], 1)
+        mock_table.meta.client.update_item.assert_not_called()
+
+    def test_pending_rollups_forget_confirmed_writes(self):
+        """Test that confirmed writes become deltas and are not kept per key"""
+        pending = PendingRollups()
+        for i in range(3):
+            pending.track(dict(self.item, id=f"launch-{i}"))
+        self.assertEqual(pending.pending(), 3)
+
+        pending.confirm([{"PutRequest": {"Item": dict(self.item, id=f"launch-{i}")}} for i in range(2)])
+
+        self.assertEqual(pending.pending(), 1)
+        deltas = pending.take_deltas()
+        day = deltas[("rollup#day#2020-05", "rollup#2020-05-30")]
+        self.assertEqual(day["counters"]["n_total"], 2)
+        self.assertEqual(len(pending.take_deltas()), 0)
+
+    def test_pending_rollups_repeated_key_in_flight(self):
+        """Test that two writes of one key count once, from the state before the first"""
+        pending = PendingRollups()
+        first = dict(self.item, launch_status="upcoming")
+        pending.track(first)
+        pending.track(self.item, previous=None)
+
+        pending.confirm([{"PutRequest": {"Item": first}}])
+        self.assertEqual(pending.pending(), 1)
+        pending.confirm([{"PutRequest": {"Item": self.item}}])
+
+        self.assertEqual(pending.pending(), 0)
+        month = pending.take_deltas()[("rollup#month#2020", "rollup#2020-05")]
+        self.assertEqual(
+            {name: value for name, value in month["counters"].items() if value},
+            {"n_total": 1, "n_status_success": 1, "n_pad_pad-1": 1},
+        )
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_rollup_state_is_released_as_chunks_complete(self, mock_dynamodb, mock_requests):
+        """Test that the ingest keeps no per-launch rollup state once its writes are confirmed"""
+        docs = [
+            {"id": f"launch-{i}", "date_utc": f"2020-05-{i % 28 + 1:02d}T10:00:00.000Z", "success": True, "launchpad": "pad-1"}
+            for i in range(60)
+        ]
+        mock_requests.return_value.json.return_value = {"docs": docs}
+        mock_dynamodb.return_value.Table.return_value.name = "test-launches-table"
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+        trackers = []
+
+        class RecordingRollups(PendingRollups):
+            def __init__(self):
+                super().__init__()
+                trackers.append(self)
+
+        with patch('app.PendingRollups', RecordingRollups):
+            response = lambda_handler({"offset_seconds": 3600}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(trackers[0].pending(), 0)
+        # 28 daily rollups plus the monthly one
+        self.assertEqual(json.loads(response["body"])["rollups_updated"], 29)
+
+    def test_apply_runs_updates_concurrently(self):
+        """Test that the rollup updates of an invocation overlap instead of running one by one"""
+        table = MagicMock()
+        deltas = new_deltas()
+        for day in range(1, 9):
+            add_rollup_deltas(deltas, dict(self.item, launch_date=f"2020-05-{day:02d}T19:22:00.000Z"))
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_update(**kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+        table.meta.client.update_item.side_effect = slow_update
+
+        self.assertEqual(apply_rollup_deltas(table, deltas, max_workers=4), 9)
+        self.assertGreater(max(peak), 1)
+        self.assertLessEqual(max(peak), 4)
+
+    def test_rebuild_recomputes_and_deletes_stale_rollups(self):
+        """Test the full recount from launches"""
+        table = MagicMock()
+        table.scan.return_value = {"Items": [
+            self.item,
+            dict(self.item, id="b", launch_status="failed"),
+            {"id": "__checkpoint__", "launch_date": "__checkpoint__"},
+            {"id": "rollup#day#1999-01", "launch_date": "rollup#1999-01-01"},
+        ]}
+        batch = table.batch_writer.return_value.__enter__.return_value
+
+        report = rebuild_rollups(table)
+
+        self.assertEqual(report, {"launches": 2, "rollups": 2, "deleted": 1})
+        day = [c.kwargs["Item"] for c in batch.put_item.call_args_list if c.kwargs["Item"]["granularity"] == "day"][0]
+        self.assertEqual(day["n_total"], 2)
+        self.assertEqual(day["n_status_failed"], 1)
+        batch.delete_item.assert_called_once_with(Key={"id": "rollup#day#1999-01", "launch_date": "rollup#1999-01-01"})
+
+
+class TestBulkWriter(unittest.TestCase):
+    """Test the parallel BatchWriteItem writer used by the ingestion"""
+
+    @staticmethod
+    def _item(i):
+        return {"id": f"launch-{i}", "launch_date": "2020-05-30T19:22:00.000Z"}
+
+    @staticmethod
+    def _writer(dynamodb, **kwargs):
+        """Writer without real sleeps and with deterministic jitter (upper bound)"""
+        kwargs.setdefault("sleep", MagicMock())
+        return BulkWriter(dynamodb, "t", jitter=lambda low, high: high, **kwargs)
+
+    def test_sends_chunks_of_25_and_counts_writes(self):
+        """Test that items are grouped in 25-request BatchWriteItem calls"""
+        dynamodb = MagicMock()
+        dynamodb.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        with self._writer(dynamodb, max_concurrency=3) as writer:
+            for i in range(60):
+                writer.put_item(Item=self._item(i))
+            writer.delete_item(Key=self._item(0))
+
+        sizes = sorted(len(c.kwargs["RequestItems"]["t"]) for c in dynamodb.batch_write_item.call_args_list)
+        self.assertEqual(sizes, [11, 25, 25])
+        stats = writer.stats()
+        self.assertEqual((stats["queued"], stats["written"], stats["failed"], stats["requests"]), (61, 61, 0, 3))
+
+    def test_duplicate_key_in_a_chunk_keeps_last_request(self):
+        """Test that a repeated key does not produce an invalid BatchWriteItem"""
+        dynamodb = MagicMock()
+        dynamodb.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        with self._writer(dynamodb) as writer:
+            writer.put_item(Item=dict(self._item(1), version=1))
+            writer.put_item(Item=dict(self._item(1), version=2))
+
+        requests = dynamodb.batch_write_item.call_args.kwargs["RequestItems"]["t"]
+        self.assertEqual(requests, [{"PutRequest": {"Item": dict(self._item(1), version=2)}}])
+
+    def test_retries_only_unprocessed_items_with_backoff(self):
+        """Test that only UnprocessedItems are resent and concurrency is halved"""
+        dynamodb = MagicMock()
+        leftover = [{"PutRequest": {"Item": self._item(3)}}]
+        dynamodb.batch_write_item.side_effect = [
+            {"UnprocessedItems": {"t": leftover}},
+            {"UnprocessedItems": {}},
+        ]
+        sleep = MagicMock()
+
+        with self._writer(dynamodb, max_concurrency=4, backoff=0.1, sleep=sleep) as writer:
+            for i in range(5):
+                writer.put_item(Item=self._item(i))
+
+        self.assertEqual(dynamodb.batch_write_item.call_args_list[1].kwargs["RequestItems"], {"t": leftover})
+        sleep.assert_called_once_with(0.2)
+        stats = writer.stats()
+        self.assertEqual((stats["written"], stats["retried_items"], stats["throttled"]), (5, 1, 1))
+        self.assertEqual(stats["min_concurrency"], 2)
+
+    def test_throttling_error_is_retried(self):
+        """Test that a throttling ClientError is retried instead of failing the run"""
+        dynamodb = MagicMock()
+        throttled = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "BatchWriteItem")
+        dynamodb.batch_write_item.side_effect = [throttled, {"UnprocessedItems": {}}]
+
+        with self._writer(dynamodb) as writer:
+            writer.put_item(Item=self._item(1))
+
+        self.assertEqual(writer.stats()["written"], 1)
+        self.assertEqual(writer.stats()["throttled"], 1)
+
+    def test_concurrency_grows_back_after_successes(self):
+        """Test the additive increase after a multiplicative decrease"""
+        dynamodb = MagicMock()
+        responses = [{"UnprocessedItems": {"t": [{"PutRequest": {"Item": self._item(0)}}]}}]
+        dynamodb.batch_write_item.side_effect = lambda **kwargs: responses.pop(0) if responses else {"UnprocessedItems": {}}
+
+        with self._writer(dynamodb, max_concurrency=2) as writer:
+            for i in range(25 * 4):
+                writer.put_item(Item=self._item(i))
+                if i == 24:
+                    writer.flush()
+                    self.assertEqual(writer.stats()["concurrency"], 1)
+
+        self.assertEqual(writer.stats()["concurrency"], 2)
+
+    def test_failed_chunk_raises_with_partial_counts(self):
+        """Test that exhausted retries and other errors surface with the committed count"""
+        dynamodb = MagicMock()
+        dynamodb.batch_write_item.side_effect = [
+            {"UnprocessedItems": {}},
+            ClientError({"Error": {"Code": "ValidationException"}}, "BatchWriteItem"),
+        ]
+        confirmed = []
+        writer = self._writer(dynamodb, max_concurrency=1, on_confirmed=confirmed.extend)
+
+        with self.assertRaises(BulkWriteError) as raised:
+            with writer:
+                for i in range(30):
+                    writer.put_item(Item=self._item(i))
+
+        self.assertEqual(raised.exception.stats["written"], 25)
+        self.assertEqual(raised.exception.stats["failed"], 5)
+        self.assertEqual([r["PutRequest"]["Item"]["id"] for r in confirmed], [f"launch-{i}" for i in range(25)])
+
+    def test_unprocessed_items_are_confirmed_only_after_retry(self):
+        """Test that on_confirmed follows UnprocessedItems until they are written"""
+        dynamodb = MagicMock()
+        leftover = [{"PutRequest": {"Item": self._item(1)}}]
+        dynamodb.batch_write_item.side_effect = [
+            {"UnprocessedItems": {"t": leftover}},
+            ClientError({"Error": {"Code": "ValidationException"}}, "BatchWriteItem"),
+        ]
+        confirmed = []
+        writer = self._writer(dynamodb, on_confirmed=confirmed.extend)
+
+        with self.assertRaises(BulkWriteError):
+            with writer:
+                writer.put_item(Item=self._item(0))
+                writer.put_item(Item=self._item(1))
+
+        self.assertEqual([r["PutRequest"]["Item"]["id"] for r in confirmed], ["launch-0"])
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_reports_partial_writes(self, mock_dynamodb, mock_requests):
+        """Test that a write failure returns how many items were committed"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        app.reset_dynamodb_cache()
+        mock_requests.return_value.json.return_value = {"docs": [
+            {"id": f"l{i}", "date_utc": "2020-05-30T19:22:00.000Z", "success": True} for i in range(30)
+        ]}
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.side_effect = [
+            {"UnprocessedItems": {}},
+            ClientError({"Error": {"Code": "AccessDeniedException"}}, "BatchWriteItem"),
+        ]
+
+        with patch('app.BulkWriter', lambda client, name, **kwargs: BulkWriter(client, name, max_concurrency=1, **kwargs)):
+            response = lambda_handler({"utc_date": "2020-06-01T00:00:00Z", "offset_seconds": 7 * 86400}, None)
+
+        self.assertEqual(response["statusCode"], 500)
+        body = json.loads(response["body"])
+        self.assertIn("Error escribiendo en DynamoDB", body["error"])
+        self.assertEqual(body["writes"]["written"], 25)
+        self.assertEqual(body["writes"]["failed"], 5)
+
+
+class TestColdStart(unittest.TestCase):
+    """Test that the cold-start path avoids imports the handler may not need"""
+
+    def test_import_app_skips_optional_dependencies(self):
+        """Test that requests, asyncio and pydantic are only imported on first use"""
+        import subprocess
+
+        lambda_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import sys, app; print(','.join(m for m in ('requests', 'asyncio', 'pydantic') if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], cwd=lambda_dir, capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_utc_date_is_parsed_with_the_standard_library(self, mock_dynamodb, mock_requests):
+        """Test that offsets and date-only values are accepted and converted to UTC"""
+        os.environ["ENVIRONMENT"] = "dev"
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        for utc_date, end_time in (
+            ("2020-06-01T02:00:00+02:00", "2020-06-01T00:00:00+00:00"),
+            ("2020-06-01", "2020-06-01T00:00:00+00:00"),
+            ("2020-06-01T00:00:00.5Z", "2020-06-01T00:00:00.500000+00:00"),
+        ):
+            response = lambda_handler({"utc_date": utc_date, "offset_seconds": 3600}, None)
+            self.assertEqual(json.loads(response["body"])["end_time"], end_time)
+
+
+class TestBatchNormalizer(unittest.TestCase):
+    """Test the single-pass page normalizer"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.docs = [
+            {"id": "a", "date_utc": "2020-05-30T19:22:00.000Z", "success": True, "crew": ["c1"]},
+            {"id": None, "date_utc": "2020-05-31T19:22:00.000Z"},
+            {"id": "c", "date_utc": None},
+            {"_id": 7, "date_utc": "2020-06-01T19:22:00.000Z", "upcoming": True},
+        ]
+
+    def test_matches_per_document_normalization(self):
+        """Test that the batch output equals launch_data per doc, minus docs without keys"""
+        expected = [launch_data(doc) for doc in self.docs]
+        self.assertEqual(app.normalize_page(self.docs), [item for item in expected if item["id"] and item["launch_month"]])
+
+    def test_dev_items_include_discarded_docs(self):
+        """Test that launch_items keeps every normalized doc, even without keys"""
+        launch_items = []
+        items = app.normalize_page(self.docs, launch_items=launch_items)
+        self.assertEqual([i["id"] for i in items], ["a", "7"])
+        self.assertEqual(len(launch_items), 4)
+
+    def test_validation_runs_in_the_same_pass(self):
+        """Test that invalid docs are counted and skipped"""
+        counts = {"invalid": 0}
+        docs = [dict(self.docs[0]), {"id": "bad", "date_utc": "2020-05-30T19:22:00.000Z", "flight_number": "x"}]
+        items = app.normalize_page(docs, app.get_validator("slim"), counts)
+        self.assertEqual([i["id"] for i in items], ["a"])
+        self.assertEqual(counts["invalid"], 1)
+
+
+class TestStageMetrics(unittest.TestCase):
+    """Test per-stage timings and the EMF log line"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+        app.reset_dynamodb_cache()
+
+    def test_timer_accumulates_stages(self):
+        """Test that repeated stages add up time, calls and items"""
+        ticks = iter([0.0, 1.0, 1.5, 2.0, 2.25, 3.0, 3.5, 4.0, 4.25, 6.0])
+        timer = StageTimer(clock=lambda: next(ticks))
+        with timer.stage("normalize", 10):
+            pass
+        with timer.stage("normalize", 5):
+            pass
+        self.assertEqual(list(timer.iterate("fetch", ["page1"])), ["page1"])
+
+        report = timer.report()
+        self.assertEqual(report["stages"]["normalize"], {"ms": 750.0, "calls": 2, "items": 15})
+        self.assertEqual(report["stages"]["fetch"], {"ms": 750.0, "calls": 2, "items": 1})
+        self.assertEqual(report["total_ms"], 6000.0)
+
+    def test_emf_document_declares_stage_metrics(self):
+        """Test that the log line follows the CloudWatch Embedded Metric Format"""
+        timer = StageTimer()
+        timer.record("write", 0.002, 3)
+        doc = timer.emf("Test", dimensions={"FunctionName": "fn"}, properties={"statusCode": 200})
+
+        directive = doc["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(directive["Namespace"], "Test")
+        self.assertEqual(directive["Dimensions"], [["FunctionName"]])
+        names = {metric["Name"] for metric in directive["Metrics"]}
+        self.assertEqual(names, {"total_ms", "write_ms", "write_items"})
+        self.assertEqual(doc["FunctionName"], "fn")
+        self.assertEqual(doc["write_items"], 3)
+        self.assertEqual(doc["statusCode"], 200)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_emits_one_emf_line_and_dev_timings(self, mock_dynamodb, mock_requests):
+        """Test that each invocation logs one EMF line and dev mode returns the timings"""
+        mock_requests.return_value.json.return_value = {
+            "docs": [{"id": "a", "date_utc": "2020-05-30T19:22:00.000Z", "success": True}]
+        }
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        with patch("builtins.print") as mock_print:
+            response = lambda_handler({"utc_date": "2020-06-01T00:00:00Z", "offset_seconds": 7 * 86400}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(mock_print.call_count, 1)
+        logged = json.loads(mock_print.call_args.args[0])
+        self.assertIn("_aws", logged)
+        self.assertEqual(logged["statusCode"], 200)
+        self.assertEqual(logged["fetch_items"], 1)
+
+        stages = json.loads(response["body"])["timings"]["stages"]
+        for stage in ("parse_dates", "fetch", "normalize", "pre_read", "write", "flush"):
+            self.assertIn(stage, stages)
+        self.assertEqual(stages["write"]["items"], 1)
+
+
+class TestDateKeys(unittest.TestCase):
+    """Test the canonical launch_date encoding shared with the dashboard"""
+
+    def test_offsets_and_precision_normalize_to_fixed_width_utc(self):
+        """Test that equivalent instants produce the same sortable key"""
+        for value in ("2017-06-23T19:10:00.000Z", "2017-06-23T21:10:00+02:00",
+                      "2017-06-23T19:10:00Z", "2017-06-23T19:10:00.000999Z"):
+            self.assertEqual(date_key(value), "2017-06-23T19:10:00.000Z")
+        self.assertEqual(date_key("2017-06-23T19:10:00.5Z"), "2017-06-23T19:10:00.500Z")
+        self.assertIsNone(date_key(None))
+        with self.assertRaises(ValueError):
+            date_key("not a date")
+
+    def test_key_attributes_use_the_utc_month(self):
+        """Test that the month bucket and date_unix follow the UTC instant"""
+        attributes = key_attributes("2020-12-31T23:30:00-01:00")
+        self.assertEqual(attributes, {
+            "launch_date": "2021-01-01T00:30:00.000Z",
+            "launch_month": "2021-01",
+            "date_unix": 1609461000,
+        })
+        self.assertEqual(month_bucket(datetime(2021, 1, 1).date()), "2021-01")
+
+    def test_day_range_bounds_include_whole_days(self):
+        """Test that range bounds cover every key of the first and last day"""
+        low, high = day_range_keys(datetime(2020, 1, 1).date(), datetime(2020, 1, 31).date())
+        self.assertEqual((low, high), ("2020-01-01T00:00:00.000Z", "2020-01-31T23:59:59.999Z"))
+        self.assertTrue(low <= date_key("2020-01-31T23:59:59.999+00:00") <= high)
+        # A raw offset string sorts after the bound although the instant is inside the range
+        self.assertGreater("2020-02-01T00:30:00+01:00", high)
+        self.assertLessEqual(date_key("2020-02-01T00:30:00+01:00"), high)
+        self.assertEqual(day_range_unix(datetime(2020, 1, 1).date(), datetime(2020, 1, 1).date()),
+                         (1577836800, 1577923199))
+
+    def test_normalizer_writes_canonical_keys(self):
+        """Test that offset dates are stored canonically and invalid dates are dropped"""
+        docs = [
+            {"id": "a", "date_utc": "2020-05-30T21:22:00+02:00", "success": True},
+            {"id": "b", "date_utc": "yesterday"},
+        ]
+        items = app.normalize_page(docs)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["launch_date"], "2020-05-30T19:22:00.000Z")
+        self.assertEqual(items[0]["launch_month"], "2020-05")
+        self.assertEqual(items[0]["date_unix"], 1590866520)
+        self.assertEqual(app.normalize_page([{"id": "b", "date_utc": "yesterday"}]), [])
+
+
+class TestReferenceData(unittest.TestCase):
+    """Test the cached launchpad/rocket lookup used to enrich launches"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        reset_reference_cache()
+        self.launchpads = [{"id": "pad1", "name": "CCSFS SLC 40", "full_name": "Cape Canaveral SLC 40",
+                            "locality": "Cape Canaveral", "region": "Florida", "launches": ["a", "b"]}]
+        self.rockets = [{"id": "r1", "name": "Falcon 9", "height": {"meters": 70}}]
+        self.client = MagicMock()
+        self.client.get.side_effect = lambda url, etag=None: (
+            (self.launchpads, '"pads-v1"') if url.endswith("/launchpads") else (self.rockets, '"rockets-v1"')
+        )
+
+    def tearDown(self):
+        reset_reference_cache()
+
+    def test_refresh_indexes_collections_and_stores_etags(self):
+        """Test that each collection is fetched once and saved with its ETag"""
+        table = MagicMock()
+        data = refresh_reference(self.client, table, base_url="https://api.test/v4", ttl=60, now=1000)
+
+        self.assertEqual(self.client.get.call_count, 2)
+        self.assertEqual(data["launchpads"]["pad1"]["name"], "CCSFS SLC 40")
+        self.assertNotIn("launches", data["launchpads"]["pad1"])
+        self.assertEqual(data["rockets"], {"r1": {"name": "Falcon 9"}})
+        self.assertEqual(data["etags"], {"launchpads": '"pads-v1"', "rockets": '"rockets-v1"'})
+        self.assertEqual(data["expires_at"], 1060)
+        saved = table.put_item.call_args.kwargs["Item"]
+        self.assertEqual((saved["id"], saved["launch_date"]), (REFERENCE_KEY["id"], REFERENCE_KEY["launch_date"]))
+
+    def test_fresh_item_is_read_once_per_process(self):
+        """Test that a valid DynamoDB copy skips the API and later calls use memory"""
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {
+            **REFERENCE_KEY, "launchpads": {"pad1": {"name": "CCSFS SLC 40"}}, "rockets": {},
+            "etags": {}, "fetched_at": 900, "expires_at": 5000,
+        }}
+
+        first = load_reference(self.client, table, clock=lambda: 1000)
+        second = load_reference(self.client, table, clock=lambda: 1001)
+
+        self.assertIs(first, second)
+        self.assertEqual(table.get_item.call_count, 1)
+        self.client.get.assert_not_called()
+
+    def test_expired_item_revalidates_with_etag(self):
+        """Test that an expired copy sends If-None-Match and keeps data on 304"""
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {
+            **REFERENCE_KEY, "launchpads": {"pad1": {"name": "CCSFS SLC 40"}}, "rockets": {"r1": {"name": "Falcon 9"}},
+            "etags": {"launchpads": '"pads-v1"', "rockets": '"rockets-v1"'}, "fetched_at": 0, "expires_at": 10,
+        }}
+        self.client.get.side_effect = lambda url, etag=None: (None, etag)
+
+        data = load_reference(self.client, table, ttl=60, clock=lambda: 1000)
+
+        etags = sorted(c.kwargs["etag"] for c in self.client.get.call_args_list)
+        self.assertEqual(etags, ['"pads-v1"', '"rockets-v1"'])
+        self.assertEqual(data["launchpads"]["pad1"]["name"], "CCSFS SLC 40")
+        self.assertEqual(data["expires_at"], 1060)
+        table.put_item.assert_called_once()
+
+    def test_api_failure_falls_back_to_stale_copy(self):
+        """Test that a failed refresh never breaks ingestion"""
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {
+            **REFERENCE_KEY, "launchpads": {"pad1": {"name": "CCSFS SLC 40"}}, "rockets": {},
+            "etags": {}, "fetched_at": 0, "expires_at": 10,
+        }}
+        self.client.get.side_effect = Exception("timeout")
+        errors = []
+
+        data = load_reference(self.client, table, clock=lambda: 1000, errors=errors)
+
+        self.assertEqual(data["launchpads"]["pad1"]["name"], "CCSFS SLC 40")
+        table.put_item.assert_not_called()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("timeout", errors[0])
+
+    def test_client_conditional_get_handles_not_modified(self):
+        """Test that a 304 returns no data and keeps the ETag"""
+        client = SpaceXClient()
+        with patch.object(client.session, "get") as mock_get:
+            mock_get.return_value.status_code = 304
+            self.assertEqual(client.get("https://api.test/v4/rockets", etag='"v1"'), (None, '"v1"'))
+            self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+
+    def test_normalizer_enriches_names(self):
+        """Test that items get rocket and launchpad names, falling back to ids"""
+        reference = {"rockets": {"r1": {"name": "Falcon 9"}}, "launchpads": {"pad1": {"name": "CCSFS SLC 40"}}}
+        docs = [
+            {"id": "a", "date_utc": "2020-05-30T19:22:00.000Z", "rocket": "r1", "launchpad": "pad1"},
+            {"id": "b", "date_utc": "2020-05-31T19:22:00.000Z", "rocket": "r9", "launchpad": "pad9"},
+        ]
+        known, unknown = app.normalize_page(docs, reference=reference)
+        self.assertEqual((known["rocket_id"], known["rocket_name"], known["launchpad_name"]),
+                         ("r1", "Falcon 9", "CCSFS SLC 40"))
+        self.assertEqual((unknown["rocket_id"], unknown["rocket_name"], unknown["launchpad_name"]),
+                         ("r9", "r9", None))
+
+    @patch('app.REFERENCE_ENABLED', True)
+    @patch('app.load_reference')
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_loads_reference_once(self, mock_dynamodb, mock_requests, mock_load):
+        """Test that the handler loads the lookup once and enriches every page"""
+        os.environ["ENVIRONMENT"] = "dev"
+        app.reset_dynamodb_cache()
+        mock_load.return_value = {"rockets": {"r1": {"name": "Falcon 9"}}, "launchpads": {}}
+        mock_requests.return_value.json.side_effect = [
+            {"docs": [{"id": "a", "date_utc": "2020-05-30T19:22:00.000Z", "rocket": "r1"}], "hasNextPage": True, "nextPage": 2},
+            {"docs": [{"id": "b", "date_utc": "2020-05-31T19:22:00.000Z", "rocket": "r1"}], "hasNextPage": False},
+        ]
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        with patch("builtins.print"):
+            response = lambda_handler({"utc_date": "2020-06-01T00:00:00Z", "offset_seconds": 7 * 86400}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        mock_load.assert_called_once()
+        items = json.loads(response["body"])["lauch_items"]
+        self.assertEqual([i["rocket_name"] for i in items], ["Falcon 9", "Falcon 9"])
+
+    @patch('app.REFERENCE_ENABLED', True)
+    @patch('app.SPACEX_CLIENT.get')
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_reports_reference_errors(self, mock_dynamodb, mock_requests, mock_get):
+        """Test that a failed refresh is counted in the response and the EMF line"""
+        os.environ["ENVIRONMENT"] = "prod"
+        app.reset_dynamodb_cache()
+        mock_dynamodb.return_value.Table.return_value.get_item.return_value = {}
+        mock_get.side_effect = Exception("timeout")
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        with patch("builtins.print") as mock_print:
+            response = lambda_handler({"offset_seconds": 3600}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        errors = json.loads(response["body"])["reference_errors"]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("timeout", errors[0])
+        logged = json.loads(mock_print.call_args.args[0])
+        self.assertEqual(logged["reference_errors"], 1)
+        self.assertIn({"Name": "reference_errors", "Unit": "Count"}, logged["_aws"]["CloudWatchMetrics"][0]["Metrics"])
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    """Test the asyncio pipeline that overlaps page fetches with DynamoDB writes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+        app.reset_dynamodb_cache()
+
+    @staticmethod
+    def _query_response(total_pages, limit=2):
+        """Answer /launches/query for whichever page is requested"""
+        def post(url, json=None, timeout=None):
+            page = json["options"]["page"]
+            response = MagicMock()
+            response.json.return_value = {
+                "docs": [
+                    {"id": f"p{page}-{i}", "date_utc": f"2017-06-{page:02d}T19:10:00.000Z", "success": True}
+                    for i in range(limit)
+                ],
+                "totalPages": total_pages,
+                "hasNextPage": page < total_pages,
+                "nextPage": page + 1 if page < total_pages else None,
+            }
+            return response
+        return post
+
+    def test_busy_and_overlap_time(self):
+        """Test that intervals are merged before measuring busy and shared time"""
+        fetches = [(0.0, 2.0), (1.0, 3.0), (5.0, 6.0)]
+        writes = [(2.5, 5.5)]
+        self.assertEqual(busy_time(fetches), 4.0)
+        self.assertEqual(overlap_time(fetches, writes), 1.0)
+        self.assertEqual(overlap_time(fetches, []), 0.0)
+
+    def test_pages_are_processed_in_order_within_the_in_flight_bound(self):
+        """Test that writes keep page order and fetches never run more than in_flight pages ahead"""
+        fetched, processed = [], []
+
+        def fetch(page):
+            fetched.append((page, len(processed)))
+            time.sleep(0.01)
+            return {"docs": [page], "totalPages": 6}
+
+        def process(docs):
+            time.sleep(0.01)
+            processed.extend(docs)
+
+        stats = run_pipeline(fetch, process, StageTimer(), in_flight=2)
+
+        self.assertEqual(processed, [1, 2, 3, 4, 5, 6])
+        self.assertEqual(stats["pages"], 6)
+        for page, done in fetched:
+            # Ahead of the last finished write: the page being written, the one
+            # waiting for it and at most in_flight pending fetches
+            self.assertLessEqual(page - done, 2 + 2)
+        self.assertGreater(stats["overlap_ms"], 0)
+
+    def test_follows_next_page_without_total_pages(self):
+        """Test the fallback to nextPage chaining when the API omits totalPages"""
+        def fetch(page):
+            return {"docs": [page], "hasNextPage": page < 3, "nextPage": page + 1}
+
+        processed = []
+        stats = run_pipeline(fetch, processed.extend, StageTimer(), in_flight=4)
+
+        self.assertEqual(processed, [1, 2, 3])
+        self.assertEqual(stats["pages"], 3)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_async_matches_sequential(self, mock_dynamodb, mock_requests):
+        """Test that the async pipeline writes the same launches and keeps the response contract"""
+        mock_requests.side_effect = self._query_response(total_pages=4)
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+        event = {"utc_date": "2017-07-01T00:00:00Z", "offset_seconds": 30 * 86400, "page_limit": 2}
+
+        sequential = json.loads(lambda_handler({**event, "pipeline": "sequential"}, None)["body"])
+        sequential_ids = sorted(item["id"] for item in written_items(mock_dynamodb.return_value.meta.client))
+        mock_dynamodb.return_value.meta.client.batch_write_item.reset_mock()
+
+        response = lambda_handler({**event, "pipeline": "async", "in_flight": 3}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        body = json.loads(response["body"])
+        for key in ("inserted_items", "inserted", "updated", "skipped", "pages"):
+            self.assertEqual(body[key], sequential[key])
+        self.assertEqual(body["pages"], 4)
+        self.assertEqual(sorted(item["id"] for item in written_items(mock_dynamodb.return_value.meta.client)), sequential_ids)
+        self.assertEqual(body["pipeline"]["in_flight"], 3)
+        self.assertIn("overlap_ratio", body["pipeline"])
+        self.assertEqual(body["timings"]["stages"]["fetch"]["calls"], 4)
+
+    def test_emf_includes_pipeline_gauges(self):
+        """Test that gauges are declared as metrics next to the stage timings"""
+        timer = StageTimer()
+        timer.gauge("pipeline_overlap_ratio", 0.8)
+        doc = timer.emf("Test")
+
+        self.assertEqual(doc["pipeline_overlap_ratio"], 0.8)
+        metrics = doc["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+        self.assertIn({"Name": "pipeline_overlap_ratio", "Unit": "None"}, metrics)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_async_api_error(self, mock_dynamodb, mock_requests):
+        """Test that a failed page fetch in the async pipeline is reported as an API error"""
+        pages = self._query_response(total_pages=3)
+
+        def post(url, json=None, timeout=None):
+            if json["options"]["page"] == 2:
+                raise Exception("Connection reset")
+            return pages(url, json=json, timeout=timeout)
+
+        mock_requests.side_effect = post
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        response = lambda_handler({"offset_seconds": 2592000, "pipeline": "async"}, None)
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertIn("Error llamando a SpaceX API", json.loads(response["body"])["error"])
+
+    def test_lambda_handler_rejects_unknown_pipeline(self):
+        """Test that an unknown pipeline name is a client error"""
+        response = lambda_handler({"offset_seconds": 3600, "pipeline": "threads"}, None)
+
+        self.assertEqual(response["statusCode"], 400)
+        self.assertIn("Pipeline no válido", json.loads(response["body"])["error"])
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_lambda_handler_rejects_invalid_in_flight(self, mock_dynamodb, mock_requests):
+        """Test that a non-numeric or non-positive in_flight is a client error"""
+        for in_flight in ("x", 0, None):
+            response = lambda_handler({"offset_seconds": 3600, "pipeline": "async", "in_flight": in_flight}, None)
+
+            self.assertEqual(response["statusCode"], 400)
+            self.assertIn("in_flight no válido", json.loads(response["body"])["error"])
+        mock_requests.assert_not_called()
+
+
+class TestValidationModes(unittest.TestCase):
+    """Test the opt-in slim/full document validation"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+
+    def test_slim_model_keeps_launch_data_output(self):
+        """Test that a slim-validated doc normalizes like the raw dict"""
+        doc = {
+            "id": "5eb87d04ffd86e000604b353",
+            "name": "BulgariaSat-1",
+            "date_utc": "2017-06-23T19:10:00.000Z",
+            "success": True,
+            "crew": [{"crew": "c1", "role": "Commander"}],
+            "fairings": {"reused": False, "recovery_attempt": True, "recovered": None},
+            "links": {"flickr": {"original": ["x"]}},
+        }
+        validated = app.get_validator("slim")(doc).model_dump()
+
+        self.assertNotIn("links", validated)
+        self.assertEqual(launch_data(validated), launch_data(doc))
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_slim_validation_skips_invalid_docs(self, mock_dynamodb, mock_requests):
+        """Test that docs failing the slim schema are counted and not written"""
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+        mock_requests.return_value.json.return_value = {
+            "docs": [
+                {"id": "ok", "date_utc": "2017-06-23T19:10:00.000Z", "flight_number": 42},
+                {"id": "bad", "date_utc": "2017-06-24T19:10:00.000Z", "flight_number": "not-a-number"},
+            ]
+        }
+
+        response = lambda_handler({"offset_seconds": 3600, "validation": "slim"}, None)
+
+        body = json.loads(response["body"])
+        self.assertEqual(body["inserted_items"], 1)
+        self.assertEqual(body["invalid"], 1)
+
+    @patch('app.boto3.resource')
+    def test_unknown_validation_mode(self, mock_dynamodb):
+        """Test that an unknown validation mode is rejected"""
+        response = lambda_handler({"offset_seconds": 3600, "validation": "strict"}, None)
+
+        self.assertEqual(response["statusCode"], 400)
+
+
+class TestQueryProjection(unittest.TestCase):
+    """Test the options.select projection sent to the SpaceX API"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+        self.full_doc = {
+            "id": "5eb87d04ffd86e000604b353",
+            "flight_number": 42,
+            "name": "BulgariaSat-1",
+            "rocket": "5e9d0d95eda69973a809d1ec",
+            "date_utc": "2017-06-23T19:10:00.000Z",
+            "date_precision": "hour",
+            "static_fire_date_utc": "2017-06-15T22:25:00.000Z",
+            "window": 7200,
+            "upcoming": False,
+            "success": True,
+            "launchpad": "5e9e4502f509094188566f88",
+            "crew": [{"crew": "c1", "role": "Commander"}],
+            "capsules": ["capsule"],
+            "details": "Test launch details",
+            "fairings": {"reused": True, "recovery_attempt": True, "recovered": True},
+            "links": {"flickr": {"original": ["https://example.test/1.jpg"]}},
+            "cores": [{"core": "core-1"}],
+            "failures": [],
+        }
+
+    def test_projection_covers_every_field_launch_data_reads(self):
+        """Fail if launch_data reads a field that the projection does not request"""
+        select = app.build_query_payload("a", "b")["options"]["select"]
+
+        for doc in ({}, self.full_doc, dict(self.full_doc, upcoming=True), dict(self.full_doc, id=None)):
+            read = app.traced_fields(launch_data, doc)
+            self.assertTrue(read <= set(select), f"Fields missing from select: {read - set(select)}")
+
+    def test_projection_excludes_heavy_fields(self):
+        """Test that links/cores/failures are not requested"""
+        select = app.build_query_payload("a", "b")["options"]["select"]
+
+        for field in ("links", "cores", "failures", "payloads"):
+            self.assertNotIn(field, select)
+        self.assertIn("date_utc", select)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_full_validation_requests_whole_documents(self, mock_dynamodb, mock_requests):
+        """Test that full-model validation disables the projection"""
+        mock_requests.return_value.json.return_value = {"docs": []}
+
+        lambda_handler({"offset_seconds": 3600}, None)
+        self.assertIn("select", mock_requests.call_args.kwargs["json"]["options"])
+
+        lambda_handler({"offset_seconds": 3600, "validation": "full"}, None)
+        self.assertNotIn("select", mock_requests.call_args.kwargs["json"]["options"])
+
+
+class TestBackfill(unittest.TestCase):
+    """Test the parallel backfill (CLI only)"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["DYNAMODB_TABLE"] = "test-launches-table"
+        os.environ["ENVIRONMENT"] = "dev"
+
+    def test_split_range(self):
+        """Test that the range is split into contiguous sub-windows"""
+        start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2020, 3, 15, tzinfo=timezone.utc)
+
+        windows = split_range(start, end, shard_days=30)
+
+        self.assertEqual(len(windows), 3)
+        self.assertEqual(windows[0][0], start)
+        self.assertEqual(windows[-1][1], end)
+        for (_, previous_end), (next_start, _) in zip(windows, windows[1:]):
+            self.assertEqual(previous_end, next_start)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_backfill_deduplicates_and_reports_throughput(self, mock_dynamodb, mock_requests):
+        """Test that launches on window boundaries are written once"""
+        def fake_query(url, json=None, timeout=None):
+            window = json["query"]["date_utc"]
+            # Every window returns a launch on its lower bound (shared with the previous window)
+            response = MagicMock()
+            response.json.return_value = {
+                "docs": [
+                    {"id": "boundary-" + window["$gte"][:10], "date_utc": window["$gte"], "success": True},
+                    {"id": "boundary-" + window["$lte"][:10], "date_utc": window["$lte"], "success": True},
+                ],
+                "hasNextPage": False,
+            }
+            return response
+
+        mock_requests.side_effect = fake_query
+        mock_dynamodb.return_value.batch_get_item.return_value = {"Responses": {}}
+        mock_dynamodb.return_value.meta.client.batch_write_item.return_value = {"UnprocessedItems": {}}
+
+        event = {
+            "start": "2020-01-01T00:00:00+00:00",
+            "end": "2020-04-01T00:00:00+00:00",
+            "shard_days": 30,
+            "workers": 3,
+        }
+        response = backfill_handler(event)
+
+        self.assertEqual(response["statusCode"], 200)
+        body = json.loads(response["body"])
+        self.assertEqual(body["windows"], 4)
+        self.assertEqual(body["pages"], 4)
+        self.assertEqual(body["launches"], 5)
+        self.assertEqual(body["duplicates"], 3)
+        self.assertEqual(len(written_items(mock_dynamodb.return_value.meta.client)), 5)
+        self.assertIn("launches_per_second", body)
+        self.assertIn("pages_per_second", body)
+
+    @patch('app.SPACEX_CLIENT.session.post')
+    @patch('app.boto3.resource')
+    def test_backfill_api_error(self, mock_dynamodb, mock_requests):
+        """Test that a failing window aborts the backfill with a 500"""
+        mock_requests.side_effect = Exception("Connection error")
+
+        event = {"start": "2020-01-01T00:00:00Z", "end": "2020-06-01T00:00:00Z", "shard_days": 30}
+        response = backfill_handler(event)
+
+        self.assertEqual(response["statusCode"], 500)
+        self.assertIn("Error llamando a SpaceX API", json.loads(response["body"])["error"])
+
+    def test_backfill_invalid_range(self):
+        """Test that an inverted range is rejected"""
+        event = {"start": "2021-01-01T00:00:00Z", "end": "2020-01-01T00:00:00Z"}
+        response = backfill_handler(event)
+
+        self.assertEqual(response["statusCode"], 400)
+
+    @patch('app.boto3.resource')
+    def test_lambda_rejects_backfill_mode(self, mock_dynamodb):
+        """Test that the Lambda does not run a backfill that cannot finish before its timeout"""
+        event = {"mode": "backfill", "start": "2006-01-01T00:00:00Z", "end": "2022-12-31T23:59:59Z"}
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 400)
+        self.assertIn("backfill.py", json.loads(response["body"])["error"])
+        mock_dynamodb.assert_not_called()
+
+
+class TestDateKeysMigration(unittest.TestCase):
+    """Test the one-off launch_month/date_unix migration"""
+
+    def scanned_table(self):
+        table = MagicMock()
+        table.scan.side_effect = [
+            {
+                "Items": [
+                    {"id": "launch-1", "launch_date": "2020-03-01T12:00:00.000Z"},
+                    {"id": "__checkpoint__", "launch_date": "__checkpoint__"},
+                ],
+                "ScannedCount": 2,
+                "LastEvaluatedKey": {"id": "__checkpoint__", "launch_date": "__checkpoint__"},
+            },
+            {
+                "Items": [
+                    {"id": "launch-2", "launch_date": "2020-03-02T12:00:00Z"},
+                    {"id": "rollup#day#2020-03", "launch_date": "rollup#2020-03-01"},
+                ],
+                "ScannedCount": 2,
+            },
+        ]
+        return table
+
+    def test_migration_sets_month_and_unix(self):
+        """Test that launches get launch_month/date_unix and the marker is written"""
+        table = self.scanned_table()
+
+        counts = migrate_date_keys(table)
+
+        self.assertEqual(counts, {"scanned": 4, "updated": 2, "non_canonical": 1, "ignored": 2})
+        self.assertEqual(table.scan.call_args_list[1].kwargs["ExclusiveStartKey"]["id"], "__checkpoint__")
+        first = table.update_item.call_args_list[0].kwargs
+        self.assertEqual(first["Key"], {"id": "launch-1", "launch_date": "2020-03-01T12:00:00.000Z"})
+        self.assertEqual(first["ExpressionAttributeValues"][":launch_month"], "2020-03")
+        self.assertEqual(
+            first["ExpressionAttributeValues"][":date_unix"],
+            int(datetime(2020, 3, 1, 12, tzinfo=timezone.utc).timestamp()),
+        )
+        # The stored key is kept as-is, even when it is not canonical
+        second = table.update_item.call_args_list[1].kwargs
+        self.assertEqual(second["Key"]["launch_date"], "2020-03-02T12:00:00Z")
+
+        marker = table.put_item.call_args.kwargs["Item"]
+        self.assertEqual(marker["id"], MIGRATION_KEY["id"])
+        self.assertIn(MIGRATION_NAME, marker)
+        self.assertEqual(marker[f"{MIGRATION_NAME}_updated"], 2)
+
+    def test_dry_run_does_not_write(self):
+        """Test that a dry run only counts"""
+        table = self.scanned_table()
+
+        counts = migrate_date_keys(table, dry_run=True)
+
+        self.assertEqual(counts["updated"], 2)
+        table.update_item.assert_not_called()
+        table.put_item.assert_not_called()
+
+
 class TestLambdaHandlerWithoutRequestsMock(unittest.TestCase):
     """Test the main lambda_handler function without mocking requests"""
 
@@ -0,0 +1,116 @@
+# date_keys.py
+# Codificación canónica de las fechas de lanzamiento usadas como clave en DynamoDB.
+# La comparten la Lambda (escritura) y el dashboard (lectura): ambos deben
+# producir exactamente el mismo formato para que los rangos de las Queries sean
+# exactos. Solo usa la librería estándar (compatible con Python 3.9+).
+import re
+from datetime import date, datetime, time, timedelta, timezone
+
+# Ancho fijo, siempre UTC y con milisegundos: "2017-06-23T19:10:00.000Z". Es el
+# formato que ya devuelve la API de SpaceX en `date_utc`, así que las claves
+# existentes no cambian. El orden lexicográfico coincide con el cronológico.
+DATE_KEY_FORMAT = "%Y-%m-%dT%H:%M:%S"
+DATE_KEY_LENGTH = len("2017-06-23T19:10:00.000Z")
+
+# Atributos derivados de la fecha que se guardan en cada lanzamiento
+MONTH_BUCKET_ATTRIBUTE = "launch_month"
+DATE_UNIX_ATTRIBUTE = "date_unix"
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def _is_date_key(value):
+    return (
+        len(value) == DATE_KEY_LENGTH and value[-1] == "Z" and value[10] == "T"
+        and value[19] == "." and value[4] == value[7] == "-"
+    )
+
+
+def parse_utc(value):
+    """
+    Convierte `value` (str ISO 8601, datetime o date) en un datetime UTC con
+    zona. Acepta "Z" u offsets (+02:00) y cualquier número de decimales; las
+    fechas sin zona se interpretan como UTC. Lanza ValueError si no es válida.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime.combine(value, time.min)
+    elif isinstance(value, str):
+        text = value.strip()
+        if _is_date_key(text):
+            # Camino rápido: el formato de SpaceX/canónico lo entiende fromisoformat en 3.9
+            dt = datetime.fromisoformat(text[:-1] + "+00:00")
+        else:
+            if text[-1:] in ("Z", "z"):
+                text = text[:-1] + "+00:00"
+            # fromisoformat (3.9/3.10) solo admite 3 o 6 decimales
+            text = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text, count=1)
+            dt = datetime.fromisoformat(text)
+    else:
+        raise ValueError(f"Fecha no válida: {value!r}")
+
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def date_key(value):
+    """
+    Clave canónica de `value`: UTC, ancho fijo y milisegundos truncados.
+    Devuelve None si `value` está vacío y lanza ValueError si no es una fecha.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and _is_date_key(value):
+        parse_utc(value)  # valida sin reformatear
+        return value
+    dt = parse_utc(value)
+    return f"{dt.strftime(DATE_KEY_FORMAT)}.{dt.microsecond // 1000:03d}Z"
+
+
+def date_unix(value):
+    """Segundos desde epoch (entero, como `date_unix` de la API) de `value` en UTC."""
+    return int(parse_utc(value).timestamp() // 1)
+
+
+def month_bucket(value):
+    """Bucket mensual YYYY-MM (UTC) de `value`: partition key del GSI por mes."""
+    if isinstance(value, str) and _is_date_key(value):
+        return value[:7]
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return f"{value.year:04d}-{value.month:02d}"
+    return parse_utc(value).strftime("%Y-%m")
+
+
+def day_range_keys(start_date, end_date):
+    """
+    Límites inclusivos (claves canónicas) para los días [start_date, end_date]:
+    desde las 00:00:00.000Z del primero hasta las 23:59:59.999Z del último.
+    """
+    return date_key(start_date), date_key(datetime.combine(end_date, time.max))
+
+
+def day_range_unix(start_date, end_date):
+    """Como `day_range_keys` pero en segundos desde epoch, para un sort key numérico."""
+    return date_unix(start_date), date_unix(datetime.combine(end_date + timedelta(days=1), time.min)) - 1
+
+
+def key_attributes(value):
+    """
+    Atributos de fecha de un lanzamiento a partir de su `date_utc`:
+    {"launch_date", "launch_month", "date_unix"}. Lanza ValueError si la fecha
+    no es válida.
+    """
+    if isinstance(value, str) and _is_date_key(value):
+        # Ya es canónica (el caso de SpaceX): solo se valida, sin reformatear
+        dt = datetime.fromisoformat(value[:-1] + "+00:00")
+        key = value
+    else:
+        dt = parse_utc(value)
+        key = date_key(dt)
+    return {
+        "launch_date": key,
+        MONTH_BUCKET_ATTRIBUTE: key[:7],
+        DATE_UNIX_ATTRIBUTE: int(dt.timestamp() // 1),
+    }
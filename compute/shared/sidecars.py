@@ -0,0 +1,40 @@
+# sidecars.py
+# Claves de los ítems especiales que comparten la tabla con los lanzamientos.
+# Los escribe la Lambda y los lee el dashboard: ambos lados importan estas
+# constantes para que no se desincronicen. Solo usa la librería estándar.
+
+# Ítem que escribe `compute/lambda/migrate_date_keys.py` al completar
+# `launch_month`/`date_unix` en los lanzamientos guardados antes del GSI
+# mensual. El dashboard no usa el GSI hasta que `MIGRATION_NAME` está marcado.
+MIGRATION_KEY = {"id": "__migrations__", "launch_date": "__migrations__"}
+MIGRATION_NAME = "date_keys"
+
+# Launchpads y cohetes que mantiene `compute/lambda/reference.py` y que el
+# dashboard lee para etiquetar las gráficas. Como el checkpoint, su
+# `launch_date` no es una fecha ISO y no aparece en los rangos del dashboard.
+REFERENCE_KEY = {"id": "__reference__", "launch_date": "__reference__"}
+
+# Rollups pre-agregados de `compute/lambda/rollups.py`. Su `launch_date`
+# empieza por este prefijo, así que nunca caen en los rangos ISO del dashboard
+# ni en el GSI por mes (no tienen `launch_month`). Los diarios se agrupan por
+# mes y los mensuales por año, para leer un rango con una Query por partición:
+#
+#   día:  id="rollup#day#YYYY-MM",  launch_date="rollup#YYYY-MM-DD"
+#   mes:  id="rollup#month#YYYY",   launch_date="rollup#YYYY-MM"
+ROLLUP_PREFIX = "rollup#"
+# Longitud del periodo que identifica la partición de cada granularidad
+ROLLUP_PARTITION_LENGTH = {"day": len("YYYY-MM"), "month": len("YYYY")}
+
+
+def rollup_partition(granularity, period):
+    """
+    `id` de la partición con los rollups `granularity` de `period`. Basta con
+    el prefijo del periodo que identifica la partición: "2020-01-15" y
+    "2020-01" dan la misma partición diaria.
+    """
+    return f"{ROLLUP_PREFIX}{granularity}#{period[:ROLLUP_PARTITION_LENGTH[granularity]]}"
+
+
+def rollup_key(granularity, period):
+    """Clave completa del rollup `granularity` ("day" o "month") de `period`."""
+    return {"id": rollup_partition(granularity, period), "launch_date": f"{ROLLUP_PREFIX}{period}"}
@@ -1,154 +1,56 @@
 # app.py
-import os
 import streamlit as st
-import boto3
-from boto3.dynamodb.conditions import Key, Attr
-import pandas as pd
 import plotly.express as px
-from datetime import datetime, timedelta, date
-from botocore.exceptions import ClientError
+from datetime import timedelta, date
 
-st.set_page_config(layout="wide", page_title="DynamoDB Launches Dashboard")
-
-# ---------- Config ----------
-DYNAMODB_TABLE = os.environ.get("DYNAMODB_TABLE_NAME") #
-AWS_REGION = os.environ.get("AWS_REGION")
-
-# Nombres de índices que vamos a intentar (prioridad)
-POSSIBLE_GSIS = ["launch_date-index", "launch_date-gsi", "LaunchDateIndex"]
-
-# Campos que queremos proyectar para reducir I/O en scans
-PROJECTION = "id, launch_date, launch_status, launchpad_id, flight_number, launch_date_precision"
+import queries
+from exports import csv_export, parquet_export
+from launch_store import LaunchStore
+from queries import DYNAMODB_TABLE
 
-# ---------- Utils ----------
-# @st.cache_data(ttl=300)
-def get_dynamodb_table():
-    """
-    Crea cliente/resource de boto3. Asume que las credenciales AWS están configuradas
-    con variables de entorno, profile, o IAM role si corre en AWS.
-    """
-    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-    return dynamodb.Table(DYNAMODB_TABLE)
+st.set_page_config(layout="wide", page_title="DynamoDB Launches Dashboard")
 
 
-def iso_from_date(d: date, end_of_day: bool = False) -> str:
-    """
-    Convierte date a ISO8601 UTC string compatible con los valores de launch_date.
-    Si end_of_day True pone 23:59:59.999Z para incluir todo el día.
-    """
-    if end_of_day:
-        dt = datetime(d.year, d.month, d.day, 23, 59, 59, 999000)
-    else:
-        dt = datetime(d.year, d.month, d.day, 0, 0, 0, 0)
-    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z"  # corta microsegundos a ms
+# ---------- Data ----------
+@st.cache_resource
+def get_table():
+    return queries.get_dynamodb_table()
 
 
-def try_query_by_gsi(table, start_iso, end_iso):
-    """
-    Intenta hacer Query sobre un GSI que indexa launch_date (lexicographic ISO strings).
-    Retorna lista de items o lanza ClientError si no existe el índice.
-    """
-    last_e = None
-    for idx in POSSIBLE_GSIS:
-        try:
-            resp = table.query(
-                IndexName=idx,
-                KeyConditionExpression=Key("launch_date").between(start_iso, end_iso),
-                ProjectionExpression=PROJECTION,
-            )
-            items = resp.get("Items", [])
-            # paginación de query
-            while "LastEvaluatedKey" in resp:
-                resp = table.query(
-                    IndexName=idx,
-                    KeyConditionExpression=Key("launch_date").between(start_iso, end_iso),
-                    ProjectionExpression=PROJECTION,
-                    ExclusiveStartKey=resp["LastEvaluatedKey"],
-                )
-                items.extend(resp.get("Items", []))
-            return items
-        except ClientError as e:
-            # si el error es ResourceNotFoundException para el índice, probamos otro nombre
-            code = e.response.get("Error", {}).get("Code", "")
-            last_e = e
-            if "ValidationException" in code or "ResourceNotFoundException" in code:
-                continue
-            else:
-                raise
-    # si no se pudo con ningun índice, re-lanzamos la ultima excepción
-    if last_e:
-        raise last_e
-    return []
+@st.cache_resource
+def get_launch_store():
+    """Caché compartida por todas las sesiones del proceso."""
+    return LaunchStore(to_frame=queries.items_to_dataframe)
 
 
-def scan_with_filter(table, start_iso, end_iso):
-    """
-    Fallback: scan paginado con FilterExpression (ineficiente para tablas grandes).
-    Usa ProjectionExpression para reducir tamaño.
-    """
-    fe = Attr("launch_date").between(start_iso, end_iso)
-    items = []
-    resp = table.scan(
-        FilterExpression=fe,
-        ProjectionExpression=PROJECTION,
-    )
-    items.extend(resp.get("Items", []))
-    while "LastEvaluatedKey" in resp:
-        resp = table.scan(
-            FilterExpression=fe,
-            ProjectionExpression=PROJECTION,
-            ExclusiveStartKey=resp["LastEvaluatedKey"],
-        )
-        items.extend(resp.get("Items", []))
-    return items
+@st.cache_resource(ttl=queries.REFERENCE_CACHE_TTL)
+def get_launchpad_labels():
+    """Nombres de launchpads leídos una vez por proceso (ítem de referencia de la Lambda)."""
+    return queries.launchpad_labels(queries.load_reference(get_table()))
 
 
-@st.cache_data(ttl=300)
 def fetch_items_by_date_range(start_date: date, end_date: date):
     """
-    Devuelve un DataFrame con los items entre las dos fechas (inclusive).
-    Intenta usar GSI para Query por rango; si no está, usa Scan (menos óptimo).
+    Devuelve un DataFrame ya normalizado con los items entre las dos fechas
+    (inclusive). Solo consulta DynamoDB para los sub-intervalos que no están
+    en la caché local; ver `queries.fetch_raw_items` para el plan de consulta.
     """
-    table = get_dynamodb_table()
-    start_iso = iso_from_date(start_date, end_of_day=False)
-    # Para incluir todo el último día añadimos 23:59:59 al end ISO
-    end_iso = iso_from_date(end_date, end_of_day=True)
-
-    # Intento query por GSI
-    try:
-        items = try_query_by_gsi(table, start_iso, end_iso)
-        method = "query_gsi"
-    except ClientError:
-        # fallback a scan paginado con filtro
-        items = scan_with_filter(table, start_iso, end_iso)
-        method = "scan_filter"
-
-    # Normalizar a DataFrame
-    if not items:
-        return pd.DataFrame(), method
+    table = get_table()
+    rows, methods = get_launch_store().get(
+        start_date, end_date, lambda s, e: queries.fetch_raw_items(table, s, e)
+    )
+    if not methods:
+        method = "caché local"
+    else:
+        method = "; ".join(methods) + f" ({len(methods)} sub-intervalo(s) nuevos)"
+    return rows, method
 
-    df = pd.DataFrame(items)
-    # Asegura columnas mínimas
-    for c in ["launch_date", "launch_status", "launchpad_id", "id"]:
-        if c not in df.columns:
-            df[c] = None
 
-    # Parseo launch_date (algunas filas pueden tener None)
-    def parse_iso_safe(v):
-        try:
-            # Si ya es datetime, devolver
-            if isinstance(v, datetime):
-                return v
-            return pd.to_datetime(v, utc=True)
-        except Exception:
-            return pd.NaT
+def fetch_rollup_frames(start_date: date, end_date: date):
+    """Agregados de las gráficas leídos de los rollups (sin bajar lanzamientos)."""
+    items, granularity = queries.fetch_rollups(get_table(), start_date, end_date)
+    return queries.chart_frames_from_rollups(items, granularity), f"rollups por {'día' if granularity == 'day' else 'mes'} ({len(items)} items)"
 
-    df["launch_date"] = df["launch_date"].apply(parse_iso_safe)
-    # Normaliza estado
-    df["launch_status"] = df["launch_status"].astype(str).str.lower().fillna("unknown")
-    # arreglar posibles typos
-    df["launch_status"] = df["launch_status"].replace({"upcomming": "upcoming"})
-    return df, method
 
 # ---------- UI ----------
 st.title("🚀 Dashboard de lanzamientos (DynamoDB)")
@@ -170,45 +72,58 @@ with col1:
     end = st.date_input("Fecha fin", today)
     if start > end:
         st.error("La fecha de inicio no puede ser posterior a la fecha fin.")
+    source = st.radio(
+        "Fuente de datos",
+        ["Items (detalle)", "Rollups (pre-agregados)"],
+        help=(
+            "Los rollups los mantiene la Lambda al ingerir: la latencia no depende de cuántos lanzamientos haya en el rango. "
+            "En una tabla cargada antes de activarlos hay que ejecutar `rebuild_rollups`; si no hay rollups en el rango se leen los items."
+        ),
+    )
+    with_details = st.toggle(
+        "Columnas de detalle en tabla y descargas",
+        help="Misión, cohete, detalles... Se leen aparte (BatchGetItem) solo para las filas mostradas o exportadas.",
+    )
     btn = st.button("Cargar datos")
 
 with col2:
     st.write("Información de la consulta:")
     st.write(f"Tabla DynamoDB: **{DYNAMODB_TABLE}**")
-    st.write("Intento utilizar un GSI `launch_date` para consultas eficientes por rango.")
-    st.info("Si tu tabla no tiene un GSI sobre `launch_date`, la app hará un Scan paginado (menos eficiente).")
+    st.write("Consulto el GSI `launch_month-index` con una Query por mes del rango seleccionado.")
+    st.info(
+        "Si tu tabla no tiene ese GSI (o no proyecta los atributos necesarios), o aún no se ha ejecutado "
+        "`migrate_date_keys.py` para completar `launch_month` en los lanzamientos antiguos, la app hace un "
+        "Scan paralelo por segmentos con filtro de fechas (menos eficiente)."
+    )
+    st.write("En modo rollups se leen los contadores por día/mes (`rollup#...`) con una Query por partición.")
 
 if btn:
+    df = None
     with st.spinner("Consultando DynamoDB..."):
-        df, method = fetch_items_by_date_range(start, end)
-    st.success(f"Datos cargados (método: {method}). {len(df)} filas recuperadas.")
-    if df.empty:
+        frames = None
+        if source.startswith("Rollups"):
+            frames, method = fetch_rollup_frames(start, end)
+        if frames is None:
+            # Sin rollups en el rango (p.ej. aún no se ha ejecutado rebuild_rollups): se leen los items
+            df, items_method = fetch_items_by_date_range(start, end)
+            method = f"sin rollups en el rango, {items_method}" if source.startswith("Rollups") else items_method
+            frames = None if df.empty else queries.chart_frames_from_items(df)
+    total = frames["total"] if frames else 0
+    st.success(f"Datos cargados (método: {method}). {total} lanzamientos en el rango.")
+    if df is not None:
+        cache = get_launch_store().stats()
+        st.caption(f"Caché local: {cache['rows']} filas en {cache['intervals']} intervalos ({cache['memory_bytes'] / 1e6:.1f} MB).")
+        if not df.empty:
+            with st.expander("Debug: memoria del DataFrame"):
+                report = queries.memory_report(df)
+                st.write(f"{report['bytes'].sum() / 1e6:.2f} MB para {len(df)} filas (`memory_usage(deep=True)`).")
+                st.dataframe(report, hide_index=True)
+    if not frames:
         st.warning("No hay lanzamientos en el rango seleccionado.")
     else:
-        # Pre-procesamiento adicional
-        # convertir a timezone naive en UTC para agrupar
-        df["date_utc"] = pd.to_datetime(df["launch_date"]).dt.tz_convert("UTC").dt.date
-        df["month"] = pd.to_datetime(df["launch_date"]).dt.to_period("M").astype(str)
-        # estado: keep only success/upcoming/failed/other
-        def map_state(s):
-            s = str(s).lower()
-            if "success" in s:
-                return "success"
-            if "fail" in s or "failure" in s or "failed" in s:
-                return "failed"
-            if "upcoming" in s or "upcomming" in s:
-                return "upcoming"
-            return s or "unknown"
-        df["state_norm"] = df["launch_status"].apply(map_state)
-
         # ---------- Chart 1: barras por mes (success vs failed)
         st.subheader("1) Lanzamientos por mes — Success vs Failed")
-        monthly = (
-            df[df["state_norm"].isin(["success", "failed"])]
-            .groupby(["month", "state_norm"])
-            .size()
-            .reset_index(name="count")
-        )
+        monthly = frames["monthly"]
         if monthly.empty:
             st.info("No hay datos suficientes de success/failed en el rango.")
         else:
@@ -225,27 +140,26 @@ if btn:
 
         # ---------- Chart 2: barras por launchpad
         st.subheader("2) Lanzamientos por Launchpad")
-        launchpad_counts = df.groupby("launchpad_id").size().reset_index(name="count").sort_values("count", ascending=False)
+        launchpad_counts = frames["launchpads"]
         if launchpad_counts.empty:
             st.info("No hay launchpad_id en los datos.")
         else:
             fig2 = px.bar(
-                launchpad_counts,
-                x="launchpad_id",
+                queries.label_launchpads(launchpad_counts, get_launchpad_labels()),
+                x="launchpad",
                 y="count",
-                labels={"launchpad_id": "Launchpad ID", "count": "Lanzamientos"},
+                hover_data=["launchpad_id"],
+                labels={"launchpad": "Launchpad", "launchpad_id": "Launchpad ID", "count": "Lanzamientos"},
                 title="Lanzamientos por Launchpad",
             )
             st.plotly_chart(fig2, use_container_width=True)
 
         # ---------- Chart 3: línea lanzamientos por fecha
         st.subheader("3) Línea: Número de lanzamientos por fecha")
-        daily = df.groupby("date_utc").size().reset_index(name="count").sort_values("date_utc")
+        daily = frames["daily"]
         if daily.empty:
             st.info("No hay lanzamientos por fecha para graficar.")
         else:
-            # convertir date a datetime para la línea
-            daily["date_utc"] = pd.to_datetime(daily["date_utc"])
             fig3 = px.line(
                 daily,
                 x="date_utc",
@@ -258,19 +172,41 @@ if btn:
 
         # ---------- Chart 4: pie success/upcoming/failed
         st.subheader("4) Distribución: Success / Upcoming / Failed")
-        pie = df["state_norm"].value_counts().reset_index()
-        pie.columns = ["state", "count"]
-        # filtrar a las 3 categorías principales y agrupar el resto como other
-        top_states = ["success", "upcoming", "failed"]
-        pie_top = pie[pie["state"].isin(top_states)].copy()
-        others = pie[~pie["state"].isin(top_states)]
-        if not others.empty:
-            pie_top = pie_top.append({"state": "other", "count": int(others["count"].sum())}, ignore_index=True)
-        fig4 = px.pie(pie_top, names="state", values="count", title="Porcentaje por estado de lanzamiento")
+        # `state_norm` ya agrupa en success/upcoming/failed/other
+        fig4 = px.pie(frames["states"], names="state", values="count", title="Porcentaje por estado de lanzamiento")
         st.plotly_chart(fig4, use_container_width=True)
 
-        # Mostrar tabla de muestras y permitir descarga
-        st.subheader("Datos (muestra)")
-        st.dataframe(df.sample(min(200, len(df))).reset_index(drop=True))
-        csv = df.to_csv(index=False)
-        st.download_button("Descargar CSV completo", data=csv, file_name="launches_filtered.csv", mime="text/csv")
+        # Mostrar tabla de muestras y permitir descarga (solo en modo detalle)
+        if df is not None:
+            st.subheader("Datos (muestra)")
+            sample = df.sample(min(200, len(df))).reset_index(drop=True)
+            if with_details:
+                sample = queries.add_details(get_table(), sample)
+            st.dataframe(sample)
+
+            table = get_table()
+
+            def export_frame():
+                # Se ejecuta al pulsar la descarga (en otro hilo): el detalle solo se lee entonces
+                return queries.add_details(table, df) if with_details else df
+
+            # El fichero solo se genera al pulsar (callable), no en cada rerun
+            export_csv, export_parquet = st.columns(2)
+            with export_csv:
+                st.download_button(
+                    "Descargar CSV completo",
+                    data=lambda: csv_export(export_frame()),
+                    file_name="launches_filtered.csv",
+                    mime="text/csv",
+                    on_click="ignore",
+                )
+            with export_parquet:
+                st.download_button(
+                    "Descargar Parquet",
+                    data=lambda: parquet_export(export_frame()),
+                    file_name="launches_filtered.parquet",
+                    mime="application/vnd.apache.parquet",
+                    on_click="ignore",
+                )
+        else:
+            st.caption("La muestra y las descargas CSV/Parquet están disponibles en el modo «Items (detalle)».")
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark: row-wise dashboard preprocessing (the original `apply` path)
+vs the vectorized `queries.items_to_dataframe`.
+
+Usage (from compute/streamlit):
+    python benchmarks/bench_preprocessing.py --rows 100000 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from queries import items_to_dataframe  # noqa: E402
+
+STATUSES = ["success", "failed", "upcoming", "upcomming", "Success", None, ""]
+LAUNCHPADS = [f"pad-{i}" for i in range(6)]
+
+
+def make_items(n, seed=42):
+    """Items with the shape returned by the dashboard projection."""
+    rng = random.Random(seed)
+    start = datetime(2006, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for i in range(n):
+        launch_date = start + timedelta(minutes=rng.randrange(0, 20 * 365 * 24 * 60))
+        items.append({
+            "id": f"launch-{i:06d}",
+            "launch_date": launch_date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "launch_status": rng.choice(STATUSES),
+            "launchpad_id": rng.choice(LAUNCHPADS),
+            "flight_number": i,
+            "launch_date_precision": "hour",
+        })
+    return items
+
+
+def legacy_preprocess(items):
+    # Copy of the original row-wise implementation (fetch + render block)
+    df = pd.DataFrame(items)
+    for c in ["launch_date", "launch_status", "launchpad_id", "id"]:
+        if c not in df.columns:
+            df[c] = None
+
+    def parse_iso_safe(v):
+        try:
+            if isinstance(v, datetime):
+                return v
+            return pd.to_datetime(v, utc=True)
+        except Exception:
+            return pd.NaT
+
+    df["launch_date"] = df["launch_date"].apply(parse_iso_safe)
+    df["launch_status"] = df["launch_status"].astype(str).str.lower().fillna("unknown")
+    df["launch_status"] = df["launch_status"].replace({"upcomming": "upcoming"})
+
+    df["date_utc"] = pd.to_datetime(df["launch_date"]).dt.tz_convert("UTC").dt.date
+    df["month"] = pd.to_datetime(df["launch_date"]).dt.tz_convert(None).dt.to_period("M").astype(str)
+
+    def map_state(s):
+        s = str(s).lower()
+        if "success" in s:
+            return "success"
+        if "fail" in s or "failure" in s or "failed" in s:
+            return "failed"
+        if "upcoming" in s or "upcomming" in s:
+            return "upcoming"
+        return s or "unknown"
+    df["state_norm"] = df["launch_status"].apply(map_state)
+    return df
+
+
+def best_of(fn, items, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(items)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def check_equivalent(items):
+    """Both paths must agree on the columns the charts group by."""
+    legacy = legacy_preprocess(items)
+    vectorized = items_to_dataframe(items)
+    assert (legacy["month"] == vectorized["month"]).all()
+    assert (pd.to_datetime(legacy["date_utc"]) == vectorized["date_utc"].dt.tz_convert(None)).all()
+    top = {"success", "failed", "upcoming"}
+    legacy_state = legacy["state_norm"].where(legacy["state_norm"].isin(top), "other")
+    assert (legacy_state == vectorized["state_norm"].astype(str)).all()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--rows", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    items = make_items(args.rows)
+    check_equivalent(items[:5000])
+
+    cases = [
+        ("row-wise apply", legacy_preprocess),
+        ("vectorized", items_to_dataframe),
+    ]
+
+    baseline = None
+    print(f"{'mode':<16}{'seconds':>10}{'rows/s':>14}{'speedup':>10}")
+    for name, fn in cases:
+        elapsed = best_of(fn, items, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<16}{elapsed:>10.3f}{args.rows / elapsed:>14,.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ AWS_REGION="${1:-us-east-1}"
 ECR_REPO_URL="${2:-}"
 IMAGE_TAG="${3:-latest}"
 DOCKERFILE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# Contexto de build: compute/, para incluir los módulos compartidos de compute/shared
+BUILD_CONTEXT="$(cd "$DOCKERFILE_DIR/.." && pwd)"
 
 # Validate inputs
 if [ -z "$ECR_REPO_URL" ]; then
@@ -82,11 +84,11 @@ echo "✓ ECR login successful"
 # Step 6: Build Docker image
 echo ""
 echo "✓ Step 6: Building Docker image..."
-echo "   Command: docker build -t $IMAGE_NAME -f $DOCKERFILE_DIR/Dockerfile $DOCKERFILE_DIR"
+echo "   Command: docker build -t $IMAGE_NAME -f $DOCKERFILE_DIR/Dockerfile $BUILD_CONTEXT"
 if ! docker build \
     -t "$IMAGE_NAME" \
     -f "$DOCKERFILE_DIR/Dockerfile" \
-    "$DOCKERFILE_DIR"; then
+    "$BUILD_CONTEXT"; then
     echo "❌ Error: Docker build failed"
     exit 1
 fi
@@ -0,0 +1,19 @@
+# exports.py
+# Exportación bajo demanda de los datos del dashboard (CSV y Parquet)
+
+
+def csv_export(df):
+    """
+    Devuelve el CSV de `df` como bytes (UTF-8). `st.download_button` necesita
+    el contenido completo en memoria; el ahorro está en llamarlo solo al pulsar
+    la descarga, no en cada rerun.
+    """
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def parquet_export(df):
+    """
+    Devuelve `df` como Parquet (pyarrow, snappy) en bytes. Conserva los tipos
+    (category, Int32, fechas UTC) y ocupa mucho menos que el CSV.
+    """
+    return df.to_parquet(None, engine="pyarrow", compression="snappy", index=False)
@@ -0,0 +1,141 @@
+# launch_store.py
+# Caché local e incremental de lanzamientos por rango de fechas
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from queries import range_bounds
+
+# Límites de la caché: filas totales y antigüedad de cada intervalo descargado
+CACHE_MAX_ROWS = int(os.environ.get("DASHBOARD_CACHE_MAX_ROWS", "200000"))
+CACHE_MAX_AGE = int(os.environ.get("DASHBOARD_CACHE_MAX_AGE", "300"))
+
+ONE_DAY = timedelta(days=1)
+
+
+def _concat_keeping_categories(old, new):
+    """`pd.concat` vuelve a object las columnas category con categorías distintas; se restauran."""
+    combined = pd.concat([old, new], ignore_index=True)
+    for column, dtype in new.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(combined[column].dtype, pd.CategoricalDtype):
+            combined[column] = combined[column].astype("category")
+    return combined
+
+
+class LaunchStore:
+    """
+    Almacén por proceso de los items ya leídos de DynamoDB, ordenados por
+    `launch_date`. Registra qué intervalos de días están materializados (y
+    cuándo se descargaron) para que un rango nuevo solo consulte los
+    sub-intervalos que faltan. Los intervalos caducan tras `max_age_seconds`
+    y, si se superan `max_rows` filas, se expulsan los menos usados.
+
+    `to_frame` convierte cada lote descargado en DataFrame una sola vez al
+    insertarlo (p.ej. `queries.items_to_dataframe`), de modo que las lecturas
+    posteriores solo recortan filas ya normalizadas.
+    """
+
+    def __init__(self, max_rows=CACHE_MAX_ROWS, max_age_seconds=CACHE_MAX_AGE, clock=time.monotonic,
+                 to_frame=pd.DataFrame):
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._to_frame = to_frame
+        self._rows = pd.DataFrame(columns=["launch_date"])
+        # Intervalos disjuntos: {"start": date, "end": date, "fetched_at": t, "used_at": t}
+        self._intervals = []
+        self._lock = threading.Lock()
+
+    def get(self, start_date: date, end_date: date, fetch):
+        """
+        Devuelve (filas del rango, métodos usados). `fetch(start, end)` debe
+        devolver (items, método) y solo se llama para los huecos no cacheados.
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+
+            methods = []
+            for gap_start, gap_end in self.missing(start_date, end_date):
+                items, method = fetch(gap_start, gap_end)
+                self._add(gap_start, gap_end, items, now)
+                methods.append(method)
+
+            for interval in self._overlapping(start_date, end_date):
+                interval["used_at"] = now
+            self._evict_oversize(start_date, end_date)
+
+            return self._slice(start_date, end_date), methods
+
+    def missing(self, start_date: date, end_date: date):
+        """Sub-intervalos de [start_date, end_date] que no están materializados."""
+        gaps = []
+        cursor = start_date
+        for interval in sorted(self._overlapping(start_date, end_date), key=lambda i: i["start"]):
+            if interval["start"] > cursor:
+                gaps.append((cursor, interval["start"] - ONE_DAY))
+            cursor = max(cursor, interval["end"] + ONE_DAY)
+        if cursor <= end_date:
+            gaps.append((cursor, end_date))
+        return gaps
+
+    def stats(self):
+        """Resumen de la caché para mostrarlo en el dashboard."""
+        with self._lock:
+            return {
+                "rows": len(self._rows),
+                "intervals": len(self._intervals),
+                "memory_bytes": int(self._rows.memory_usage(deep=True).sum()),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._rows = self._rows.iloc[0:0]
+            self._intervals = []
+
+    # ---------- internos ----------
+    def _overlapping(self, start_date, end_date):
+        return [i for i in self._intervals if i["start"] <= end_date and i["end"] >= start_date]
+
+    def _mask(self, start_date, end_date):
+        dates = self._rows["launch_date"]
+        low, high = range_bounds(start_date, end_date)
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            low, high = pd.Timestamp(low), pd.Timestamp(high)
+        return (dates >= low) & (dates <= high)
+
+    def _slice(self, start_date, end_date):
+        rows = self._rows[self._mask(start_date, end_date)]
+        return rows.reset_index(drop=True)
+
+    def _drop(self, interval):
+        self._intervals.remove(interval)
+        self._rows = self._rows[~self._mask(interval["start"], interval["end"])]
+
+    def _add(self, start_date, end_date, items, now):
+        if len(items):
+            rows = self._to_frame(items)
+            if len(self._rows):
+                rows = _concat_keeping_categories(self._rows, rows)
+            self._rows = rows
+            self._rows = self._rows.sort_values("launch_date", kind="stable", ignore_index=True)
+        self._intervals.append({"start": start_date, "end": end_date, "fetched_at": now, "used_at": now})
+
+    def _evict_expired(self, now):
+        for interval in list(self._intervals):
+            if now - interval["fetched_at"] >= self.max_age_seconds:
+                self._drop(interval)
+
+    def _evict_oversize(self, start_date, end_date):
+        # Nunca se expulsa lo que cubre el rango pedido en esta llamada
+        candidates = sorted(
+            (i for i in self._intervals if i["start"] > end_date or i["end"] < start_date),
+            key=lambda i: i["used_at"],
+        )
+        for interval in candidates:
+            if len(self._rows) <= self.max_rows:
+                break
+            self._drop(interval)
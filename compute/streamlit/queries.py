@@ -0,0 +1,587 @@
+# queries.py
+# Acceso a DynamoDB del dashboard (sin dependencias de Streamlit)
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import boto3
+import pandas as pd
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+try:
+    import date_keys
+except ImportError:  # ejecución desde el repo: el módulo compartido vive en compute/shared
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+    import date_keys
+from sidecars import MIGRATION_KEY, MIGRATION_NAME, REFERENCE_KEY, ROLLUP_PREFIX, rollup_partition
+
+# ---------- Config ----------
+DYNAMODB_TABLE = os.environ.get("DYNAMODB_TABLE_NAME") #
+AWS_REGION = os.environ.get("AWS_REGION")
+
+# GSI particionado por mes (YYYY-MM) con launch_date como sort key
+MONTH_BUCKET_GSI = "launch_month-index"
+MONTH_BUCKET_ATTRIBUTE = date_keys.MONTH_BUCKET_ATTRIBUTE
+# Sort keys de rango admitidos en el GSI: la clave ISO canónica o su versión numérica
+RANGE_ATTRIBUTES = ("launch_date", date_keys.DATE_UNIX_ATTRIBUTE)
+
+# Consultas por bucket mensual que se lanzan en paralelo
+QUERY_WORKERS = int(os.environ.get("DASHBOARD_QUERY_WORKERS", "8"))
+
+# Segmentos del Scan paralelo usado como último recurso
+SCAN_SEGMENTS = int(os.environ.get("DASHBOARD_SCAN_SEGMENTS", "4"))
+
+# Segundos durante los que se reutiliza el resultado de DescribeTable
+INDEX_CACHE_TTL = int(os.environ.get("DASHBOARD_INDEX_CACHE_TTL", "600"))
+
+# Rollups pre-agregados que mantiene la Lambda (ver compute/lambda/rollups.py).
+# Hasta este número de días la línea usa rollups diarios; por encima, mensuales
+ROLLUP_DAILY_MAX_DAYS = int(os.environ.get("DASHBOARD_ROLLUP_DAILY_MAX_DAYS", "366"))
+
+# Segundos durante los que el proceso reutiliza los nombres leídos
+REFERENCE_CACHE_TTL = int(os.environ.get("DASHBOARD_REFERENCE_CACHE_TTL", "3600"))
+
+# Estados que distinguen las gráficas; el resto se agrupa como "other"
+STATE_CATEGORIES = ["success", "failed", "upcoming", "other"]
+
+# Tipos compactos para las columnas del dashboard: DynamoDB devuelve Decimal y
+# str, y `pd.DataFrame(items)` dejaría todo como object. Int32 es el entero
+# nullable de pandas (hay lanzamientos sin flight_number).
+COLUMN_DTYPES = {
+    "flight_number": "Int32",
+    "launch_window": "Int32",
+    "launch_status": "category",
+    "launchpad_id": "category",
+    "launch_date_precision": "category",
+    "month": "category",
+}
+
+# Atributos que necesita cada vista. Las gráficas solo leen estos campos (son
+# los que proyecta el GSI mensual); el detalle se pide aparte con BatchGetItem
+# y solo para las filas que se muestran o exportan.
+CHART_ATTRIBUTES = ("id", "launch_date", "launch_status", "launchpad_id")
+DETAIL_ATTRIBUTES = (
+    "flight_number", "mission_name", "rocket_id", "rocket_name", "launchpad_name",
+    "launch_date_precision", "static_fire_date",
+    "launch_window", "crew", "capsules", "fairings_reused", "fairings_recovery_attempt",
+    "fairings_recovered", "details",
+)
+VIEW_ATTRIBUTES = {
+    "charts": CHART_ATTRIBUTES,
+    "detail": CHART_ATTRIBUTES + DETAIL_ATTRIBUTES,
+}
+
+# Límite de claves por BatchGetItem impuesto por DynamoDB
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BACKOFF_SECONDS = 0.05
+
+# Caché por proceso: (tabla, atributos) -> (expira_en, índice resuelto o None)
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+
+
+# ---------- Utils ----------
+def get_dynamodb_table():
+    """
+    Crea cliente/resource de boto3. Asume que las credenciales AWS están configuradas
+    con variables de entorno, profile, o IAM role si corre en AWS.
+    """
+    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
+    return dynamodb.Table(DYNAMODB_TABLE)
+
+
+def range_bounds(start_date: date, end_date: date, attribute="launch_date"):
+    """Límites inclusivos de [start_date, end_date] para el sort key `attribute`."""
+    if attribute == date_keys.DATE_UNIX_ATTRIBUTE:
+        return date_keys.day_range_unix(start_date, end_date)
+    return date_keys.day_range_keys(start_date, end_date)
+
+
+def month_buckets(start_date: date, end_date: date) -> list:
+    """Lista los buckets YYYY-MM que cubren [start_date, end_date]."""
+    months = []
+    # Mismo formato que `date_keys.month_bucket` (el que escribe la Lambda)
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def view_attributes(*views):
+    """Unión ordenada (sin duplicados) de los atributos de las vistas indicadas."""
+    return tuple(dict.fromkeys(a for view in views for a in VIEW_ATTRIBUTES[view]))
+
+
+def build_projection(attributes):
+    """
+    ProjectionExpression mínima para `attributes`. Usa placeholders (#p0...)
+    para no chocar con palabras reservadas de DynamoDB; boto3 añade los suyos
+    (#n0...) para las condiciones de Key/Attr.
+    """
+    names = {f"#p{i}": attribute for i, attribute in enumerate(attributes)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def _paginate(operation, **kwargs):
+    """
+    Ejecuta query/scan siguiendo LastEvaluatedKey. Se usa con `table.meta.client`:
+    a diferencia del resource Table es thread-safe (consultas paralelas) y, al
+    venir del resource, acepta condiciones de boto3 y devuelve items ya
+    deserializados.
+    """
+    items = []
+    while True:
+        resp = operation(**kwargs)
+        items.extend(resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return items
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def _projection_covers(gsi, key_attributes, attributes):
+    """Indica si la proyección del GSI incluye todos los `attributes` pedidos."""
+    projection = gsi.get("Projection", {})
+    projection_type = projection.get("ProjectionType", "ALL")
+    if projection_type == "ALL":
+        return True
+    available = set(key_attributes)
+    if projection_type == "INCLUDE":
+        available.update(projection.get("NonKeyAttributes", []))
+    return set(attributes) <= available
+
+
+def resolve_date_index(description, attributes):
+    """
+    A partir de la respuesta de DescribeTable elige el GSI activo con
+    HASH `launch_month` y RANGE `launch_date` (o `date_unix`) cuya proyección
+    cubra `attributes`. Devuelve {"name", "projection", "range"} o None si no
+    hay ninguno.
+    """
+    table = description["Table"]
+    table_keys = [k["AttributeName"] for k in table.get("KeySchema", [])]
+    candidates = []
+    for gsi in table.get("GlobalSecondaryIndexes", []):
+        if gsi.get("IndexStatus", "ACTIVE") != "ACTIVE":
+            continue
+        keys = {k["KeyType"]: k["AttributeName"] for k in gsi["KeySchema"]}
+        if keys.get("HASH") != MONTH_BUCKET_ATTRIBUTE or keys.get("RANGE") not in RANGE_ATTRIBUTES:
+            continue
+        if not _projection_covers(gsi, table_keys + list(keys.values()), attributes):
+            continue
+        candidates.append(gsi)
+    if not candidates:
+        return None
+    # Preferimos el nombre que crea Terraform si hay varios equivalentes
+    candidates.sort(key=lambda gsi: gsi["IndexName"] != MONTH_BUCKET_GSI)
+    gsi = candidates[0]
+    return {
+        "name": gsi["IndexName"],
+        "projection": gsi.get("Projection", {}).get("ProjectionType", "ALL"),
+        "range": next(k["AttributeName"] for k in gsi["KeySchema"] if k["KeyType"] == "RANGE"),
+    }
+
+
+def date_keys_migrated(table):
+    """
+    Indica si ya se ejecutó la migración que añade `launch_month` a los
+    lanzamientos antiguos (un GetItem sobre `MIGRATION_KEY`).
+    """
+    item = table.meta.client.get_item(
+        TableName=table.name, Key=MIGRATION_KEY, ProjectionExpression="#m", ExpressionAttributeNames={"#m": MIGRATION_NAME},
+    ).get("Item") or {}
+    return bool(item.get(MIGRATION_NAME))
+
+
+def discover_date_index(table, attributes=CHART_ATTRIBUTES, ttl=INDEX_CACHE_TTL):
+    """
+    Resuelve (una vez por proceso y `ttl`) qué GSI sirve para consultas por
+    rango de launch_date que lean `attributes`, usando DescribeTable, sin
+    Queries de prueba. Devuelve el índice o None si hay que usar Scan: también
+    mientras no se haya ejecutado la migración de `launch_month`.
+    """
+    now = time.monotonic()
+    cache_key = (table.name, tuple(attributes))
+    with _index_cache_lock:
+        cached = _index_cache.get(cache_key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    try:
+        index = resolve_date_index(table.meta.client.describe_table(TableName=table.name), attributes)
+        if index and not date_keys_migrated(table):
+            index = None
+    except ClientError:
+        # Sin permiso o tabla inaccesible: no se puede planificar una Query
+        index = None
+
+    with _index_cache_lock:
+        _index_cache[cache_key] = (now + ttl, index)
+    return index
+
+
+def clear_index_cache():
+    """Olvida los índices resueltos (p.ej. tras crear el GSI)."""
+    with _index_cache_lock:
+        _index_cache.clear()
+
+
+def query_month_bucket(table, month, low, high, attributes=CHART_ATTRIBUTES, index_name=MONTH_BUCKET_GSI,
+                       range_attribute="launch_date"):
+    """
+    Query paginada de un bucket mensual del GSI, acotada por su sort key. Las
+    claves son canónicas, así que la condición es exacta (sin FilterExpression).
+    """
+    return _paginate(
+        table.meta.client.query,
+        TableName=table.name,
+        IndexName=index_name,
+        KeyConditionExpression=Key(MONTH_BUCKET_ATTRIBUTE).eq(month) & Key(range_attribute).between(low, high),
+        **build_projection(attributes),
+    )
+
+
+def query_by_month_buckets(table, start_date: date, end_date: date, low, high,
+                           attributes=CHART_ATTRIBUTES, index_name=MONTH_BUCKET_GSI, workers=QUERY_WORKERS,
+                           range_attribute="launch_date"):
+    """
+    Planificador de consultas por rango: una Query por bucket mensual del rango,
+    lanzadas en paralelo. Las lecturas escalan con el rango, no con la tabla.
+    """
+    months = month_buckets(start_date, end_date)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(months)))) as pool:
+        results = pool.map(
+            lambda m: query_month_bucket(
+                table, m, low, high, attributes=attributes, index_name=index_name, range_attribute=range_attribute
+            ),
+            months,
+        )
+        return [item for items in results for item in items]
+
+
+def scan_segment(table, segment, total_segments, start_iso, end_iso, attributes=CHART_ATTRIBUTES):
+    """Scan paginado de un segmento con filtro por launch_date. Devuelve (items, ms)."""
+    started = time.perf_counter()
+    items = _paginate(
+        table.meta.client.scan,
+        TableName=table.name,
+        Segment=segment,
+        TotalSegments=total_segments,
+        FilterExpression=Attr("launch_date").between(start_iso, end_iso),
+        **build_projection(attributes),
+    )
+    return items, (time.perf_counter() - started) * 1000.0
+
+
+def scan_with_filter(table, start_iso, end_iso, segments=SCAN_SEGMENTS, attributes=CHART_ATTRIBUTES):
+    """
+    Fallback: scan paralelo (Segment/TotalSegments) con FilterExpression, un hilo
+    por segmento. Sigue leyendo toda la tabla, pero la latencia es la del
+    segmento más lento en vez de la suma de todas las páginas. Usa
+    ProjectionExpression para reducir tamaño. Devuelve (items, ms por segmento).
+    """
+    segments = max(1, segments)
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        results = list(pool.map(
+            lambda segment: scan_segment(table, segment, segments, start_iso, end_iso, attributes),
+            range(segments),
+        ))
+    items = [item for segment_items, _ in results for item in segment_items]
+    return items, [ms for _, ms in results]
+
+
+def fetch_raw_items(table, start_date: date, end_date: date, attributes=CHART_ATTRIBUTES):
+    """
+    Lee de DynamoDB los `attributes` de los items entre las dos fechas
+    (inclusive), sin normalizar. Usa el GSI por bucket mensual resuelto con
+    DescribeTable; si no existe, su proyección no cubre las columnas o aún no
+    se ha migrado `launch_month`, hace un Scan paralelo (menos óptimo).
+    Devuelve (items, método).
+    """
+    # Límites canónicos: todo el primer día hasta las 23:59:59.999Z del último
+    start_iso, end_iso = range_bounds(start_date, end_date)
+
+    index = discover_date_index(table, attributes)
+    if index:
+        low, high = range_bounds(start_date, end_date, index["range"])
+        items = query_by_month_buckets(
+            table, start_date, end_date, low, high,
+            attributes=attributes, index_name=index["name"], range_attribute=index["range"],
+        )
+        return items, f"query_gsi {index['name']}"
+
+    # fallback a scan paralelo con filtro
+    items, timings = scan_with_filter(table, start_iso, end_iso, attributes=attributes)
+    return items, f"scan_filter x{len(timings)} segmentos (" + ", ".join(
+        f"s{i}: {ms:.0f} ms" for i, ms in enumerate(timings)
+    ) + ")"
+
+
+def normalize_state(status):
+    """
+    Agrupa `launch_status` en las categorías de las gráficas con operaciones
+    vectorizadas de texto (equivale al antiguo `map_state` fila a fila).
+    """
+    status = status.astype("string").str.lower()
+    state = pd.Series("other", index=status.index, dtype="object")
+    # El orden importa: la primera coincidencia gana, como en el if/elif original
+    for label, pattern in (("upcoming", "upcom"), ("failed", "fail"), ("success", "success")):
+        state = state.mask(status.str.contains(pattern, regex=False, na=False), label)
+    return pd.Categorical(state, categories=STATE_CATEGORIES)
+
+
+def items_to_dataframe(items):
+    """
+    Convierte los items de DynamoDB en el DataFrame que usan las gráficas. Toda
+    la normalización es vectorizada y se hace una sola vez al cargar: fecha UTC,
+    estado normalizado (`state_norm`), `month` y `date_utc` precalculados.
+    """
+    # Normalizar a DataFrame
+    if len(items) == 0:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(items)
+    # Asegura columnas mínimas
+    for c in ["launch_date", "launch_status", "launchpad_id", "id"]:
+        if c not in df.columns:
+            df[c] = None
+
+    # Se conserva la sort key tal cual para pedir el detalle con BatchGetItem
+    df["launch_key"] = df["launch_date"]
+    # Un único parseo de launch_date; valores no parseables quedan como NaT
+    df["launch_date"] = pd.to_datetime(df["launch_date"], utc=True, errors="coerce", format="ISO8601")
+    # Normaliza estado (arreglando el typo "upcomming")
+    df["launch_status"] = (
+        df["launch_status"].astype("string").str.lower().fillna("unknown").replace({"upcomming": "upcoming"})
+    )
+    # Columnas derivadas para agrupar sin volver a parsear fechas
+    df["state_norm"] = normalize_state(df["launch_status"])
+    df["date_utc"] = df["launch_date"].dt.floor("D")
+    df["month"] = df["launch_date"].dt.tz_convert(None).dt.to_period("M").astype(str)
+    return apply_dtypes(df)
+
+
+def apply_dtypes(df):
+    """Convierte las columnas conocidas a los tipos compactos de `COLUMN_DTYPES`."""
+    for column, dtype in COLUMN_DTYPES.items():
+        if column not in df.columns:
+            continue
+        if dtype.startswith("Int"):
+            # Decimal -> numérico vectorizado; valores no numéricos quedan como <NA>
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def _batch_get(table, keys, projection):
+    """BatchGetItem de hasta 100 claves, reintentando UnprocessedKeys con backoff."""
+    request = {table.name: {"Keys": keys, **projection}}
+    items = []
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        response = table.meta.client.batch_get_item(RequestItems=request)
+        items.extend(response.get("Responses", {}).get(table.name, []))
+        request = response.get("UnprocessedKeys") or {}
+        if not request.get(table.name, {}).get("Keys"):
+            break
+        time.sleep(BATCH_GET_BACKOFF_SECONDS * (2 ** attempt))
+    return items
+
+
+def fetch_details(table, keys, attributes=DETAIL_ATTRIBUTES, workers=QUERY_WORKERS):
+    """
+    Lee bajo demanda las columnas de detalle de `keys` ({"id", "launch_date"})
+    con BatchGetItem en bloques de 100 claves lanzados en paralelo.
+    """
+    projection = build_projection(("id", "launch_date") + tuple(attributes))
+    chunks = [keys[i:i + BATCH_GET_MAX_KEYS] for i in range(0, len(keys), BATCH_GET_MAX_KEYS)]
+    if not chunks:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+        results = pool.map(lambda chunk: _batch_get(table, chunk, projection), chunks)
+        return [item for items in results for item in items]
+
+
+def add_details(table, df, attributes=DETAIL_ATTRIBUTES):
+    """
+    Devuelve una copia de `df` con las columnas de detalle de sus filas. Solo se
+    llama para la tabla de muestra o al exportar, nunca para las gráficas.
+    """
+    if df.empty:
+        return df
+    keys = [{"id": i, "launch_date": k} for i, k in zip(df["id"], df["launch_key"])]
+    details = pd.DataFrame(fetch_details(table, keys, attributes))
+    if details.empty:
+        return df
+    details = details.rename(columns={"launch_date": "launch_key"})
+    for column in details.columns:
+        # Listas/mapas (crew, capsules) como JSON para que CSV y Parquet los acepten
+        if details[column].map(lambda v: isinstance(v, (list, dict))).any():
+            details[column] = details[column].map(lambda v: json.dumps(v, default=str) if v is not None else None)
+    merged = df.drop(columns=[c for c in attributes if c in df.columns]).merge(
+        details, on=["id", "launch_key"], how="left"
+    )
+    return apply_dtypes(merged)
+
+
+def memory_report(df):
+    """Bytes por columna (`memory_usage(deep=True)`) y tipo, para el panel de depuración."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "columna": usage.index,
+        "dtype": [str(df[c].dtype) for c in usage.index],
+        "bytes": usage.values,
+    })
+    return report.sort_values("bytes", ascending=False, ignore_index=True)
+
+
+def load_reference(table):
+    """
+    Lee el ítem de referencia que escribe la Lambda (un GetItem). Devuelve
+    {"launchpads": {id: {...}}, "rockets": {id: {...}}}; vacío si no existe.
+    """
+    try:
+        item = table.get_item(Key=REFERENCE_KEY).get("Item") or {}
+    except ClientError:
+        item = {}
+    return {"launchpads": dict(item.get("launchpads") or {}), "rockets": dict(item.get("rockets") or {})}
+
+
+def launchpad_labels(reference):
+    """{launchpad_id: nombre} para etiquetar las gráficas."""
+    return {pad_id: pad["name"] for pad_id, pad in reference["launchpads"].items() if pad.get("name")}
+
+
+def label_launchpads(launchpads, labels):
+    """Añade la columna `launchpad` con el nombre (o el id si no se conoce)."""
+    ids = launchpads["launchpad_id"].astype(str)
+    return launchpads.assign(launchpad=ids.map(labels).fillna(ids))
+
+
+def chart_frames_from_items(df):
+    """
+    Agregados de las cuatro gráficas calculados a partir de los items ya
+    normalizados (modo detalle). Misma forma que `chart_frames_from_rollups`.
+    """
+    monthly = (
+        df[df["state_norm"].isin(["success", "failed"])]
+        .groupby(["month", "state_norm"], observed=True)
+        .size()
+        .reset_index(name="count")
+    )
+    launchpads = df.groupby("launchpad_id", observed=True).size().reset_index(name="count").sort_values("count", ascending=False)
+    daily = df.groupby("date_utc").size().reset_index(name="count").sort_values("date_utc")
+    states = df["state_norm"].value_counts().reset_index()
+    states.columns = ["state", "count"]
+    return {
+        "total": len(df),
+        "monthly": monthly,
+        "launchpads": launchpads,
+        "daily": daily,
+        "states": states[states["count"] > 0],
+    }
+
+
+def _is_full_month(month, start_date: date, end_date: date):
+    year, number = int(month[:4]), int(month[5:7])
+    first = date(year, number, 1)
+    following = date(year + 1, 1, 1) if number == 12 else date(year, number + 1, 1)
+    return start_date <= first and following - timedelta(days=1) <= end_date
+
+
+def query_rollup_partition(table, partition, low, high):
+    """Query de una partición de rollups acotada por periodo (`rollup#<low>` .. `rollup#<high>`)."""
+    return _paginate(
+        table.meta.client.query,
+        TableName=table.name,
+        KeyConditionExpression=Key("id").eq(partition)
+        & Key("launch_date").between(ROLLUP_PREFIX + low, ROLLUP_PREFIX + high),
+    )
+
+
+def fetch_rollups(table, start_date: date, end_date: date, workers=QUERY_WORKERS):
+    """
+    Lee los rollups que cubren [start_date, end_date]. Los rollups diarios están
+    particionados por mes y los mensuales por año, así que el número de
+    lecturas depende de la longitud del rango y no de cuántos lanzamientos hay.
+    En rangos largos los meses completos se leen del rollup mensual y solo los
+    meses de los extremos bajan a nivel de día. Devuelve (items, granularidad).
+    """
+    months = month_buckets(start_date, end_date)
+    low, high = start_date.isoformat(), end_date.isoformat()
+    if (end_date - start_date).days + 1 <= ROLLUP_DAILY_MAX_DAYS:
+        granularity = "day"
+        requests = [(rollup_partition("day", m), low, high) for m in months]
+    else:
+        granularity = "month"
+        full = [m for m in months if _is_full_month(m, start_date, end_date)]
+        requests = [(rollup_partition("day", m), low, high) for m in months if m not in full]
+        for year in sorted({m[:4] for m in full}):
+            requests.append((rollup_partition("month", year), full[0], full[-1]))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(requests)))) as pool:
+        results = pool.map(lambda r: query_rollup_partition(table, *r), requests)
+        return [item for items in results for item in items], granularity
+
+
+def chart_frames_from_rollups(items, granularity):
+    """
+    Agregados de las cuatro gráficas a partir de los rollups, sin leer
+    lanzamientos. Con granularidad "month" la línea tiene un punto por mes.
+    """
+    if len(items) == 0:
+        return None
+    df = pd.DataFrame(items)
+    counters = [c for c in df.columns if c.startswith("n_")]
+    # DynamoDB devuelve los números como Decimal
+    df[counters] = df[counters].apply(pd.to_numeric).fillna(0).astype("int64")
+    df["month"] = df["period"].str[:7]
+
+    status_columns = [c for c in counters if c.startswith("n_status_")]
+    pad_columns = [c for c in counters if c.startswith("n_pad_")]
+
+    by_status = df[status_columns].sum()
+    by_status.index = by_status.index.str[len("n_status_"):]
+    state_norm = normalize_state(pd.Series(by_status.index, index=by_status.index))
+    states = by_status.groupby(state_norm, observed=False).sum().reset_index()
+    states.columns = ["state", "count"]
+
+    outcome_columns = [c for c in ("n_status_success", "n_status_failed") if c in df.columns]
+    monthly = df.groupby("month")[outcome_columns].sum()
+    monthly.columns = [c[len("n_status_"):] for c in monthly.columns]
+    monthly = monthly.reset_index().melt(id_vars="month", var_name="state_norm", value_name="count")
+
+    launchpads = df[pad_columns].sum()
+    launchpads.index = launchpads.index.str[len("n_pad_"):]
+    launchpads = launchpads.rename_axis("launchpad_id").reset_index(name="count")
+    launchpads = launchpads[launchpads["count"] > 0].sort_values("count", ascending=False)
+
+    period = df["period"] if granularity == "day" else df["month"]
+    dates = pd.to_datetime(period, utc=True, format="ISO8601")
+    daily = df.assign(date_utc=dates).groupby("date_utc")["n_total"].sum()
+    daily = daily.reset_index(name="count").sort_values("date_utc")
+
+    return {
+        # Los rollups diarios y mensuales leídos nunca se solapan
+        "total": int(df["n_total"].sum()),
+        "monthly": monthly[monthly["count"] > 0],
+        "launchpads": launchpads,
+        "daily": daily,
+        "states": states[states["count"] > 0],
+    }
+
+
+def fetch_items_by_date_range(start_date: date, end_date: date, table=None):
+    """
+    Devuelve (DataFrame, método) con los items entre las dos fechas (inclusive)
+    leídos directamente de DynamoDB (sin caché local).
+    """
+    table = table if table is not None else get_dynamodb_table()
+    items, method = fetch_raw_items(table, start_date, end_date)
+    return items_to_dataframe(items), method
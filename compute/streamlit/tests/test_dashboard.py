@@ -0,0 +1,378 @@
+import unittest
+import sys
+import os
+from datetime import date
+
+import boto3
+from moto import mock_aws
+
+# Add parent directory to path to import the dashboard modules
+STREAMLIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, STREAMLIT_DIR)
+# The rollups are built with the Lambda's own code (compute/lambda/rollups.py)
+sys.path.append(os.path.join(STREAMLIT_DIR, "..", "lambda"))
+
+import queries
+from date_keys import key_attributes
+from launch_store import LaunchStore
+from queries import (
+    CHART_ATTRIBUTES, MIGRATION_KEY, MIGRATION_NAME, chart_frames_from_items, chart_frames_from_rollups,
+    clear_index_cache, discover_date_index, fetch_raw_items, fetch_rollups, items_to_dataframe, month_buckets,
+    resolve_date_index,
+)
+from rollups import rebuild_rollups
+
+TABLE_NAME = "test-launches-table"
+
+LAUNCHES = [
+    ("launch-1", "2019-12-20T10:00:00.000Z", "success", "pad-a"),
+    ("launch-2", "2019-12-31T23:59:59.999Z", "failed", "pad-b"),
+    ("launch-3", "2020-01-01T00:00:00.000Z", "success", "pad-a"),
+    ("launch-4", "2020-01-01T18:30:00.000Z", "upcoming", "pad-a"),
+    ("launch-5", "2020-01-15T12:00:00.000Z", "success", "pad-c"),
+    ("launch-6", "2020-02-29T08:00:00.000Z", "failed", "pad-b"),
+    ("launch-7", "2020-03-10T08:00:00.000Z", "success", "pad-b"),
+]
+
+
+def month_gsi(name="launch_month-index", range_attribute="launch_date", projection=None, status="ACTIVE"):
+    """GSI entry with the shape returned by DescribeTable."""
+    return {
+        "IndexName": name,
+        "IndexStatus": status,
+        "KeySchema": [
+            {"AttributeName": "launch_month", "KeyType": "HASH"},
+            {"AttributeName": range_attribute, "KeyType": "RANGE"},
+        ],
+        "Projection": projection or {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["launch_status", "launchpad_id"]},
+    }
+
+
+def describe(*indexes):
+    return {
+        "Table": {
+            "TableName": TABLE_NAME,
+            "KeySchema": [
+                {"AttributeName": "id", "KeyType": "HASH"},
+                {"AttributeName": "launch_date", "KeyType": "RANGE"},
+            ],
+            "GlobalSecondaryIndexes": list(indexes),
+        }
+    }
+
+
+def create_table():
+    """Same key schema and month GSI as terraform/modules/dynamodb."""
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    dynamodb.create_table(
+        TableName=TABLE_NAME,
+        BillingMode="PAY_PER_REQUEST",
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "launch_date", "AttributeType": "S"},
+            {"AttributeName": "launch_month", "AttributeType": "S"},
+        ],
+        KeySchema=[
+            {"AttributeName": "id", "KeyType": "HASH"},
+            {"AttributeName": "launch_date", "KeyType": "RANGE"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "launch_month-index",
+            "KeySchema": [
+                {"AttributeName": "launch_month", "KeyType": "HASH"},
+                {"AttributeName": "launch_date", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["launch_status", "launchpad_id"]},
+        }],
+    )
+    return dynamodb.Table(TABLE_NAME)
+
+
+def put_launches(table, launches=LAUNCHES):
+    with table.batch_writer() as batch:
+        for launch_id, launch_date, status, pad in launches:
+            batch.put_item(Item={
+                "id": launch_id,
+                **key_attributes(launch_date),
+                "launch_status": status,
+                "launchpad_id": pad,
+            })
+
+
+def comparable(frames):
+    """Chart frames as plain values, independent of dtypes and row order."""
+    return {
+        "total": frames["total"],
+        "monthly": {(str(r.month), str(r.state_norm)): int(r.count) for r in frames["monthly"].itertuples()},
+        "launchpads": {str(r.launchpad_id): int(r.count) for r in frames["launchpads"].itertuples()},
+        "daily": {r.date_utc.date(): int(r.count) for r in frames["daily"].itertuples()},
+        "states": {str(r.state): int(r.count) for r in frames["states"].itertuples()},
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLaunchStore(unittest.TestCase):
+    """Test the incremental per-process launch cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.clock = FakeClock()
+        self.calls = []
+
+    def fetch(self, start, end):
+        self.calls.append((start, end))
+        items = [
+            {"id": f"launch-{start.isoformat()}", "launch_date": f"{start.isoformat()}T12:00:00.000Z"},
+            {"id": f"launch-{end.isoformat()}", "launch_date": f"{end.isoformat()}T12:00:00.000Z"},
+        ]
+        return items, "fake"
+
+    def test_missing_returns_uncovered_gaps(self):
+        """Test that only the days outside the cached intervals are reported"""
+        store = LaunchStore(clock=self.clock)
+        store.get(date(2020, 1, 10), date(2020, 1, 20), self.fetch)
+        store.get(date(2020, 2, 1), date(2020, 2, 10), self.fetch)
+
+        gaps = store.missing(date(2020, 1, 1), date(2020, 2, 28))
+
+        self.assertEqual(gaps, [
+            (date(2020, 1, 1), date(2020, 1, 9)),
+            (date(2020, 1, 21), date(2020, 1, 31)),
+            (date(2020, 2, 11), date(2020, 2, 28)),
+        ])
+        self.assertEqual(store.missing(date(2020, 1, 12), date(2020, 1, 18)), [])
+
+    def test_get_fetches_only_the_gaps(self):
+        """Test that widening a cached range only fetches the new days"""
+        store = LaunchStore(clock=self.clock)
+        store.get(date(2020, 1, 10), date(2020, 1, 20), self.fetch)
+
+        rows, methods = store.get(date(2020, 1, 5), date(2020, 1, 25), self.fetch)
+
+        self.assertEqual(self.calls, [
+            (date(2020, 1, 10), date(2020, 1, 20)),
+            (date(2020, 1, 5), date(2020, 1, 9)),
+            (date(2020, 1, 21), date(2020, 1, 25)),
+        ])
+        self.assertEqual(methods, ["fake", "fake"])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(list(rows["launch_date"]), sorted(rows["launch_date"]))
+
+    def test_intervals_expire(self):
+        """Test that an interval older than max_age_seconds is fetched again"""
+        store = LaunchStore(max_age_seconds=300, clock=self.clock)
+        store.get(date(2020, 1, 1), date(2020, 1, 31), self.fetch)
+
+        self.clock.now = 299
+        store.get(date(2020, 1, 1), date(2020, 1, 31), self.fetch)
+        self.assertEqual(len(self.calls), 1)
+
+        self.clock.now = 300
+        rows, methods = store.get(date(2020, 1, 1), date(2020, 1, 31), self.fetch)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(methods, ["fake"])
+        # The expired rows are dropped, not duplicated
+        self.assertEqual(len(rows), 2)
+
+    def test_oversize_evicts_least_recently_used(self):
+        """Test that eviction drops the least recently used interval outside the requested range"""
+        store = LaunchStore(max_rows=4, clock=self.clock)
+        january = (date(2020, 1, 1), date(2020, 1, 31))
+        february = (date(2020, 2, 1), date(2020, 2, 29))
+        march = (date(2020, 3, 1), date(2020, 3, 31))
+
+        store.get(*january, self.fetch)
+        self.clock.now = 1
+        store.get(*february, self.fetch)
+        self.clock.now = 2
+        # January is used again, so February becomes the least recently used
+        store.get(*january, self.fetch)
+        self.clock.now = 3
+        store.get(*march, self.fetch)
+
+        self.assertEqual(store.stats()["rows"], 4)
+        self.assertEqual(store.missing(*january), [])
+        self.assertEqual(store.missing(*march), [])
+        self.assertEqual(store.missing(*february), [february])
+
+    def test_oversize_keeps_the_requested_range(self):
+        """Test that the interval being returned is never evicted"""
+        store = LaunchStore(max_rows=1, clock=self.clock)
+
+        rows, _ = store.get(date(2020, 1, 1), date(2020, 1, 31), self.fetch)
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(store.missing(date(2020, 1, 1), date(2020, 1, 31)), [])
+
+
+class TestMonthBuckets(unittest.TestCase):
+    """Test the month-bucket planner"""
+
+    def test_single_month(self):
+        """Test that a range inside one month plans one bucket"""
+        self.assertEqual(month_buckets(date(2020, 2, 3), date(2020, 2, 29)), ["2020-02"])
+
+    def test_year_boundary(self):
+        """Test that December and January are both planned across a year change"""
+        self.assertEqual(
+            month_buckets(date(2019, 11, 15), date(2020, 2, 1)),
+            ["2019-11", "2019-12", "2020-01", "2020-02"],
+        )
+
+    def test_several_years(self):
+        """Test that every month is planned once over several years"""
+        buckets = month_buckets(date(2018, 12, 31), date(2021, 1, 1))
+
+        self.assertEqual(len(buckets), 26)
+        self.assertEqual(len(set(buckets)), 26)
+        self.assertEqual(buckets[0], "2018-12")
+        self.assertEqual(buckets[-1], "2021-01")
+        self.assertIn("2019-12", buckets)
+        self.assertIn("2020-01", buckets)
+
+    def test_matches_lambda_buckets(self):
+        """Test that the planned buckets use the launch_month format written by the Lambda"""
+        self.assertEqual(month_buckets(date(2020, 1, 1), date(2020, 1, 1)), [key_attributes("2020-01-01T00:00:00Z")["launch_month"]])
+
+
+class TestResolveDateIndex(unittest.TestCase):
+    """Test index resolution from a DescribeTable payload"""
+
+    def test_resolves_month_index(self):
+        """Test that the Terraform GSI is chosen for the chart attributes"""
+        index = resolve_date_index(describe(month_gsi()), CHART_ATTRIBUTES)
+
+        self.assertEqual(index, {"name": "launch_month-index", "projection": "INCLUDE", "range": "launch_date"})
+
+    def test_numeric_range_key(self):
+        """Test that a GSI sorted by date_unix is accepted"""
+        index = resolve_date_index(describe(month_gsi(name="by-unix", range_attribute="date_unix")), CHART_ATTRIBUTES)
+
+        self.assertEqual(index["range"], "date_unix")
+
+    def test_projection_must_cover_attributes(self):
+        """Test that an INCLUDE projection missing requested columns is rejected"""
+        payload = describe(month_gsi())
+
+        self.assertIsNone(resolve_date_index(payload, CHART_ATTRIBUTES + ("mission_name",)))
+        keys_only = describe(month_gsi(projection={"ProjectionType": "KEYS_ONLY"}))
+        self.assertIsNone(resolve_date_index(keys_only, CHART_ATTRIBUTES))
+        self.assertIsNotNone(resolve_date_index(keys_only, ("id", "launch_date")))
+        full = describe(month_gsi(projection={"ProjectionType": "ALL"}))
+        self.assertIsNotNone(resolve_date_index(full, CHART_ATTRIBUTES + ("mission_name",)))
+
+    def test_ignores_inactive_and_unrelated_indexes(self):
+        """Test that building GSIs and GSIs on other keys are skipped"""
+        other = month_gsi(name="by-rocket")
+        other["KeySchema"][0]["AttributeName"] = "rocket_id"
+        payload = describe(month_gsi(status="CREATING"), other)
+
+        self.assertIsNone(resolve_date_index(payload, CHART_ATTRIBUTES))
+        self.assertIsNone(resolve_date_index(describe(), CHART_ATTRIBUTES))
+
+    def test_prefers_terraform_index_name(self):
+        """Test that the Terraform index wins over an equivalent one"""
+        payload = describe(month_gsi(name="another-month-index"), month_gsi())
+
+        self.assertEqual(resolve_date_index(payload, CHART_ATTRIBUTES)["name"], "launch_month-index")
+
+
+@mock_aws
+class TestDiscoverDateIndex(unittest.TestCase):
+    """Test GSI discovery against a moto table"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+        clear_index_cache()
+        self.table = create_table()
+        put_launches(self.table)
+
+    def tearDown(self):
+        clear_index_cache()
+
+    def test_scans_until_migrated(self):
+        """Test that the GSI is not used before the launch_month migration"""
+        self.assertIsNone(discover_date_index(self.table))
+
+        _, method = fetch_raw_items(self.table, date(2020, 1, 1), date(2020, 1, 31))
+        self.assertTrue(method.startswith("scan_filter"))
+
+    def test_queries_gsi_after_migration(self):
+        """Test that the migration marker enables the month GSI"""
+        self.table.put_item(Item={**MIGRATION_KEY, MIGRATION_NAME: "2020-01-01T00:00:00+00:00"})
+
+        index = discover_date_index(self.table)
+        self.assertEqual(index["name"], "launch_month-index")
+
+        items, method = fetch_raw_items(self.table, date(2019, 12, 31), date(2020, 1, 1))
+        self.assertEqual(method, "query_gsi launch_month-index")
+        self.assertEqual(sorted(item["id"] for item in items), ["launch-2", "launch-3", "launch-4"])
+
+    def test_result_is_cached(self):
+        """Test that DescribeTable is not repeated within the TTL"""
+        self.assertIsNone(discover_date_index(self.table))
+        self.table.put_item(Item={**MIGRATION_KEY, MIGRATION_NAME: "2020-01-01T00:00:00+00:00"})
+
+        self.assertIsNone(discover_date_index(self.table))
+        clear_index_cache()
+        self.assertIsNotNone(discover_date_index(self.table))
+
+
+@mock_aws
+class TestRollupFrames(unittest.TestCase):
+    """Test that chart frames built from rollups match the ones built from items"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+        clear_index_cache()
+        self.table = create_table()
+        put_launches(self.table)
+        self.table.put_item(Item={**MIGRATION_KEY, MIGRATION_NAME: "2020-01-01T00:00:00+00:00"})
+        rebuild_rollups(self.table)
+
+    def tearDown(self):
+        clear_index_cache()
+
+    def frames(self, start_date, end_date):
+        items, _ = fetch_raw_items(self.table, start_date, end_date)
+        from_items = chart_frames_from_items(items_to_dataframe(items))
+        rollups, granularity = fetch_rollups(self.table, start_date, end_date)
+        from_rollups = chart_frames_from_rollups(rollups, granularity)
+        return comparable(from_items), comparable(from_rollups), granularity
+
+    def test_daily_rollups_match_items(self):
+        """Test equality across a year boundary with daily rollups"""
+        from_items, from_rollups, granularity = self.frames(date(2019, 12, 15), date(2020, 2, 29))
+
+        self.assertEqual(granularity, "day")
+        self.assertEqual(from_items["total"], 6)
+        self.assertEqual(from_rollups, from_items)
+
+    def test_monthly_rollups_match_items(self):
+        """Test equality of the aggregates when long ranges read monthly rollups"""
+        original = queries.ROLLUP_DAILY_MAX_DAYS
+        queries.ROLLUP_DAILY_MAX_DAYS = 31
+        try:
+            from_items, from_rollups, granularity = self.frames(date(2019, 12, 20), date(2020, 3, 31))
+        finally:
+            queries.ROLLUP_DAILY_MAX_DAYS = original
+
+        self.assertEqual(granularity, "month")
+        # With monthly rollups the line has one point per month instead of per day
+        from_items.pop("daily")
+        from_rollups.pop("daily")
+        self.assertEqual(from_items["total"], 7)
+        self.assertEqual(from_rollups, from_items)
+
+
+if __name__ == '__main__':
+    unittest.main()
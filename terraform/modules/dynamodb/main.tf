@@ -27,15 +27,27 @@ resource "aws_dynamodb_table" "spacex_launches" {
     type = "S"
   }
 
-  # # Global Secondary Index to query items by launch_date.
-  # # We use a GSI so it can be added/removed without recreating the base table.
-  # global_secondary_index {
-  #   name            = "launch_date-gsi"
-  #   hash_key        = "launch_date"
-  #   range_key       = "id"
-  #   projection_type = "ALL"
-  #   # No provisioned throughput fields required for PAY_PER_REQUEST billing.
-  # }
+  attribute {
+    name = "launch_month"
+    # Month bucket (YYYY-MM) derived from launch_date by the Lambda.
+    type = "S"
+  }
+
+  # Global Secondary Index to query items by date range.
+  # Partitioned by month bucket so a range Query fans out to one partition per
+  # month and reads scale with the selected range instead of the table size.
+  # Items without launch_month (e.g. the ingestion checkpoint) are not indexed.
+  global_secondary_index {
+    name            = "launch_month-index"
+    hash_key        = "launch_month"
+    range_key       = "launch_date"
+    projection_type = "INCLUDE"
+    # Only the attributes the dashboard charts read (keys are always projected):
+    # smaller index items mean fewer read units per Query. Detail columns are
+    # fetched from the base table with BatchGetItem when actually displayed.
+    non_key_attributes = ["launch_status", "launchpad_id"]
+    # No provisioned throughput fields required for PAY_PER_REQUEST billing.
+  }
 
   # Server-side encryption enabled by default (AWS owned key)
   tags = {
@@ -82,9 +82,13 @@ resource "aws_iam_policy" "task_dynamodb_policy" {
           "dynamodb:Query",
           "dynamodb:Scan",
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:DescribeTable"
         ]
-        Resource = "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_table_name}"
+        Resource = [
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_table_name}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_table_name}/index/*"
+        ]
       }
     ]
   })
@@ -56,9 +56,12 @@ resource "aws_iam_role_policy_attachment" "lambda_attach_dynamodb" {
 # Build Lambda deployment package with dependencies
 resource "null_resource" "lambda_build" {
   triggers = {
-    requirements_hash = filemd5("${path.module}/../../../compute/lambda/requirements.txt")
-    app_hash          = filemd5("${path.module}/../../../compute/lambda/app.py")
-    model_hash        = filemd5("${path.module}/../../../compute/lambda/model.py")
+    # Dependencias que build.sh instala en el paquete
+    requirements_hash = filemd5("${path.module}/../../../compute/lambda/requirements-lambda.txt")
+    # app.py, model.py y módulos auxiliares (spacex_client.py, ...)
+    sources_hash      = md5(join("", [for f in sort(fileset("${path.module}/../../../compute/lambda", "*.py")) : filemd5("${path.module}/../../../compute/lambda/${f}")]))
+    # Módulos compartidos con el dashboard (date_keys.py) que build.sh copia al paquete
+    shared_hash       = md5(join("", [for f in sort(fileset("${path.module}/../../../compute/shared", "*.py")) : filemd5("${path.module}/../../../compute/shared/${f}")]))
   }
 
   provisioner "local-exec" {